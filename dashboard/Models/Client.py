@@ -426,7 +426,16 @@ class EngagementOperation(CreateUpdateDateTimeAndArchivedField):
         default="PED",
         help_text="Operation Completation Status",
     )
-    task_id = models.UUIDField(null=True, editable=False, blank=True)
+    delivery_attempts = models.PositiveSmallIntegerField(default=0)
+    dispatch_lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Claimed for sending until, or next retry after a failed attempt",
+    )
+    dispatch_claim_token = models.CharField(max_length=32, null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["delivery_status", "date"])]
 
     def __str__(self):
         return f"Template {self.template_id}: {self.get_delivery_status_display()} on {self.date.strftime('%d %b %Y')}"
@@ -437,3 +446,62 @@ class InterviewScheduleAttempt(CreateUpdateDateTimeAndArchivedField):
     candidate = models.ForeignKey(
         Candidate, on_delete=models.CASCADE, related_name="scheduling_attempts"
     )
+
+
+class ResumeParseJob(CreateUpdateDateTimeAndArchivedField):
+    STATUS_CHOICES = (
+        ("PED", "Pending"),
+        ("PRO", "Processing"),
+        ("SUC", "Completed"),
+        ("FLD", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name="resume_parse_jobs",
+        blank=True,
+        null=True,
+    )
+    status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="PED")
+    total_files = models.PositiveSmallIntegerField(default=0)
+    processed_files = models.PositiveSmallIntegerField(default=0)
+    results = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    lease_expires_at = models.DateTimeField(
+        null=True, blank=True, help_text="A processing job past its lease is reclaimed"
+    )
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Resume parse job {self.id}: {self.get_status_display()} ({self.processed_files}/{self.total_files})"
+
+
+class ResumeParseFile(CreateUpdateDateTimeAndArchivedField):
+    job = models.ForeignKey(
+        ResumeParseJob, on_delete=models.CASCADE, related_name="files"
+    )
+    file = models.FileField(upload_to="resume_parse_jobs")
+    file_name = models.CharField(max_length=255)
+
+    def __str__(self):
+        return f"{self.file_name} of resume parse job {self.job_id}"
+
+
+class ParsedResumeCache(CreateUpdateDateTimeAndArchivedField):
+    content_hash = models.CharField(max_length=64, help_text="sha256 of the file")
+    parser_version = models.CharField(
+        max_length=16, help_text="Version of the extraction limits, prompt and model"
+    )
+    text = models.TextField()
+    parsed = models.JSONField(
+        null=True, blank=True, help_text="Fields returned by the model, before cleanup"
+    )
+
+    class Meta:
+        unique_together = ("content_hash", "parser_version")
+
+    def __str__(self):
+        return f"Parsed resume {self.content_hash[:12]} ({self.parser_version})"
@@ -67,6 +67,74 @@ class BillingLog(CreateUpdateDateTimeAndArchivedField):
         ]
 
 
+# monthly BillingLog totals per client/interviewer and reason, kept up to date by
+# services.finance_rollup.FinanceRollupService whenever billing logs change
+class FinanceRollup(CreateUpdateDateTimeAndArchivedField):
+    ROLLUP_TYPE_CHOICES = (
+        ("CLT", "Client"),
+        ("INT", "Interviewer"),
+    )
+
+    rollup_type = models.CharField(max_length=15, choices=ROLLUP_TYPE_CHOICES)
+    client = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name="finance_rollups",
+        null=True,
+        blank=True,
+    )
+    interviewer = models.ForeignKey(
+        InternalInterviewer,
+        on_delete=models.CASCADE,
+        related_name="finance_rollups",
+        null=True,
+        blank=True,
+    )
+    billing_month = models.DateField()
+    reason = models.CharField(max_length=50, choices=BillingLog.BILLING_REASON_CHOICES)
+    log_count = models.PositiveIntegerField(default=0)
+    client_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    interviewer_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    deductions = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Total late feedback submission deduction",
+    )
+    paid_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Client amount paid for client rollups, interviewer amount paid for interviewer rollups",
+    )
+    pending_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Client amount pending for client rollups, interviewer amount pending for interviewer rollups",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "billing_month", "reason"],
+                name="unique_client_rollup_per_month_reason",
+            ),
+            models.UniqueConstraint(
+                fields=["interviewer", "billing_month", "reason"],
+                name="unique_interviewer_rollup_per_month_reason",
+            ),
+        ]
+
+    def __str__(self):
+        owner = (
+            f"Client ID {self.client_id}"
+            if self.rollup_type == "CLT"
+            else f"Interviewer ID {self.interviewer_id}"
+        )
+        return f"{owner} - {self.reason} - {self.billing_month.strftime('%B %Y')}"
+
+
 class BillingRecord(CreateUpdateDateTimeAndArchivedField):
     RECORD_TYPE_CHOICES = (
         ("CLB", "Client Billing"),
@@ -120,6 +188,13 @@ class BillingRecord(CreateUpdateDateTimeAndArchivedField):
     due_date = models.DateField()
 
     invoice_number = models.CharField(max_length=20, unique=True, null=True, blank=True)
+    invoice_pdf = models.FileField(upload_to="invoices", null=True, blank=True)
+    invoice_generated_at = models.DateTimeField(
+        null=True, blank=True, help_text="Signifies invoice pdf generation time"
+    )
+    invoice_sent_at = models.DateTimeField(
+        null=True, blank=True, help_text="Signifies invoice email delivery time"
+    )
 
     client = models.ForeignKey(
         InternalClient,
@@ -168,6 +243,15 @@ class BillingRecord(CreateUpdateDateTimeAndArchivedField):
         super().save(*args, **kwargs)
 
 
+class InvoiceSequence(CreateUpdateDateTimeAndArchivedField):
+    # one gap-free counter per financial year, always incremented under row lock
+    financial_year = models.CharField(max_length=9, unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.financial_year} - {self.last_number}"
+
+
 class BasePayment(models.Model):
 
     PAYMENT_STATUS_CHOICES = [
@@ -292,8 +376,13 @@ class ClientCreditWallet(CreateUpdateDateTimeAndArchivedField):
     credit_expired_at = models.DateTimeField(
         help_text="Validity expired date",
         default=default_credit_expiry,
+        db_index=True,
     )
 
+    @property
+    def is_expired(self):
+        return self.credit_expired_at <= timezone.now()
+
 
 class ClientCreditTransaction(CreateUpdateDateTimeAndArchivedField):
     TRANSACTION_TYPE_CHOICES = (
@@ -301,6 +390,9 @@ class ClientCreditTransaction(CreateUpdateDateTimeAndArchivedField):
         ("usage", "Interview Usage"),
         ("refund", "Refund"),
         ("manual", "Admin Added"),
+        ("expiry", "Credit Expired"),
+        ("adjust_add", "Reconciliation Credit"),
+        ("adjust_deduct", "Reconciliation Debit"),
     )
     STATUS_CHOICES = (
         ("SUC", "Success"),
@@ -315,7 +407,7 @@ class ClientCreditTransaction(CreateUpdateDateTimeAndArchivedField):
     )
     amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     description = models.CharField(max_length=150, blank=True, null=True)
-    credits = models.PositiveSmallIntegerField(default=0)
+    credits = models.PositiveIntegerField(default=0)
     transaction_type = models.CharField(
         max_length=15, choices=TRANSACTION_TYPE_CHOICES, blank=True
     )
@@ -243,3 +243,34 @@ class InterviewerPricing(CreateUpdateDateTimeAndArchivedField):
             return "7-10"
         else:
             return "10+"
+
+
+class DeadLetterTask(CreateUpdateDateTimeAndArchivedField):
+    STATUS_CHOICES = (
+        ("PED", "Pending"),
+        ("RPL", "Replayed"),
+        ("DIS", "Discarded"),
+    )
+
+    task_name = models.CharField(max_length=255, db_index=True)
+    task_id = models.CharField(max_length=255, help_text="Id of the failed run")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    options = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Chain and callbacks of the failed run, kept for the replay",
+    )
+    exception = models.TextField(blank=True)
+    traceback = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=1)
+    attempt_history = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=3, choices=STATUS_CHOICES, default="PED")
+    replayed_at = models.DateTimeField(null=True, blank=True)
+    replay_task_id = models.CharField(max_length=255, null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "task_name"])]
+
+    def __str__(self):
+        return f"{self.task_name} ({self.task_id}): {self.get_status_display()}"
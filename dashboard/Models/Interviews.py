@@ -6,6 +6,11 @@ from hiringdogbackend.ModelUtils import SoftDelete, CreateUpdateDateTimeAndArchi
 
 
 class Interview(CreateUpdateDateTimeAndArchivedField):
+    PROCESSING_STATE_CHOICES = (
+        ("DWN", "Downloading Recording"),
+        ("FBK", "Generating Feedback"),
+    )
+
     objects = SoftDelete()
     object_all = models.Manager()
 
@@ -80,10 +85,24 @@ class Interview(CreateUpdateDateTimeAndArchivedField):
         max_length=255, null=True, blank=True
     )
     meeting_link = models.URLField(null=True, blank=True)
+    processing_state = models.CharField(
+        max_length=15,
+        choices=PROCESSING_STATE_CHOICES,
+        null=True,
+        blank=True,
+        help_text="Pipeline currently holding a claim on this interview",
+    )
+    processing_lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="The claim can be taken over by another worker after this time",
+    )
+    processing_claim_token = models.CharField(max_length=32, null=True, blank=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["interviewer", "scheduled_time", "status"]),
+            models.Index(fields=["processing_state", "processing_lease_expires_at"]),
         ]
 
     def save(self, *args, **kwargs):
@@ -135,6 +154,12 @@ class InterviewFeedback(CreateUpdateDateTimeAndArchivedField):
         null=True, blank=True, help_text="Signifying interviewer feedback submission"
     )
     pdf_file = models.FileField(upload_to="feedback_report", null=True, blank=True)
+    pdf_content_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        help_text="sha256 of the report HTML the current pdf_file was rendered from",
+    )
     attachment = models.FileField(
         upload_to="feedback_attachments", null=True, blank=True
     )
@@ -182,3 +207,47 @@ class CandidateToInterviewerFeedback(CreateUpdateDateTimeAndArchivedField):
 
     def __str__(self):
         return f"Candidate Feedback for Interviewer ID {self.interviewer_id} in Interview ID {self.interview_id}"
+
+
+class RecordingDownloadCheckpoint(CreateUpdateDateTimeAndArchivedField):
+    FILE_TYPE_CHOICES = (
+        ("video", "Video"),
+        ("transcript", "Transcript"),
+    )
+
+    interview = models.ForeignKey(
+        Interview,
+        on_delete=models.CASCADE,
+        related_name="download_checkpoints",
+    )
+    file_type = models.CharField(max_length=15, choices=FILE_TYPE_CHOICES)
+    drive_file_id = models.CharField(max_length=255)
+    total_size = models.BigIntegerField(null=True, blank=True)
+    md5_checksum = models.CharField(
+        max_length=32, null=True, blank=True, help_text="Drive md5 of the file"
+    )
+    bytes_downloaded = models.BigIntegerField(
+        default=0, help_text="Offset of the last chunk written to the staging file"
+    )
+    staging_path = models.CharField(max_length=255, null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("interview", "file_type")
+
+    def __str__(self):
+        return f"{self.file_type} download of Interview ID {self.interview_id}: {self.bytes_downloaded}/{self.total_size}"
+
+
+class FeedbackGenerationCache(CreateUpdateDateTimeAndArchivedField):
+    transcript_hash = models.CharField(max_length=64, help_text="sha256 of transcript")
+    prompt_version = models.CharField(
+        max_length=16, help_text="Version of the prompt and model that produced it"
+    )
+    feedback = models.JSONField(default=dict)
+
+    class Meta:
+        unique_together = ("transcript_hash", "prompt_version")
+
+    def __str__(self):
+        return f"Feedback for transcript {self.transcript_hash[:12]} ({self.prompt_version})"
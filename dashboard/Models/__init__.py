@@ -9,6 +9,9 @@ from .Client import (
     Department,
     JobInterviewRounds,
     JobRole,
+    ResumeParseJob,
+    ResumeParseFile,
+    ParsedResumeCache,
 )
 from .Internal import (
     ClientPointOfContact,
@@ -19,12 +22,21 @@ from .Internal import (
     HDIPUsers,
     DesignationDomain,
     InterviewerPricing,
+    DeadLetterTask,
 )
 from .Interviewer import InterviewerAvailability, InterviewerRequest
-from .Interviews import Interview, InterviewFeedback, CandidateToInterviewerFeedback
+from .Interviews import (
+    Interview,
+    InterviewFeedback,
+    CandidateToInterviewerFeedback,
+    RecordingDownloadCheckpoint,
+    FeedbackGenerationCache,
+)
 from .Finance import (
     BillingRecord,
     BillingLog,
+    FinanceRollup,
+    InvoiceSequence,
     BillPayments,
     ClientCreditWallet,
     ClientCreditTransaction,
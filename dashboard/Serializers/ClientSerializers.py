@@ -1,8 +1,6 @@
 import json
 from datetime import datetime
-from celery import group
 from rest_framework import serializers
-from celery import group
 from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
@@ -40,10 +38,7 @@ from hiringdogbackend.utils import (
     validate_json,
     set_choice_field_error_messages,
 )
-from ..tasks import (
-    send_mail,
-    send_schedule_engagement_email,
-)
+from ..tasks import send_mail
 
 
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
@@ -1055,19 +1050,8 @@ class EngagementOperationSerializer(serializers.ModelSerializer):
             for template in templates
         ]
 
-        operations = EngagementOperation.objects.bulk_create(operations)
-
-        task_group = group(
-            send_schedule_engagement_email.s(operation.id).set(eta=operation.date)
-            for operation in operations
-        )
-        result = task_group.apply_async()
-
-        for operation, task in zip(operations, result.children):
-            operation.task_id = task.id
-            operation.save()
-
-        return operations
+        # sent by the due-queue scan once their date comes up
+        return EngagementOperation.objects.bulk_create(operations)
 
 
 class EngagementTemplateSerializer(serializers.ModelSerializer):
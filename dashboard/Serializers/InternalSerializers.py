@@ -21,6 +21,7 @@ from ..models import (
     HDIPUsers,
     DesignationDomain,
     ClientCreditWallet,
+    ClientCreditTransaction,
     CreditPackagePricing,
 )
 from hiringdogbackend.utils import (
@@ -303,11 +304,20 @@ class InternalClientSerializer(serializers.ModelSerializer):
                             logging.WARNING,
                         )
 
-                    ClientCreditWallet.objects.get_or_create(
+                    wallet, created = ClientCreditWallet.objects.get_or_create(
                         client=organization,
                         pricing_plan=plan,
                         defaults={"total_credits": 300},
                     )
+                    if created:
+                        # the ledger has to explain the free credits as well
+                        ClientCreditTransaction.objects.create(
+                            wallet=wallet,
+                            credits=wallet.total_credits,
+                            transaction_type="manual",
+                            description="Opening balance",
+                            reference="opening_balance",
+                        )
 
                 """ 
                 else:
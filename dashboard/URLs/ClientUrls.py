@@ -7,6 +7,7 @@ from ..views import (
     JobRoleView,
     StreamView,
     ResumeParserView,
+    ResumeParseJobView,
     CandidateView,
     RecruiterInterviewerAvailabilityView,
     EngagementTemplateView,
@@ -67,6 +68,16 @@ urlpatterns = [
         name="interviewer-availablity",
     ),
     path("parse-resume/", ResumeParserView.as_view(), name="resume-parser"),
+    path(
+        "parse-resume/jobs/",
+        ResumeParseJobView.as_view(),
+        name="resume-parse-jobs",
+    ),
+    path(
+        "parse-resume/jobs/<uuid:job_id>/",
+        ResumeParseJobView.as_view(),
+        name="resume-parse-job-details",
+    ),
     path(
         "engagement-templates/",
         EngagementTemplateView.as_view(),
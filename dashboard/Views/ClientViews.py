@@ -4,8 +4,6 @@ import uuid
 import logging
 import datetime as dt
 from decimal import Decimal
-from celery import group
-from celery.result import AsyncResult
 from datetime import datetime, timedelta
 from django.core.exceptions import ObjectDoesNotExist
 from django.conf import settings
@@ -13,7 +11,7 @@ from django.utils import timezone
 from django.utils.encoding import force_str, force_bytes
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.db import transaction
-from django.db.models import Q, F, Count, Sum
+from django.db.models import Q, F, Count
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -40,6 +38,7 @@ from ..models import (
     ClientCreditWallet,
     ClientCreditTransaction,
     CreditPackagePricing,
+    ResumeParseJob,
 )
 from ..serializer import (
     ClientUserSerializer,
@@ -68,13 +67,17 @@ from ..serializer import (
     ClientCreditTransactionSerializer,
 )
 from ..permissions import CanDeleteUpdateUser, UserRoleDeleteUpdateClientData
-from externals.parser.resumeparser2 import process_resumes
 from externals.analytics import get_candidate_analytics
 from externals.gemini import generate_questionnaire, generate_job_description
+from externals.gemini_rate_limiter import PRIORITY_INTERACTIVE
 from externals.payment.cashfree import create_payment_link, is_valid_signature
 from services.interview_scheduling import (
     InterviewAvailablitySchedulingService,
 )
+from services.finance_export import FinanceExportService, SUPPORTED_EXPORT_FORMATS
+from services.finance_rollup import FinanceRollupService
+from services.engagement_dispatch import EngagementEmailService
+from services.resume_parsing import ResumeParserService, ResumeParseJobService
 from core.permissions import (
     IsClientAdmin,
     IsClientOwner,
@@ -93,7 +96,7 @@ from hiringdogbackend.utils import (
     get_boolean,
     log_action,
 )
-from ..tasks import send_schedule_engagement_email, send_mail, send_scheduling_link_to_candidate
+from ..tasks import send_mail, send_scheduling_link_to_candidate
 
 
 @extend_schema(tags=["Client"])
@@ -927,9 +930,9 @@ class ResumeParserView(APIView):
         IsClientAdmin | IsClientUser | IsClientOwner | IsAgency | IsSuperAdmin,
     ]
 
-    def post(self, request):
-        resume_files = request.FILES.getlist("resume")
+    max_files = settings.RESUME_PARSE_MAX_FILES
 
+    def validate_resume_files(self, resume_files):
         if not resume_files:
             return Response(
                 {
@@ -937,16 +940,19 @@ class ResumeParserView(APIView):
                     "message": "Invalid request.",
                     "error": {
                         "resume": [
-                            "This field is required. Up to 15 PDF or DOCX resumes are supported."
+                            f"This field is required. Up to {self.max_files} PDF or DOCX resumes are supported."
                         ]
                     },
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if len(resume_files) > 15:
+        if len(resume_files) > self.max_files:
             return Response(
-                {"status": "failed", "message": "You can upload up to 15 files only."},
+                {
+                    "status": "failed",
+                    "message": f"You can upload up to {self.max_files} files only.",
+                },
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
@@ -965,6 +971,12 @@ class ResumeParserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    def post(self, request):
+        resume_files = request.FILES.getlist("resume")
+        invalid_response = self.validate_resume_files(resume_files)
+        if invalid_response:
+            return invalid_response
+
         temp_dir = tempfile.mkdtemp()
         temp_paths = []
 
@@ -976,7 +988,8 @@ class ResumeParserView(APIView):
                         temp_file.write(chunk)
                 temp_paths.append(temp_path)
 
-            parsed_data = process_resumes(temp_paths)
+            # the user waits on the response, ahead of background parsing
+            parsed_data = ResumeParserService.parse(temp_paths, PRIORITY_INTERACTIVE)
             return Response(
                 {
                     "status": "success",
@@ -995,6 +1008,54 @@ class ResumeParserView(APIView):
             os.rmdir(temp_dir)
 
 
+@extend_schema(tags=["Client"])
+class ResumeParseJobView(ResumeParserView):
+    max_files = settings.RESUME_PARSE_JOB_MAX_FILES
+
+    def post(self, request):
+        resume_files = request.FILES.getlist("resume")
+        invalid_response = self.validate_resume_files(resume_files)
+        if invalid_response:
+            return invalid_response
+
+        job = ResumeParseJobService.create(request.user, resume_files)
+        return Response(
+            {
+                "status": "success",
+                "message": "Resumes queued for parsing.",
+                "data": self.get_job_data(job),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def get(self, request, job_id=None):
+        job = ResumeParseJob.objects.filter(pk=job_id, created_by=request.user).first()
+        if not job:
+            return Response(
+                {"status": "failed", "message": "Resume parse job not found."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": "Resume parse job retrieved successfully.",
+                "data": self.get_job_data(job),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @staticmethod
+    def get_job_data(job):
+        return {
+            "job_id": job.id,
+            "status": job.get_status_display(),
+            "total_files": job.total_files,
+            "processed_files": job.processed_files,
+            "results": job.results,
+            "error": job.error,
+        }
+
+
 @extend_schema(tags=["Client"])
 class CandidateView(APIView, LimitOffsetPagination):
     serializer_class = CandidateSerializer
@@ -2158,33 +2219,8 @@ class EngagementOperationUpdateView(APIView):
                         != template_entry["date"].strftime("%d/%m/%Y %H:%M:%S")
                         or operation.template_id != template_entry["template_id"]
                     ):
-                        # **Revoke old task if it exists**
-                        if operation.task_id:
-                            result = AsyncResult(str(operation.task_id))
-                            log_action(
-                                f"Revoking task {operation.task_id} with state {result.state}",
-                                request,
-                            )
-                            if result.state in [
-                                "PENDING",
-                                "RECEIVED",
-                                "STARTED",
-                                "QUEUED",
-                            ]:
-                                result.revoke(terminate=True, signal="SIGTERM")
-
-                        if result.state in ["FAILURE", "RETRY"]:
-                            result.forget()
-
-                        # **Schedule a new task**
-                        new_eta = timezone.make_aware(template_entry["date"])
-                        new_task = send_schedule_engagement_email.s(operation.id).set(
-                            eta=new_eta
-                        )
-                        new_task_result = new_task.apply_async()
-
-                        # **Update task ID with the new one**
-                        operation.task_id = new_task_result.id
+                        # the due-queue scan picks it up again at the new date
+                        EngagementEmailService.reset_dispatch_fields(operation)
 
                     operation.template_id = template_entry["template_id"]
                     operation.date = template_entry["date"]
@@ -2194,7 +2230,16 @@ class EngagementOperationUpdateView(APIView):
             # Bulk update modified operations
             if rescheduled_operations:
                 EngagementOperation.objects.bulk_update(
-                    rescheduled_operations, ["template_id", "date", "week", "task_id"]
+                    rescheduled_operations,
+                    [
+                        "template_id",
+                        "date",
+                        "week",
+                        "delivery_status",
+                        "delivery_attempts",
+                        "dispatch_lease_expires_at",
+                        "dispatch_claim_token",
+                    ],
                 )
 
             # update the successfull status
@@ -2203,12 +2248,11 @@ class EngagementOperationUpdateView(APIView):
                     locked_update_template_operation, ["operation_complete_status"]
                 )
 
-            # cancel the deleted operation ids task
+            # archived operations are skipped by the due-queue scan
             delete_scheduled_operations = []
             for delete_operation in EngagementOperation.objects.filter(
                 pk__in=delete_operation_ids
             ):
-                AsyncResult(delete_operation.task_id).revoke(terminate=True)
                 delete_operation.archived = True
                 delete_scheduled_operations.append(delete_operation)
 
@@ -2220,7 +2264,7 @@ class EngagementOperationUpdateView(APIView):
 
             if new_operations:
                 # Bulk create new operations
-                created_operations = EngagementOperation.objects.bulk_create(
+                EngagementOperation.objects.bulk_create(
                     [
                         EngagementOperation(
                             engagement=engagement,
@@ -2232,29 +2276,6 @@ class EngagementOperationUpdateView(APIView):
                     ],
                 )
 
-                if not all(op.id for op in created_operations):
-                    created_operations = list(
-                        EngagementOperation.objects.filter(
-                            engagement__in=[
-                                operation.engagement for operation in created_operations
-                            ]
-                        )
-                    )
-
-                task_group = group(
-                    send_schedule_engagement_email.s(operation.id).set(
-                        eta=operation.date
-                    )
-                    for operation in created_operations
-                )
-                result = task_group.apply_async()
-
-                # Assign task IDs in bulk update
-                for operation, task in zip(created_operations, result.children):
-                    operation.task_id = task.id
-
-                EngagementOperation.objects.bulk_update(created_operations, ["task_id"])
-
         return Response(
             {
                 "status": "success",
@@ -2380,6 +2401,16 @@ class FinanceView(APIView, LimitOffsetPagination):
         interviewer_id = request.query_params.get("interviewer_id")
         finance_month = request.query_params.get("finance_month", "current_month")
         download = get_boolean(request.query_params, "download")
+        file_format = request.query_params.get("file_format")
+
+        if file_format and file_format not in SUPPORTED_EXPORT_FORMATS:
+            return Response(
+                {
+                    "status": "failed",
+                    "message": f"Invalid file_format. Valid formats are {', '.join(SUPPORTED_EXPORT_FORMATS)}.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         start_date = request.query_params.get("start_date")
         if start_date:
@@ -2479,6 +2510,13 @@ class FinanceView(APIView, LimitOffsetPagination):
             else:
                 billing_log = billing_log.filter(interviewer_id=interviewer_id)
 
+        if download and file_format:
+            return FinanceExportService.export(
+                billing_log,
+                file_format,
+                for_interviewer=request.user.role == Role.INTERVIEWER,
+            )
+
         paginated_queryset = self.paginate_queryset(billing_log, request)
         if request.user.role == Role.INTERVIEWER:
             serializer = FinanceSerializerForInterviewer(
@@ -2494,10 +2532,22 @@ class FinanceView(APIView, LimitOffsetPagination):
         }
         if request.user.role in [Role.CLIENT_OWNER, Role.INTERVIEWER]:
             if start_date and end_date:
-                total_amount = billing_log.aggregate(
-                    total_amount=Sum("amount_for_client")
-                ).get("total_amount")
-                response_data["total_amount"] = total_amount if total_amount else 0
+                if request.user.role == Role.CLIENT_OWNER:
+                    totals = FinanceRollupService.get_range_totals(
+                        start_date,
+                        end_date,
+                        client=request.user.clientuser.organization,
+                    )
+                    response_data["total_amount"] = totals["client_amount"]
+                else:
+                    totals = FinanceRollupService.get_range_totals(
+                        start_date,
+                        end_date,
+                        interviewer=request.user.interviewer,
+                    )
+                    response_data["total_amount"] = totals["interviewer_amount"]
+                response_data["paid_amount"] = totals["paid_amount"]
+                response_data["pending_amount"] = totals["pending_amount"]
             else:
                 response_data["total_amount"] = (
                     billing_info.amount_due if billing_info else 0
@@ -2848,6 +2898,9 @@ class CFWebhookView(APIView):
             billing_record.save()
             if bill_payment.billing_logs.exists():
                 bill_payment.billing_logs.update(status="PAI")
+                FinanceRollupService.refresh_for_billing_logs(
+                    bill_payment.billing_logs.all()
+                )
 
         if bill_payment:
             bill_payment.meta_data.update({"Webhook_Response": data})
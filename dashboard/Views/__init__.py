@@ -6,6 +6,7 @@ from .ClientViews import (
     JobRoleView,
     StreamView,
     ResumeParserView,
+    ResumeParseJobView,
     CandidateView,
     RecruiterInterviewerAvailabilityView,
     EngagementTemplateView,
@@ -1,5 +1,6 @@
 from typing import Any
 from datetime import timedelta
+from django.conf import settings
 from django.contrib import admin, messages
 from django.contrib.admin import SimpleListFilter
 from django.db.models.query import QuerySet
@@ -10,6 +11,9 @@ from rangefilter.filters import (
     DateRangeFilter,
 )
 from common import constants
+from services.finance_rollup import FinanceRollupService
+from services.dead_letters import DeadLetterService
+from services.interview_processing import InterviewClaimService
 from .models import (
     Agreement,
     InternalClient,
@@ -31,6 +35,7 @@ from .models import (
     ClientCreditTransaction,
     CreditPackage,
     CreditPackagePricing,
+    DeadLetterTask,
 )
 
 admin.site.site_title = "HDIP Super Admin Center"
@@ -59,7 +64,7 @@ class InterviewAdmin(admin.ModelAdmin):
         "interviewer__name",
         "candidate__organization__name",
     )
-    actions = ["mark_as_downloaded"]
+    actions = ["mark_as_downloaded", "regenerate_ai_feedback"]
     list_per_page = 20
 
     def get_queryset(self, request):
@@ -85,6 +90,44 @@ class InterviewAdmin(admin.ModelAdmin):
 
     get_organization_name.short_description = "Organization"
 
+    @admin.action(description="Regenerate AI feedback")
+    def regenerate_ai_feedback(self, request, queryset):
+        from .tasks import process_single_interview
+
+        interviews = (
+            queryset.filter(transcription__isnull=False)
+            .exclude(transcription="")
+            .exclude(interview_feedback__is_submitted=True)
+        )
+        # interviews a worker is already processing are skipped, like in the beat dispatch
+        interview_ids, claim_token = InterviewClaimService.claim(
+            interviews, "FBK", queryset.count()
+        )
+        for interview_id in interview_ids:
+            process_single_interview.delay(interview_id, claim_token)
+        self.message_user(
+            request,
+            ngettext(
+                "AI feedback regeneration was queued for %d interview.",
+                "AI feedback regeneration was queued for %d interviews.",
+                len(interview_ids),
+            )
+            % len(interview_ids),
+            messages.SUCCESS,
+        )
+        skipped = interviews.count() - len(interview_ids)
+        if skipped:
+            self.message_user(
+                request,
+                ngettext(
+                    "%d interview is already being processed and was skipped.",
+                    "%d interviews are already being processed and were skipped.",
+                    skipped,
+                )
+                % skipped,
+                messages.WARNING,
+            )
+
     @admin.action(description="Mark as Download")
     def mark_as_downloaded(self, request, queryset):
         updated_count = queryset.filter(status="CSCH").update(downloaded=True)
@@ -390,6 +433,7 @@ class InterviewFeedbackAdmin(admin.ModelAdmin):
     list_filter = ("is_submitted",)
     search_fields = ("interview__candidate__name", "interview__interviewer__name")
     list_per_page = 20
+    actions = ["regenerate_pdf_reports"]
 
     def get_queryset(self, request):
         return (
@@ -407,6 +451,28 @@ class InterviewFeedbackAdmin(admin.ModelAdmin):
 
     get_interview_name.short_description = "Interview"
 
+    @admin.action(description="Regenerate PDF reports")
+    def regenerate_pdf_reports(self, request, queryset):
+        from .tasks import generate_interview_feedback_pdfs
+
+        interview_ids = list(
+            queryset.filter(is_submitted=True, interview__isnull=False)
+            .exclude(overall_remark="NJ")
+            .values_list("interview_id", flat=True)
+        )
+        if interview_ids:
+            generate_interview_feedback_pdfs.delay(interview_ids, force=True)
+        self.message_user(
+            request,
+            ngettext(
+                "PDF report regeneration was queued for %d feedback.",
+                "PDF report regeneration was queued for %d feedbacks.",
+                len(interview_ids),
+            )
+            % len(interview_ids),
+            messages.SUCCESS,
+        )
+
 
 @admin.register(BillingRecord)
 class BillingRecordAdmin(admin.ModelAdmin):
@@ -420,9 +486,11 @@ class BillingRecordAdmin(admin.ModelAdmin):
         "billing_month",
         "total_recv_w_tax",
         "total_recv_wo_tax",
+        "invoice_number",
+        "invoice_sent_at",
         "archived",
     )
-    search_fields = ("client__name", "interviewer__name")
+    search_fields = ("client__name", "interviewer__name", "invoice_number")
     list_per_page = 20
 
     def get_queryset(self, request):
@@ -509,6 +577,7 @@ class BillingLogAdmin(admin.ModelAdmin):
     @admin.action(description="Mark Selected records as Paid")
     def update_status_to_paid(self, request, queryset):
         updated_count = queryset.filter(status="PED").update(status="PAI")
+        FinanceRollupService.refresh_for_billing_logs(queryset)
         self.message_user(
             request,
             ngettext(
@@ -523,6 +592,7 @@ class BillingLogAdmin(admin.ModelAdmin):
     @admin.action(description="Mark Selected records as Pending")
     def update_status_to_pending(self, request, queryset):
         updated_count = queryset.filter(status="PAI").update(status="PED")
+        FinanceRollupService.refresh_for_billing_logs(queryset)
         self.message_user(
             request,
             ngettext(
@@ -702,6 +772,72 @@ class ClientCreditTransactionAdmin(admin.ModelAdmin):
     get_client_name.short_description = "Client"
 
 
+@admin.register(DeadLetterTask)
+class DeadLetterTaskAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "task_name",
+        "task_id",
+        "attempts",
+        "status",
+        "created_at",
+        "replayed_at",
+    )
+    search_fields = (
+        "task_name",
+        "task_id",
+        "exception",
+    )
+    list_filter = (
+        "status",
+        "task_name",
+        ("created_at", DateRangeFilter),
+    )
+    readonly_fields = (
+        "task_name",
+        "task_id",
+        "args",
+        "kwargs",
+        "options",
+        "exception",
+        "traceback",
+        "attempts",
+        "attempt_history",
+        "replayed_at",
+        "replay_task_id",
+    )
+    actions = ["replay_selected", "discard_selected"]
+    list_per_page = 20
+
+    @admin.action(description="Replay selected tasks")
+    def replay_selected(self, request, queryset):
+        replayed = DeadLetterService.replay(queryset)
+        self.message_user(
+            request,
+            ngettext(
+                "%d task was queued for replay at %d per minute.",
+                "%d tasks were queued for replay at %d per minute.",
+                replayed,
+            )
+            % (replayed, settings.DEAD_LETTER_REPLAY_RATE_PER_MINUTE),
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Discard selected tasks")
+    def discard_selected(self, request, queryset):
+        discarded = DeadLetterService.discard(queryset)
+        self.message_user(
+            request,
+            ngettext(
+                "%d task was discarded.",
+                "%d tasks were discarded.",
+                discarded,
+            )
+            % discarded,
+            messages.SUCCESS,
+        )
+
+
 @admin.register(Agreement)
 class AgreeementAdmin(admin.ModelAdmin):
     list_display = (
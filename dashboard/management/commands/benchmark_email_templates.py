@@ -0,0 +1,108 @@
+import time
+from typing import Any
+from django.core.management import BaseCommand
+from django.template import Context, Engine, engines
+from services.email_rendering import EmailRenderer
+
+# per-recipient fields get a unique value, everything else is shared by the batch
+HEAVY_TEMPLATES = {
+    "interview_confirmation_candidate_notification.html": {
+        "position": "Senior Backend Engineer",
+        "interview_date": "12/05/2025",
+        "interview_time": "11:30 AM",
+        "meeting_link": "https://meet.google.com/abc-defg-hij",
+    },
+    "interview_confirmation_interviewer_notification.html": {
+        "candidate": "Asha Verma",
+        "position": "Senior Backend Engineer",
+        "interview_date": "12/05/2025",
+        "interview_time": "11:30 AM",
+        "meeting_link": "https://meet.google.com/abc-defg-hij",
+    },
+    "interview_confirmation_client_notification.html": {
+        "candidate": "Asha Verma",
+        "position": "Senior Backend Engineer",
+        "interview_date": "12/05/2025",
+        "interview_time": "11:30 AM",
+    },
+    "interview_feedback_notification_email.html": {
+        "candidate_name": "Asha Verma",
+        "interviewer_name": "Rahul Mehta",
+        "dashboard_link": "https://app.hdiplatform.in/client/candidates",
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Compare email template render times per recipient and per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--recipients",
+            type=int,
+            default=200,
+            help="Number of recipients rendered per template.",
+        )
+
+    @staticmethod
+    def _timed(render):
+        started_at = time.perf_counter()
+        output = render()
+        return output, (time.perf_counter() - started_at) * 1000
+
+    def handle(self, *args: Any, **options: Any):
+        engine = engines["django"].engine
+        # what every render costs when the template is looked up and parsed each time
+        uncached_engine = Engine(
+            dirs=engine.dirs,
+            loaders=[
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+            libraries=engine.libraries,
+            autoescape=engine.autoescape,
+        )
+
+        self.stdout.write(
+            f"{'template':<55}{'uncached':>12}{'compiled':>12}{'batched':>12}{'speedup':>10}"
+        )
+        for template_name, shared_context in HEAVY_TEMPLATES.items():
+            contexts = [
+                {
+                    **shared_context,
+                    "name": f"Recipient {i}",
+                    "email": f"recipient{i}@example.com",
+                }
+                for i in range(options["recipients"])
+            ]
+            EmailRenderer.get_template(template_name)
+
+            expected, uncached_ms = self._timed(
+                lambda: [
+                    uncached_engine.get_template(template_name).render(Context(context))
+                    for context in contexts
+                ]
+            )
+            _, compiled_ms = self._timed(
+                lambda: [
+                    EmailRenderer.render(template_name, context) for context in contexts
+                ]
+            )
+            batched, batched_ms = self._timed(
+                lambda: EmailRenderer.render_many(template_name, contexts)
+            )
+
+            self.stdout.write(
+                f"{template_name:<55}{uncached_ms:>10.1f}ms{compiled_ms:>10.1f}ms"
+                f"{batched_ms:>10.1f}ms{uncached_ms / batched_ms:>9.1f}x"
+            )
+            if batched != expected:
+                self.stdout.write(
+                    self.style.ERROR(f"Batched output of {template_name} differs.")
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {options['recipients']} recipients per template."
+            )
+        )
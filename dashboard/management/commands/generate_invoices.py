@@ -0,0 +1,35 @@
+from typing import Any
+from datetime import datetime
+from django.core.management import BaseCommand, CommandError
+from services.invoice_generation import InvoiceGenerationService
+
+
+class Command(BaseCommand):
+    help = "Generate, number and email client invoices for a billing month."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "billing_month", help="Billing month to invoice (format: MM/YYYY)."
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        try:
+            billing_month = datetime.strptime(options["billing_month"], "%m/%Y").date()
+        except ValueError:
+            raise CommandError("Invalid billing month. Use MM/YYYY format.")
+
+        summary = InvoiceGenerationService.run(billing_month)
+        self.stdout.write(
+            f"Numbered: {summary['numbered']}, Rendered: {summary['rendered']}, Sent: {summary['sent']}"
+        )
+        if summary["no_owner"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No client owner to email billing records {summary['no_owner']}."
+                )
+            )
+        if summary["render_failed"] or summary["send_failed"]:
+            raise CommandError(
+                f"Failed billing records - render: {summary['render_failed']}, email: {summary['send_failed']}. Re-run to resume."
+            )
+        self.stdout.write(self.style.SUCCESS("Invoices generated successfully."))
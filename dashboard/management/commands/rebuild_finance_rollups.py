@@ -0,0 +1,27 @@
+from typing import Any
+from datetime import datetime
+from django.core.management import BaseCommand, CommandError
+from services.finance_rollup import FinanceRollupService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly finance rollups from billing logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--billing-month",
+            help="Only rebuild the given billing month (format: MM/YYYY).",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        billing_month = options.get("billing_month")
+        if billing_month:
+            try:
+                billing_month = datetime.strptime(billing_month, "%m/%Y").date()
+            except ValueError:
+                raise CommandError("Invalid billing month. Use MM/YYYY format.")
+
+        bucket_count = FinanceRollupService.rebuild(billing_month)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {bucket_count} finance rollup buckets.")
+        )
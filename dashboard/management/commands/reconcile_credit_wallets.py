@@ -0,0 +1,31 @@
+from typing import Any
+from django.core.management import BaseCommand
+from services.credit_reconciliation import CreditReconciliationService
+
+
+class Command(BaseCommand):
+    help = "Report client wallets whose credit balance drifted from their ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--correct",
+            action="store_true",
+            help="Record a correcting ledger entry for every drifted wallet.",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        report = CreditReconciliationService.reconcile(correct=options["correct"])
+        for drift in report:
+            self.stdout.write(
+                f"{drift['client_name']} (wallet {drift['wallet_id']}): "
+                f"balance {drift['total_credits']}, ledger {drift['ledger_balance']}, "
+                f"drift {drift['drift']:+d}"
+                + (" [corrected]" if drift.get("corrected") else "")
+            )
+
+        if report:
+            self.stdout.write(
+                self.style.WARNING(f"{len(report)} wallets drifted from their ledger.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("All wallets match their ledger."))
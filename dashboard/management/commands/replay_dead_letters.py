@@ -0,0 +1,77 @@
+from typing import Any
+from datetime import datetime
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from dashboard.models import DeadLetterTask
+from services.dead_letters import DeadLetterService
+
+
+class Command(BaseCommand):
+    help = "Publish pending dead-lettered tasks again, spaced out by a rate limit."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--task",
+            help="Only replay this task name, e.g. dashboard.tasks.store_recordings.",
+        )
+        parser.add_argument(
+            "--since",
+            help="Only replay entries dead-lettered at or after this ISO date/time.",
+        )
+        parser.add_argument(
+            "--ids", type=int, nargs="+", help="Only replay these dead-letter ids."
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Replay at most this many entries, oldest first."
+        )
+        parser.add_argument(
+            "--rate",
+            type=int,
+            default=settings.DEAD_LETTER_REPLAY_RATE_PER_MINUTE,
+            help="Replayed tasks started per minute.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the matching entries without replaying them.",
+        )
+
+    def handle(self, *args: Any, **options: Any):
+        if options["rate"] < 1:
+            raise CommandError("--rate must be at least 1.")
+
+        queryset = DeadLetterTask.objects.filter(status="PED")
+        if options["task"]:
+            queryset = queryset.filter(task_name=options["task"])
+        if options["ids"]:
+            queryset = queryset.filter(id__in=options["ids"])
+        if options["since"]:
+            try:
+                since = datetime.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError(f"Invalid --since value {options['since']!r}.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(created_at__gte=since)
+        queryset = queryset.order_by("id")
+        if options["limit"]:
+            queryset = DeadLetterTask.objects.filter(
+                id__in=list(queryset.values_list("id", flat=True)[: options["limit"]])
+            )
+
+        if options["dry_run"]:
+            for dead_letter in queryset.order_by("id"):
+                self.stdout.write(
+                    f"{dead_letter.id} {dead_letter.task_name} "
+                    f"({dead_letter.attempts} attempts): {dead_letter.exception}"
+                )
+            self.stdout.write(f"{queryset.count()} entries would be replayed.")
+            return
+
+        replayed = DeadLetterService.replay(queryset, rate_per_minute=options["rate"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Replayed {replayed} entries at {options['rate']} per minute."
+            )
+        )
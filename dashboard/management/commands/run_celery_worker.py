@@ -0,0 +1,44 @@
+import os
+import shutil
+from typing import Any
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Start a Celery worker consuming one queue with that queue's defaults."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "queue", choices=sorted(settings.CELERY_WORKER_QUEUE_DEFAULTS)
+        )
+        parser.add_argument("--concurrency", type=int)
+        parser.add_argument("--prefetch-multiplier", type=int)
+        parser.add_argument("--loglevel", default="info")
+
+    def handle(self, *args: Any, **options: Any):
+        celery = shutil.which("celery")
+        if not celery:
+            raise CommandError("The celery executable was not found on PATH.")
+
+        queue = options["queue"]
+        defaults = settings.CELERY_WORKER_QUEUE_DEFAULTS[queue]
+        concurrency = options["concurrency"] or defaults["concurrency"]
+        # per process pools, e.g. resume text extraction, size themselves by it
+        os.environ["CELERY_WORKER_CONCURRENCY"] = str(concurrency)
+        argv = [
+            celery,
+            "-A",
+            "hiringdogbackend",
+            "worker",
+            "-Q",
+            queue,
+            "-n",
+            f"{queue}@%h",
+            f"--concurrency={concurrency}",
+            f"--prefetch-multiplier={options['prefetch_multiplier'] or defaults['prefetch_multiplier']}",
+            f"--loglevel={options['loglevel']}",
+        ]
+
+        self.stdout.write(" ".join(argv[1:]))
+        os.execv(celery, argv)
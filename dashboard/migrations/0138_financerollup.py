@@ -0,0 +1,122 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0137_migrate_job_role_db_name_to_display_name"),
+        ("organizations", "0006_alter_organization_slug"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FinanceRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "rollup_type",
+                    models.CharField(
+                        choices=[("CLT", "Client"), ("INT", "Interviewer")],
+                        max_length=15,
+                    ),
+                ),
+                ("billing_month", models.DateField()),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("feedback_submitted", "Feedback Submitted"),
+                            ("late_rescheduled", "Late Rescheduled"),
+                            (
+                                "free_feedback",
+                                "Initial Free Interviewer Feedback Submission for Client",
+                            ),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                ("log_count", models.PositiveIntegerField(default=0)),
+                (
+                    "client_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "interviewer_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "deductions",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Total late feedback submission deduction",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "paid_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Client amount paid for client rollups, interviewer amount paid for interviewer rollups",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "pending_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Client amount pending for client rollups, interviewer amount pending for interviewer rollups",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "client",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="finance_rollups",
+                        to="organizations.organization",
+                    ),
+                ),
+                (
+                    "interviewer",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="finance_rollups",
+                        to="dashboard.internalinterviewer",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("client", "billing_month", "reason"),
+                        name="unique_client_rollup_per_month_reason",
+                    ),
+                    models.UniqueConstraint(
+                        fields=("interviewer", "billing_month", "reason"),
+                        name="unique_interviewer_rollup_per_month_reason",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0138_financerollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InvoiceSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                ("financial_year", models.CharField(max_length=9, unique=True)),
+                ("last_number", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.AddField(
+            model_name="billingrecord",
+            name="invoice_generated_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Signifies invoice pdf generation time", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="billingrecord",
+            name="invoice_pdf",
+            field=models.FileField(blank=True, null=True, upload_to="invoices"),
+        ),
+        migrations.AddField(
+            model_name="billingrecord",
+            name="invoice_sent_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Signifies invoice email delivery time", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:45
+
+import dashboard.Models.Finance
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0139_billingrecord_invoice_pdf_invoicesequence"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="clientcredittransaction",
+            name="transaction_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("purchase", "Credit Purchase"),
+                    ("usage", "Interview Usage"),
+                    ("refund", "Refund"),
+                    ("manual", "Admin Added"),
+                    ("expiry", "Credit Expired"),
+                ],
+                max_length=15,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="clientcreditwallet",
+            name="credit_expired_at",
+            field=models.DateTimeField(
+                db_index=True,
+                default=dashboard.Models.Finance.default_credit_expiry,
+                help_text="Validity expired date",
+            ),
+        ),
+    ]
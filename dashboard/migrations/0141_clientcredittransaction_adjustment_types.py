@@ -0,0 +1,30 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0140_clientcreditwallet_expiry_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="clientcredittransaction",
+            name="transaction_type",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("purchase", "Credit Purchase"),
+                    ("usage", "Interview Usage"),
+                    ("refund", "Refund"),
+                    ("manual", "Admin Added"),
+                    ("expiry", "Credit Expired"),
+                    ("adjust_add", "Reconciliation Credit"),
+                    ("adjust_deduct", "Reconciliation Debit"),
+                ],
+                max_length=15,
+            ),
+        ),
+    ]
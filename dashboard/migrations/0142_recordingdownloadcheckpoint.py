@@ -0,0 +1,72 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0141_clientcredittransaction_adjustment_types"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecordingDownloadCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "file_type",
+                    models.CharField(
+                        choices=[("video", "Video"), ("transcript", "Transcript")],
+                        max_length=15,
+                    ),
+                ),
+                ("drive_file_id", models.CharField(max_length=255)),
+                ("total_size", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "md5_checksum",
+                    models.CharField(
+                        blank=True,
+                        help_text="Drive md5 of the file",
+                        max_length=32,
+                        null=True,
+                    ),
+                ),
+                (
+                    "bytes_downloaded",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Offset of the last chunk written to the staging file",
+                    ),
+                ),
+                (
+                    "staging_path",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "interview",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="download_checkpoints",
+                        to="dashboard.interview",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("interview", "file_type")},
+            },
+        ),
+    ]
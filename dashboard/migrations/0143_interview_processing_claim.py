@@ -0,0 +1,48 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0142_recordingdownloadcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interview",
+            name="processing_claim_token",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="processing_lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="The claim can be taken over by another worker after this time",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="interview",
+            name="processing_state",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("DWN", "Downloading Recording"),
+                    ("FBK", "Generating Feedback"),
+                ],
+                help_text="Pipeline currently holding a claim on this interview",
+                max_length=15,
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="interview",
+            index=models.Index(
+                fields=["processing_state", "processing_lease_expires_at"],
+                name="dashboard_i_process_cbee61_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0143_interview_processing_claim"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedbackGenerationCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "transcript_hash",
+                    models.CharField(help_text="sha256 of transcript", max_length=64),
+                ),
+                (
+                    "prompt_version",
+                    models.CharField(
+                        help_text="Version of the prompt and model that produced it",
+                        max_length=16,
+                    ),
+                ),
+                ("feedback", models.JSONField(default=dict)),
+            ],
+            options={
+                "unique_together": {("transcript_hash", "prompt_version")},
+            },
+        ),
+    ]
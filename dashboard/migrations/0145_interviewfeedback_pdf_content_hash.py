@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0144_feedbackgenerationcache"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="interviewfeedback",
+            name="pdf_content_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="sha256 of the report HTML the current pdf_file was rendered from",
+                max_length=64,
+                null=True,
+            ),
+        ),
+    ]
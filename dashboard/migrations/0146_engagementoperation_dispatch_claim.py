@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0145_interviewfeedback_pdf_content_hash"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="engagementoperation",
+            name="task_id",
+        ),
+        migrations.AddField(
+            model_name="engagementoperation",
+            name="delivery_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="engagementoperation",
+            name="dispatch_claim_token",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name="engagementoperation",
+            name="dispatch_lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Claimed for sending until, or next retry after a failed attempt",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="engagementoperation",
+            index=models.Index(
+                fields=["delivery_status", "date"],
+                name="dashboard_e_deliver_1f1adf_idx",
+            ),
+        ),
+    ]
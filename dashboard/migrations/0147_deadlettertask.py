@@ -0,0 +1,74 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0146_engagementoperation_dispatch_claim"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadLetterTask",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                ("task_name", models.CharField(db_index=True, max_length=255)),
+                (
+                    "task_id",
+                    models.CharField(help_text="Id of the failed run", max_length=255),
+                ),
+                ("args", models.JSONField(blank=True, default=list)),
+                ("kwargs", models.JSONField(blank=True, default=dict)),
+                (
+                    "options",
+                    models.JSONField(
+                        blank=True,
+                        default=dict,
+                        help_text="Chain and callbacks of the failed run, kept for the replay",
+                    ),
+                ),
+                ("exception", models.TextField(blank=True)),
+                ("traceback", models.TextField(blank=True)),
+                ("attempts", models.PositiveIntegerField(default=1)),
+                ("attempt_history", models.JSONField(blank=True, default=list)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PED", "Pending"),
+                            ("RPL", "Replayed"),
+                            ("DIS", "Discarded"),
+                        ],
+                        default="PED",
+                        max_length=3,
+                    ),
+                ),
+                ("replayed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "replay_task_id",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "task_name"],
+                        name="dashboard_d_status_3d34e5_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0148_resumeparsejob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ParsedResumeCache",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("archived", models.BooleanField(default=False)),
+                (
+                    "content_hash",
+                    models.CharField(help_text="sha256 of the file", max_length=64),
+                ),
+                (
+                    "parser_version",
+                    models.CharField(
+                        help_text="Version of the extraction limits, prompt and model",
+                        max_length=16,
+                    ),
+                ),
+                ("text", models.TextField()),
+                (
+                    "parsed",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Fields returned by the model, before cleanup",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("content_hash", "parser_version")},
+            },
+        ),
+    ]
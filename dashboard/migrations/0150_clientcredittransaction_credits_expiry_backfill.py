@@ -0,0 +1,54 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:30
+
+from datetime import timedelta
+from django.db import migrations, models
+from django.db.models import Max, Q
+
+
+def extend_credit_expiry_from_plan_validity(apps, schema_editor):
+    """
+    credit_expired_at was only ever set at wallet creation. Extend it to the last
+    purchase plus the plan's validity, so the expiry sweep does not zero wallets
+    whose purchased credits are still valid.
+    """
+    ClientCreditWallet = apps.get_model("dashboard", "ClientCreditWallet")
+
+    wallets = ClientCreditWallet.objects.filter(
+        pricing_plan__validity_days__gt=0
+    ).annotate(
+        last_purchased_at=Max(
+            "credit_transaction__created_at",
+            filter=Q(
+                credit_transaction__transaction_type__in=["purchase", "manual"],
+                credit_transaction__status="SUC",
+            ),
+        )
+    )
+    updated = []
+    for wallet in wallets.select_related("pricing_plan").iterator(chunk_size=500):
+        valid_from = wallet.last_purchased_at or wallet.created_at
+        expires_at = valid_from + timedelta(days=wallet.pricing_plan.validity_days)
+        if expires_at > wallet.credit_expired_at:
+            wallet.credit_expired_at = expires_at
+            updated.append(wallet)
+    ClientCreditWallet.objects.bulk_update(
+        updated, ["credit_expired_at"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0149_parsedresumecache"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="clientcredittransaction",
+            name="credits",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(
+            extend_credit_expiry_from_plan_validity, migrations.RunPython.noop
+        ),
+    ]
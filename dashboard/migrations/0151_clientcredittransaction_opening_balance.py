@@ -0,0 +1,63 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:45
+
+from django.db import migrations
+from django.db.models import Q, Sum
+
+
+def record_opening_balances(apps, schema_editor):
+    """
+    Wallets were created with free credits but no ledger entry, so every
+    reconciliation run reported them as drifted. Record the grant as an opening
+    balance, derived from the wallet counters rather than from the drift so
+    genuine drift is still reported.
+    """
+    ClientCreditWallet = apps.get_model("dashboard", "ClientCreditWallet")
+    ClientCreditTransaction = apps.get_model("dashboard", "ClientCreditTransaction")
+
+    wallets = (
+        ClientCreditWallet.objects.exclude(
+            credit_transaction__reference="opening_balance"
+        )
+        .annotate(
+            expired=Sum(
+                "credit_transaction__credits",
+                filter=Q(
+                    credit_transaction__transaction_type="expiry",
+                    credit_transaction__status="SUC",
+                ),
+                default=0,
+            )
+        )
+        .order_by("pk")
+    )
+    opening_balances = []
+    for wallet in wallets.iterator(chunk_size=500):
+        opening_balance = (
+            (wallet.total_credits or 0)
+            + wallet.total_spend
+            + wallet.expired
+            - wallet.total_added
+            - wallet.total_refunded
+        )
+        if opening_balance > 0:
+            opening_balances.append(
+                ClientCreditTransaction(
+                    wallet=wallet,
+                    credits=opening_balance,
+                    transaction_type="manual",
+                    description="Opening balance",
+                    reference="opening_balance",
+                )
+            )
+    ClientCreditTransaction.objects.bulk_create(opening_balances, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0150_clientcredittransaction_credits_expiry_backfill"),
+    ]
+
+    operations = [
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
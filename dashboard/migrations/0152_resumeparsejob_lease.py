@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-19 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0151_clientcredittransaction_opening_balance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumeparsejob",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="resumeparsejob",
+            name="lease_expires_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="A processing job past its lease is reclaimed",
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-19 15:10
+
+from datetime import timedelta
+from django.db import migrations
+from django.utils import timezone
+
+EXPIRY_GRACE_PERIOD = timedelta(days=30)
+
+
+def grant_expiry_grace_period(apps, schema_editor):
+    """
+    credit_expired_at was never enforced before the expiry sweep. Wallets without
+    a plan validity keep their creation + 15 days default, and wallets whose plan
+    validity lapsed long ago are past it as well, so the first sweep would zero
+    all of them at once. Every wallet already expired on deploy instead gets
+    EXPIRY_GRACE_PERIOD from the deploy date, so clients can use or top up their
+    credits before they expire. Wallets still within their validity are untouched.
+    """
+    ClientCreditWallet = apps.get_model("dashboard", "ClientCreditWallet")
+
+    now = timezone.now()
+    ClientCreditWallet.objects.filter(credit_expired_at__lte=now).update(
+        credit_expired_at=now + EXPIRY_GRACE_PERIOD
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("dashboard", "0152_resumeparsejob_lease"),
+    ]
+
+    operations = [
+        migrations.RunPython(grant_expiry_grace_period, migrations.RunPython.noop),
+    ]
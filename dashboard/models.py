@@ -23,10 +23,18 @@ from .Models import (
     BillingRecord,
     InterviewScheduleAttempt,
     BillingLog,
+    FinanceRollup,
+    InvoiceSequence,
     BillPayments,
     CreditPackage,
     CreditPackagePricing,
     ClientCreditWallet,
     ClientCreditTransaction,
     CandidateToInterviewerFeedback,
+    RecordingDownloadCheckpoint,
+    FeedbackGenerationCache,
+    DeadLetterTask,
+    ResumeParseJob,
+    ResumeParseFile,
+    ParsedResumeCache,
 )
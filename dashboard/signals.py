@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.dispatch import receiver
+from django.db.models.signals import pre_save, post_save, post_delete
+from .models import BillingLog
+
+
+@receiver(pre_save, sender=BillingLog)
+def billing_log_previous_rollup_bucket_signal(sender, instance, **kwargs):
+    # a changed owner or billing month moves the log out of its old buckets
+    instance._previous_rollup_key = (
+        BillingLog.objects.filter(pk=instance.pk)
+        .values_list("client_id", "interviewer_id", "billing_month")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=BillingLog)
+@receiver(post_delete, sender=BillingLog)
+def billing_log_finance_rollup_refresh_signal(sender, instance, **kwargs):
+    from services.finance_rollup import FinanceRollupService
+
+    previous_key = getattr(instance, "_previous_rollup_key", None)
+    transaction.on_commit(
+        lambda: FinanceRollupService.refresh_for_billing_logs(
+            [instance], [previous_key] if previous_key else ()
+        ),
+        robust=True,
+    )
@@ -1,26 +1,26 @@
 import os
-import requests
+import logging
+import redis
 from django.conf import settings
 from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.files.base import ContentFile
 from django.db import transaction
 from django.db.models import F
-from django.template.loader import render_to_string
 from django.utils import timezone
 from celery import shared_task, chain, group
 from celery.exceptions import Reject
 from django.conf import settings
-from django.utils.safestring import mark_safe
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
-from .models import EngagementOperation, Interview, InterviewFeedback, Candidate
-from externals.google.google_meet import download_from_google_drive
-from datetime import timedelta
-from externals.feedback.interview_feedback import (
-    analyze_transcription_and_generate_feedback,
-)
+from .models import Interview, InterviewFeedback, Candidate
+from services.recording_download import RecordingDownloadService
+from services.interview_processing import InterviewClaimService
+from services.interview_feedback import InterviewFeedbackService
+from services.mail_dispatcher import MailDispatcher
+from services.email_rendering import EmailRenderer
+from services.engagement_dispatch import EngagementEmailService
+from services.resume_parsing import ResumeParseJobService
+from datetime import date, timedelta
 from common import constants
-from hiringdogbackend.utils import get_display_name
+from hiringdogbackend.utils import get_display_name, log_action
 
 CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
 INTERVIEW_EMAIL = (
@@ -28,7 +28,7 @@ INTERVIEW_EMAIL = (
 )
 
 
-@shared_task(bind=True, max_retries=3, rate_limit="10/m")
+@shared_task(bind=True, max_retries=3, ignore_result=True)
 def send_mail(
     self,
     to,
@@ -46,32 +46,55 @@ def send_mail(
     }
 
     try:
-        content = render_to_string(template, context=context)
-        email_message = EmailMultiAlternatives(
-            subject,
-            "",
-            (
+        payload = {
+            "to": [to],
+            "subject": subject,
+            "html": EmailRenderer.render(template, context),
+            "from_email": (
                 INTERVIEW_EMAIL
                 if email_type and email_type in ["feedback_notification"]
                 else CONTACT_EMAIL
             ),
-            [to],
-            reply_to=reply_to if isinstance(reply_to, list) else [reply_to],
-            bcc=[bcc],
-        )
-        email_message.attach_alternative(content, "text/html")
-        for attachment in attachments:
-            email_message.attach(
-                attachment["filename"],
-                attachment["content"],
-                attachment.get("content_type", "application/octet-stream"),
+            "reply_to": reply_to if isinstance(reply_to, list) else [reply_to],
+            "bcc": [bcc] if bcc else [],
+            "attachments": attachments,
+        }
+        try:
+            countdown = MailDispatcher.enqueue(payload)
+        except (redis.RedisError, TypeError, ValueError) as e:
+            # an outbox outage or a message it can't store is sent right away
+            log_action(
+                f"Could not queue '{subject}' in the mail outbox, sending it directly: {str(e)}",
+                level=logging.WARNING,
             )
-        email_message.send(fail_silently=True)
+            MailDispatcher.send_now(payload)
+            return
     except Exception as exc:
-        raise self.retry(exc=exc, countdown=60, retry_jitter=True)
+        raise self.retry(exc=exc, countdown=60)
+
+    if countdown is not None:
+        flush_mail_outbox.apply_async(countdown=countdown)
+
+
+@shared_task(bind=True, max_retries=3)
+def flush_mail_outbox(self):
+    try:
+        report = MailDispatcher.flush()
+    except redis.RedisError as exc:
+        raise self.retry(exc=exc, countdown=settings.MAIL_BATCH_WINDOW_SECONDS)
 
+    if report["next_flush_in"] is not None:
+        flush_mail_outbox.apply_async(countdown=report["next_flush_in"])
+    return report
 
-@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=60, retry_jitter=True)
+
+@shared_task(
+    bind=True,
+    autoretry_for=(Exception,),
+    retry_backoff=60,
+    retry_jitter=True,
+    ignore_result=True,
+)
 def send_email_to_multiple_recipients(
     self,
     contexts,
@@ -83,6 +106,7 @@ def send_email_to_multiple_recipients(
     **kwargs,
 ):
     emails = []
+    templates = []
 
     with get_connection() as connection:
         for context in contexts:
@@ -107,8 +131,6 @@ def send_email_to_multiple_recipients(
             if not email_address:
                 continue
 
-            html_content = render_to_string(template, context)
-
             email = EmailMultiAlternatives(
                 subject=subject,
                 body="This is an HTML email. Please view it in an HTML-compatible email client.",
@@ -124,54 +146,55 @@ def send_email_to_multiple_recipients(
                     attachment["content"],
                     attachment.get("content_type", "application/octet-stream"),
                 )
-            email.attach_alternative(html_content, "text/html")
             emails.append(email)
+            templates.append((template, context))
+
+        # shared parts of every template are rendered once for the whole batch
+        for email, html_content in zip(emails, EmailRenderer.render_batch(templates)):
+            email.attach_alternative(html_content, "text/html")
 
         if emails:
             connection.send_messages(emails)
 
 
-@shared_task(bind=True, max_retries=4)
-def send_schedule_engagement_email(self, engagement_operation_id):
+@shared_task(ignore_result=True)
+def send_schedule_engagement_email(engagement_operation_id):
+    """
+    Kept registered for ETA messages queued before the due-queue. Those
+    operations are sent by dispatch_due_engagement_emails like any other.
+    """
+
+
+@shared_task
+def dispatch_due_engagement_emails():
+    batches = 0
+    for operation_ids, token, eta in EngagementEmailService.iter_due_batches():
+        send_engagement_emails.apply_async((operation_ids, token), eta=eta)
+        batches += 1
+    return batches
+
+
+@shared_task
+def send_engagement_emails(operation_ids, claim_token):
+    return EngagementEmailService.send(operation_ids, claim_token)
+
+
+@shared_task(ignore_result=True)
+def requeue_engagement_operations(operation_ids):
+    EngagementEmailService.requeue(operation_ids)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=3)
+def parse_resume_job(self, job_id):
     try:
-        engagement_operation_obj = (
-            EngagementOperation.objects.select_related(
-                "template", "engagement", "engagement__candidate"
-            )
-            .only(
-                "template__subject",
-                "template__template_html_content",
-                "engagement__candidate__email",
-                "engagement__candidate_email",
-            )
-            .get(pk=engagement_operation_id)
-        )
+        ResumeParseJobService.run(job_id)
+    except Exception as exc:
+        raise self.retry(exc=exc, countdown=60)
 
-        email = EmailMultiAlternatives(
-            subject=engagement_operation_obj.template.subject,
-            body="This is an email.",
-            from_email=CONTACT_EMAIL,
-            to=[
-                getattr(
-                    engagement_operation_obj.engagement.candidate,
-                    "email",
-                    engagement_operation_obj.engagement.candidate_email,
-                )
-            ],
-        )
-        email.attach_alternative(
-            mark_safe(engagement_operation_obj.template.template_html_content),
-            "text/html",
-        )
-        email.send()
-        engagement_operation_obj.delivery_status = "SUC"
-        engagement_operation_obj.save()
-    except Exception as e:
-        engagement_operation_obj.delivery_status = "FLD"
-        engagement_operation_obj.save()
-        if self.request.revoked:
-            raise Ignore()
-        raise self.retry(exec=e, countdown=60)
+
+@shared_task(ignore_result=True)
+def reclaim_resume_parse_jobs():
+    return ResumeParseJobService.reclaim_stale()
 
 
 @shared_task
@@ -184,37 +207,61 @@ def fetch_interview_records():
         downloaded=False,
         scheduled_service_account_event_id__isnull=False,
         no_of_time_processed__lte=3,
-    ).values_list("id", "scheduled_service_account_event_id")
-    return list(interview_qs)
+    )
+    # interviews still being downloaded by an earlier dispatch are skipped
+    interview_ids, claim_token = InterviewClaimService.claim(
+        interview_qs, "DWN", settings.INTERVIEW_PROCESSING_BATCH_SIZE
+    )
+    return [
+        [interview_id, event_id, claim_token]
+        for interview_id, event_id in Interview.objects.filter(
+            id__in=interview_ids
+        ).values_list("id", "scheduled_service_account_event_id")
+    ]
 
 
-@shared_task(bind=True, retry_backoff=10, max_retries=3)
+@shared_task(
+    bind=True,
+    retry_backoff=10,
+    retry_backoff_max=600,
+    max_retries=5,
+    ignore_result=True,
+    dead_letter=True,
+)
 def download_recordings_from_google_drive(self, interview_info):
-    if not interview_info or len(interview_info) != 2:
+    if not interview_info or len(interview_info) not in (2, 3):
         raise Reject("Missing or invalid interview info")
-    interview_id, event_id = interview_info
+    interview_id, event_id, *claim_token = interview_info
+    claim_token = claim_token[0] if claim_token else None
     try:
-        download_recording_info, reason = download_from_google_drive(
+        # resumes from the checkpoint left by a previous attempt
+        download_recording_info, reason = RecordingDownloadService.download(
             interview_id, event_id
         )
         if not download_recording_info:
             Interview.objects.filter(pk=interview_id).update(
                 no_of_time_processed=F("no_of_time_processed") + 1
             )
+            InterviewClaimService.release(interview_id, claim_token)
             raise Reject(
                 f"Failed to download recordings for Interview {interview_id} for this reason: {reason}"
             )
+        download_recording_info["claim_token"] = claim_token
         return download_recording_info
     except Reject:
         raise
     except Exception as e:
-        print(
-            f"Exception occured in download_recordings_from_google_drive:{interview_id} - {str(e)}"
+        log_action(
+            f"Failed to download recordings of interview {interview_id}: {str(e)}",
+            level=logging.WARNING,
+            interview_id=interview_id,
+            task_id=self.request.id,
+            retries=self.request.retries,
         )
         raise self.retry(exc=e)
 
 
-@shared_task
+@shared_task(ignore_result=True, dead_letter=True)
 def store_recordings(recording_info):
     try:
         interview = Interview.objects.get(pk=recording_info["interview_id"])
@@ -223,6 +270,13 @@ def store_recordings(recording_info):
     files_to_delete = []
     with transaction.atomic():
         for file_type, file in recording_info["files"].items():
+            if file.get("stored"):
+                # streamed straight into storage, only the name needs recording
+                if file_type == "video":
+                    interview.recording.name = file["name"]
+                elif file_type == "transcript":
+                    interview.transcription.name = file["name"]
+                continue
             try:
                 with open(file["path"], "rb") as f:
                     if file_type == "video":
@@ -248,10 +302,11 @@ def store_recordings(recording_info):
         if os.path.exists(file_path):
             os.remove(file_path)
 
+    InterviewClaimService.release(interview.id, recording_info.get("claim_token"))
     return interview.id
 
 
-@shared_task(bind=True)
+@shared_task(bind=True, ignore_result=True)
 def process_interview_recordings(self, interview_record_ids):
     if not interview_record_ids:
         raise Reject("No interviews to process")
@@ -266,7 +321,7 @@ def process_interview_recordings(self, interview_record_ids):
     group(*tasks).apply_async()
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def trigger_interview_processing():
     chain(fetch_interview_records.s(), process_interview_recordings.s()).apply_async()
 
@@ -274,28 +329,26 @@ def trigger_interview_processing():
 @shared_task(bind=True, retry_backoff=5, max_retries=3)
 def process_interview_video_and_generate_and_store_feedback(self):
     """Main orchestrator - delegates work to individual processors"""
-    interviews = (
-        Interview.objects.filter(
-            transcription__isnull=False, interview_feedback__isnull=True
-        )
-        .exclude(transcription="")
-        .only("id")
-    )
+    interviews = Interview.objects.filter(
+        transcription__isnull=False, interview_feedback__isnull=True
+    ).exclude(transcription="")
 
-    if not interviews.exists():
+    # interviews whose feedback is still being generated are skipped
+    interview_ids, claim_token = InterviewClaimService.claim(
+        interviews, "FBK", settings.INTERVIEW_PROCESSING_BATCH_SIZE
+    )
+    if not interview_ids:
         return "No interviews to process"
 
     # Process each interview asynchronously
-    job_ids = [
-        process_single_interview.delay(interview.id).id for interview in interviews
-    ]
-    interview_ids = [interview.id for interview in interviews]
+    for interview_id in interview_ids:
+        process_single_interview.delay(interview_id, claim_token)
 
-    return f"Dispatched {len(job_ids)} interview processing jobs for interviews: {interview_ids} with job IDs: {job_ids}"
+    return {"dispatched": len(interview_ids)}
 
 
-@shared_task(bind=True, retry_backoff=10, max_retries=2)
-def process_single_interview(self, interview_id):
+@shared_task(bind=True, retry_backoff=10, max_retries=2, ignore_result=True)
+def process_single_interview(self, interview_id, claim_token=None):
     """Process individual interview - isolated failure handling"""
     try:
         interview = Interview.objects.only("id", "transcription").get(id=interview_id)
@@ -304,27 +357,38 @@ def process_single_interview(self, interview_id):
         with interview.transcription.open("r") as f:
             file_content = f.read()
 
-        extracted_data = analyze_transcription_and_generate_feedback(file_content)
+        # served from the feedback cache on retries and re-runs
+        extracted_data = InterviewFeedbackService.generate(file_content)
 
         # Store feedback
         InterviewFeedback.objects.update_or_create(
             interview_id=interview.id, defaults={**extracted_data}
         )
 
+        InterviewClaimService.release(interview_id, claim_token)
+
         # Dispatch email notifications asynchronously
         send_interview_notifications.delay(interview_id)
 
         return f"Successfully processed interview {interview_id}"
 
     except Interview.DoesNotExist:
+        InterviewClaimService.release(interview_id, claim_token)
         return f"Interview {interview_id} not found"
     except Exception as e:
-        # Log the error properly in production
-        print(f"Failed to process interview {interview_id}: {str(e)}")
+        log_action(
+            f"Failed to process interview {interview_id}: {str(e)}",
+            level=logging.WARNING,
+            interview_id=interview_id,
+            task_id=self.request.id,
+            retries=self.request.retries,
+        )
         raise self.retry(countdown=60, exc=e)
 
 
-@shared_task(bind=True, retry_backoff=5, max_retries=3)
+@shared_task(
+    bind=True, retry_backoff=5, max_retries=3, ignore_result=True, dead_letter=True
+)
 def send_interview_notifications(self, interview_id):
     """Handle email notifications separately - non-blocking"""
     try:
@@ -382,57 +446,45 @@ def send_interview_notifications(self, interview_id):
         return f"Notifications sent for interview {interview_id}"
 
     except Exception as e:
-        print(f"Failed to send notifications for interview {interview_id}: {str(e)}")
+        log_action(
+            f"Failed to send notifications for interview {interview_id}: {str(e)}",
+            level=logging.WARNING,
+            interview_id=interview_id,
+            task_id=self.request.id,
+            retries=self.request.retries,
+        )
         raise self.retry(countdown=30, exc=e)
 
 
-@shared_task(bind=True, retry_backoff=5, max_retries=3)
+@shared_task(bind=True, retry_backoff=5, max_retries=3, ignore_result=True)
 def generate_interview_feedback_pdf(self, interview_uid):
-    from dashboard.Serializers.InterviewerSerializers import InterviewFeedbackSerializer
-
-    interview_feedback = (
-        InterviewFeedback.objects.filter(interview_id=interview_uid)
-        .select_related(
-            "interview",
-            "interview__candidate",
-            "interview__candidate__designation__job_role",
-            "interview__interviewer",
-        )
-        .first()
-    )
-    serializer = InterviewFeedbackSerializer(interview_feedback)
-    interview_uid = urlsafe_base64_encode(
-        force_bytes(f"interview_id:{interview_feedback.interview.id}")
-    )
-    data = serializer.data
-    data["url"] = f"{interview_uid}"
-    response = requests.post(
-        "http://localhost:3000/generate-pdf", json=data, stream=True
-    )
-    if response.status_code == 200:
-        candidate = interview_feedback.interview.candidate
-        designation = get_display_name(
-            candidate.designation.job_role.name, constants.ROLE_CHOICES
-        )
-        save_path = f"/tmp/{candidate.name}_{designation}_Feedback_Round 1_{timezone.now().strftime('%Y%m%d-%H%M%S')}.pdf"
-        with open(save_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        with open(save_path, "rb") as f:
-            interview_feedback.pdf_file.save(
-                f"{candidate.name}_{designation}_Feedback_Round 1_{timezone.now().strftime('%Y%m%d-%H%M%S')}.pdf",
-                f,
-            )
-        if os.path.exists(save_path):
-            os.remove(save_path)
-        return "Successfully Saved"
-    else:
-        error_message = response.content.decode("utf-8")
-        print(f"Failed to generate PDF: {error_message}")
-        self.retry(exc=Exception("Failed to generate PDF"))
+    from services.feedback_report import FeedbackReportService
+
+    summary = FeedbackReportService.render_reports([interview_uid])
+    if summary["failed"]:
+        raise self.retry(exc=Exception("Failed to generate PDF"))
+    return "Successfully Saved" if summary["rendered"] else "Report unchanged"
 
 
 @shared_task(bind=True, retry_backoff=5, max_retries=3)
+def generate_interview_feedback_pdfs(self, interview_ids, force=False):
+    """Render many feedback reports in one task on the warm renderer pool"""
+    from services.feedback_report import FeedbackReportService
+
+    summary = FeedbackReportService.render_reports(interview_ids, force=force)
+    if summary["failed"]:
+        # only the failed reports are retried, the rest are already rendered
+        raise self.retry(
+            args=(summary["failed"],),
+            kwargs={"force": force},
+            exc=Exception(f"Failed to generate PDFs for {summary['failed']}"),
+        )
+    return f"Feedback reports: {summary}"
+
+
+@shared_task(
+    bind=True, retry_backoff=5, max_retries=3, ignore_result=True, dead_letter=True
+)
 def send_scheduling_link_to_candidate(self, candidate_id):
     from services.interview_scheduling import CandidateInterviewSchedulingService
 
@@ -469,3 +521,68 @@ def send_scheduling_link_to_candidate(self, candidate_id):
     send_mail.delay(**context)
 
     return f"Sent scheduling link to {candidate.name} for {candidate.organization.name}"
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_monthly_invoices(self, billing_month=None):
+    """billing_month is an ISO date string, defaults to the previous month"""
+    from services.invoice_generation import InvoiceGenerationService
+
+    if billing_month:
+        billing_month = date.fromisoformat(billing_month).replace(day=1)
+    else:
+        billing_month = (
+            timezone.localdate().replace(day=1) - timedelta(days=1)
+        ).replace(day=1)
+
+    # every stage resumes from the records it has not finished yet
+    countdown = 60 * 2**self.request.retries
+    try:
+        summary = InvoiceGenerationService.run(billing_month)
+    except Exception as e:
+        raise self.retry(exc=e, countdown=countdown)
+
+    if summary["render_failed"] or summary["send_failed"]:
+        raise self.retry(
+            exc=Exception(
+                f"Invoice generation incomplete for {billing_month}: {summary}"
+            ),
+            countdown=countdown,
+        )
+    return f"Invoices generated for {billing_month}: {summary}"
+
+
+@shared_task
+def expire_client_credits():
+    from services.credit_expiry import CreditExpiryService
+
+    expired = CreditExpiryService.expire_credits()
+    return f"Expired credits of {expired} client wallets"
+
+
+@shared_task
+def reconcile_client_credit_wallets(correct=False):
+    from services.credit_reconciliation import CreditReconciliationService
+
+    report = CreditReconciliationService.reconcile(correct=correct)
+    if report:
+        log_action(
+            f"Credit wallet drift found in {len(report)} wallets",
+            level=logging.WARNING,
+            drift_report=report,
+        )
+    return f"Reconciled credit wallets, {len(report)} drifted"
+
+
+@shared_task
+def audit_result_backend():
+    from services.result_backend_audit import ResultBackendAuditService
+
+    return ResultBackendAuditService.audit()
+
+
+@shared_task(ignore_result=True)
+def export_task_metrics():
+    from hiringdogbackend.celery_metrics import TaskMetrics
+
+    TaskMetrics.write_metrics_file()
@@ -1,6 +1,7 @@
 from dashboard.Views import (
     ClientUserView,
     ResumeParserView,
+    ResumeParseJobView,
     InternalClientView,
     InternalClientDetailsView,
     InterviewerView,
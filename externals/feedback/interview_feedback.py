@@ -1,6 +1,10 @@
+import re
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 import google.generativeai as genai
+from externals.gemini_rate_limiter import generate_content, PRIORITY_BATCH
 
 # import assemblyai as aai
 
@@ -22,12 +26,9 @@ genai.configure(api_key=settings.GOOGLE_API_KEY)
 #         return None
 
 
-def analyze_transcription_and_generate_feedback(transcription):
-    """
-    Analyze the transcription and generate feedback for all questions in a single API request.
-    Group questions by skills.
-    """
-    prompt = f"""
+FEEDBACK_MODEL = "gemini-2.0-flash-thinking-exp-01-21"
+
+FEEDBACK_PROMPT = """
         Below is a transcription of an interview. Perform the following tasks:
 
         1. Extract the interviewer's questions and the candidate's answers:
@@ -90,26 +91,237 @@ def analyze_transcription_and_generate_feedback(transcription):
 
         Transcription:
         {transcription}
-    """
+"""
+
+FEEDBACK_MAP_PROMPT = """
+        Below is part {part} of {total_parts} of an interview transcription. Extract the
+        interviewer's questions and the candidate's answers from this part only:
+            - Ignore filler words like "okay," "hmm," "uh," etc., unless part of a meaningful question/answer.
+            - Skip any exchange where the question is filler or the answer is too short, incomplete, or irrelevant.
+            - Categorize each question under a generalized skill category (e.g., Python, AI, JavaScript, Machine Learning, etc.).
+            - Include start and end timestamps in seconds relative to the start of the interview, using the timestamps in the transcription.
+            - An exchange cut off at the start or end of this part should still be included with what is available.
+
+        Also note briefly how the candidate communicates and their attitude in this part.
+
+        Output STRICTLY in the following JSON structure:
+        {{
+            "questions": [
+                {{
+                    "skill": "Skill name (e.g., Python, JavaScript)",
+                    "que": "Meaningful interviewer's question (up to 900 characters).",
+                    "ans": "Meaningful candidate's answer (up to 4000 characters).",
+                    "start_time": "Start time in seconds.",
+                    "end_time": "End time in seconds."
+                }}
+            ],
+            "observations": "Communication and attitude notes for this part (up to 400 characters)."
+        }}
+
+        Return ONLY valid JSON. No extra text, titles, explanations, or notes outside JSON.
+
+        Transcription part:
+        {transcription}
+"""
+
+FEEDBACK_REDUCE_PROMPT = """
+        Below are the question-answer pairs extracted from every part of an interview,
+        each with an id, followed by observations on the candidate from every part.
+        Perform the following tasks:
+
+        1. Merge skill categories that mean the same thing into one generalized skill name
+           and assign every question id to exactly one skill.
+
+        2. For each skill category:
+            - Summarize the candidate's performance concisely (word limit: 900 characters).
+
+        3. Provide an overall evaluation:
+            - Candidate strengths (word limit: 400 characters).
+            - Points of improvement (word limit: 400 characters).
+
+        4. Additionally, rate the candidate on:
+            - Communication: Choose one — poor, average, good, excellent.
+            - Attitude: Choose one — poor, average, good, excellent.
+
+        Output STRICTLY in the following JSON structure:
+        {{
+            "skills": {{
+                "skill_name (e.g., Python, JavaScript)": {{
+                    "summary": "Concise skill-specific feedback (up to 900 characters).",
+                    "question_ids": [1, 2]
+                }}
+            }},
+            "skill_evaluation": {{
+                "Communication": "poor/average/good/excellent",
+                "Attitude": "poor/average/good/excellent"
+            }},
+            "strength": "Overall strengths (if available, up to 400 characters).",
+            "improvement_points": "Improvement areas (if available, up to 400 characters)."
+        }}
+
+        Return ONLY valid JSON. No extra text, titles, explanations, or notes outside JSON.
+
+        Question-answer pairs:
+        {questions}
+
+        Observations:
+        {observations}
+"""
+
+# cached feedback is keyed by this version, so editing a prompt, the window size or
+# switching the model invalidates it automatically
+FEEDBACK_PROMPT_VERSION = hashlib.sha256(
+    f"{FEEDBACK_MODEL}:{settings.FEEDBACK_TRANSCRIPT_WINDOW_CHARS}:"
+    f"{FEEDBACK_PROMPT}{FEEDBACK_MAP_PROMPT}{FEEDBACK_REDUCE_PROMPT}".encode()
+).hexdigest()[:16]
+
+# a new speaker turn starts at "Name: ..." or at a bare "00:12:30" timestamp line
+TURN_START_PATTERN = re.compile(r"^(?:\d{1,2}:\d{2}(?::\d{2})?\s*$|[^:\n]{1,80}:\s)")
+TIMESTAMP_PATTERN = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?\s*$")
+
+
+class FeedbackGenerationError(Exception):
+    pass
+
+
+def _generate_json(prompt):
+    # batch priority: feedback only uses quota the interactive endpoints leave over
+    response = generate_content(FEEDBACK_MODEL, prompt, PRIORITY_BATCH)
+
+    # Clean the response text
+    response_text = response.text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text[7:-3].strip()
 
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp-01-21")
-        response = model.generate_content(prompt)
-
-        # Clean the response text
-        response_text = response.text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:-3].strip()
-
-        # Parse the JSON response
-        data = json.loads(response_text)
-        return data
-    except json.JSONDecodeError:
-        print(
-            "The API response is not valid JSON. Please check the prompt or API output."
+        return json.loads(response_text)
+    except json.JSONDecodeError as e:
+        raise FeedbackGenerationError(
+            f"The API response is not valid JSON: {response_text[:500]}"
+        ) from e
+
+
+def split_transcript(transcription, window_chars):
+    """
+    Split the transcription into windows of whole speaker turns. Each window
+    after the first starts with the last timestamp seen before it, so the model
+    can still place its questions in time.
+    """
+    turns, current = [], []
+    for line in transcription.splitlines(keepends=True):
+        if current and TURN_START_PATTERN.match(line):
+            turns.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        turns.append("".join(current))
+
+    windows, window, window_size, last_timestamp = [], [], 0, None
+    for turn in turns:
+        # a single turn longer than the window is cut into window sized pieces
+        pieces = [turn[i : i + window_chars] for i in range(0, len(turn), window_chars)]
+        for piece in pieces:
+            if window and window_size + len(piece) > window_chars:
+                windows.append("".join(window))
+                window = [f"{last_timestamp}\n"] if last_timestamp else []
+                window_size = 0
+            window.append(piece)
+            window_size += len(piece)
+        if TIMESTAMP_PATTERN.match(turn.strip()):
+            last_timestamp = turn.strip()
+    if window:
+        windows.append("".join(window))
+    return windows
+
+
+def _reduce_feedback(extractions):
+    questions = []
+    for extraction in extractions:
+        for question in extraction.get("questions", []):
+            questions.append({"id": len(questions) + 1, **question})
+    observations = [
+        extraction["observations"]
+        for extraction in extractions
+        if extraction.get("observations")
+    ]
+
+    reduced = _generate_json(
+        FEEDBACK_REDUCE_PROMPT.format(
+            questions=json.dumps(
+                [
+                    {
+                        "id": question["id"],
+                        "skill": question.get("skill"),
+                        "que": question.get("que"),
+                        "ans": question.get("ans"),
+                    }
+                    for question in questions
+                ],
+                ensure_ascii=False,
+            ),
+            observations="\n".join(observations),
+        )
+    )
+
+    questions_by_id = {question["id"]: question for question in questions}
+    skill_based_performance = {}
+    for skill, skill_data in reduced.get("skills", {}).items():
+        skill_based_performance[skill] = {
+            "summary": skill_data.get("summary", ""),
+            "questions": [
+                {
+                    key: value
+                    for key, value in questions_by_id.pop(question_id).items()
+                    if key in ("que", "ans", "start_time", "end_time")
+                }
+                for question_id in skill_data.get("question_ids", [])
+                if question_id in questions_by_id
+            ],
+        }
+    # questions the reduce step left out stay under the skill they were extracted with
+    for question in questions_by_id.values():
+        skill_based_performance.setdefault(
+            question.get("skill") or "General", {"summary": "", "questions": []}
+        )["questions"].append(
+            {
+                key: value
+                for key, value in question.items()
+                if key in ("que", "ans", "start_time", "end_time")
+            }
+        )
+
+    return {
+        "skill_based_performance": skill_based_performance,
+        "skill_evaluation": reduced.get("skill_evaluation", {}),
+        "strength": reduced.get("strength", ""),
+        "improvement_points": reduced.get("improvement_points", ""),
+    }
+
+
+def analyze_transcription_and_generate_feedback(transcription):
+    """
+    Analyze the transcription and generate feedback grouped by skills. Transcripts
+    that fit in one window are analyzed in a single API request; longer ones are
+    split on speaker turns, the question-answer pairs of every window are
+    extracted in parallel and a final request merges them into the feedback.
+    Raises FeedbackGenerationError when the model output can't be used.
+    """
+    windows = split_transcript(transcription, settings.FEEDBACK_TRANSCRIPT_WINDOW_CHARS)
+    if len(windows) <= 1:
+        return _generate_json(FEEDBACK_PROMPT.format(transcription=transcription))
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(windows), settings.FEEDBACK_MAX_PARALLEL_WINDOWS)
+    ) as executor:
+        extractions = list(
+            executor.map(
+                _generate_json,
+                [
+                    FEEDBACK_MAP_PROMPT.format(
+                        part=index + 1, total_parts=len(windows), transcription=window
+                    )
+                    for index, window in enumerate(windows)
+                ],
+            )
         )
-        print("Raw API Response:", response_text)
-        return None
-    except Exception as e:
-        print(f"An error occurred while analyzing the transcription: {e}")
-        return None
+    return _reduce_feedback(extractions)
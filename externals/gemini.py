@@ -3,15 +3,16 @@ import logging
 import google.generativeai as genai
 from django.conf import settings
 from hiringdogbackend.utils import log_action
+from .gemini_rate_limiter import generate_content, PRIORITY_INTERACTIVE
 
 genai.configure(api_key=settings.GOOGLE_API_KEY)
 
+JD_MODEL = "gemini-1.5-flash"
+
 
 def generate_job_description(job_details):
     """Generate a high-quality job description using Gemini API."""
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
         prompt = f"""
         You are a hiring expert helping startups and enterprises draft clear, structured, and professional job descriptions.
 
@@ -34,7 +35,7 @@ def generate_job_description(job_details):
         Now generate the JD.
         """
 
-        response = model.generate_content(prompt)
+        response = generate_content(JD_MODEL, prompt, PRIORITY_INTERACTIVE)
         return response.text.strip()
     except Exception as e:
         log_action(f"Error generating JD: {str(e)}", level=logging.ERROR)
@@ -44,8 +45,6 @@ def generate_job_description(job_details):
 def generate_questionnaire(job_details):
     """Generates technical questions for all difficulty levels with a single API call."""
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
         prompt = f"""
         You are an AI that generates technical interview questions.
 
@@ -75,7 +74,7 @@ def generate_questionnaire(job_details):
         - Do not repeat questions across levels
         """
 
-        response = model.generate_content(prompt)
+        response = generate_content(JD_MODEL, prompt, PRIORITY_INTERACTIVE)
         text = response.text.strip()
 
         try:
@@ -0,0 +1,202 @@
+import math
+import time
+import uuid
+import logging
+import redis
+import google.generativeai as genai
+from contextlib import contextmanager
+from django.conf import settings
+from google.api_core.exceptions import ResourceExhausted
+from hiringdogbackend.utils import log_action
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_STANDARD = "standard"
+PRIORITY_BATCH = "batch"
+
+# Token bucket and in-flight leases of one model, updated atomically.
+# A priority class may only take a token while more than its reserve is left, and
+# only hold up to its own share of the in-flight slots, so lower priorities back
+# off first and the reserve stays available to interactive callers.
+# Returns {granted, wait_ms}; wait_ms is -1 when the concurrency cap is hit.
+ACQUIRE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local max_concurrency = tonumber(ARGV[4])
+local lease_ms = tonumber(ARGV[5])
+local lease_id = ARGV[6]
+
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local tokens = tonumber(redis.call("HGET", KEYS[1], "tokens"))
+local updated_at = tonumber(redis.call("HGET", KEYS[1], "updated_at"))
+if tokens == nil or updated_at == nil then
+    tokens = capacity
+    updated_at = now
+end
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+
+redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", now)
+local granted = 0
+local wait_ms = 0
+if redis.call("ZCARD", KEYS[2]) >= max_concurrency then
+    wait_ms = -1
+elseif tokens - 1 < reserve then
+    wait_ms = math.ceil((reserve + 1 - tokens) / rate)
+else
+    tokens = tokens - 1
+    granted = 1
+    redis.call("ZADD", KEYS[2], now + lease_ms, lease_id)
+end
+
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate) + 60000)
+redis.call("PEXPIRE", KEYS[2], lease_ms + 60000)
+return {granted, wait_ms}
+"""
+
+
+class GeminiRateLimitExceeded(Exception):
+    pass
+
+
+class GeminiRateLimiter:
+    """
+    Host independent limiter for Gemini calls backed by Redis. Every model has a
+    requests-per-minute token bucket and a cap on in-flight requests, shared by
+    the web and worker processes. Callers wait for a token until their deadline.
+    """
+
+    KEY_PREFIX = "gemini_rate_limit"
+    CONCURRENCY_POLL_INTERVAL = 0.25
+
+    def __init__(self):
+        self._client = None
+        self._acquire_script = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.GEMINI_RATE_LIMIT_REDIS_URL,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+            )
+            self._acquire_script = self._client.register_script(ACQUIRE_SCRIPT)
+        return self._client
+
+    @staticmethod
+    def get_quota(model_name):
+        return {
+            **settings.GEMINI_DEFAULT_QUOTA,
+            **settings.GEMINI_MODEL_QUOTAS.get(model_name, {}),
+        }
+
+    def _try_acquire(self, model_name, priority, lease_id):
+        quota = self.get_quota(model_name)
+        capacity = quota["rpm"]
+        reserve = settings.GEMINI_PRIORITY_RESERVE[priority]
+        # in-flight slots are reserved like tokens, a long batch run can't fill them
+        max_concurrency = max(
+            quota["concurrency"] - math.ceil(quota["concurrency"] * reserve), 1
+        )
+        client = self.client
+        granted, wait_ms = self._acquire_script(
+            keys=[
+                f"{self.KEY_PREFIX}:bucket:{model_name}",
+                f"{self.KEY_PREFIX}:inflight:{model_name}",
+            ],
+            args=[
+                capacity,
+                capacity / 60000,
+                capacity * reserve,
+                max_concurrency,
+                settings.GEMINI_REQUEST_LEASE_SECONDS * 1000,
+                lease_id,
+            ],
+            client=client,
+        )
+        return bool(granted), int(wait_ms)
+
+    def record(self, model_name, priority, metric, value=1):
+        try:
+            self.client.hincrby(
+                f"{self.KEY_PREFIX}:metrics:{model_name}", f"{priority}:{metric}", value
+            )
+        except redis.RedisError:
+            pass
+
+    def get_metrics(self, model_name):
+        """Counters per priority: granted, timed_out, throttled_by_api, wait_ms"""
+        metrics = {}
+        for field, value in self.client.hgetall(
+            f"{self.KEY_PREFIX}:metrics:{model_name}"
+        ).items():
+            priority, metric = field.decode().split(":", 1)
+            metrics.setdefault(priority, {})[metric] = int(value)
+        return metrics
+
+    @contextmanager
+    def acquire(self, model_name, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Wait until the model has quota for this priority or the deadline passes.
+        When Redis is unreachable the call goes through unthrottled, so an outage
+        of the limiter never takes the user facing endpoints down with it.
+        """
+        if timeout is None:
+            timeout = settings.GEMINI_PRIORITY_TIMEOUTS[priority]
+        deadline = time.monotonic() + timeout
+        started_at = time.monotonic()
+        lease_id = uuid.uuid4().hex
+
+        try:
+            while True:
+                granted, wait_ms = self._try_acquire(model_name, priority, lease_id)
+                if granted:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.record(model_name, priority, "timed_out")
+                    raise GeminiRateLimitExceeded(
+                        f"No {model_name} quota for {priority} request within {timeout}s"
+                    )
+                wait = self.CONCURRENCY_POLL_INTERVAL if wait_ms < 0 else wait_ms / 1000
+                time.sleep(min(max(wait, 0.01), remaining))
+        except redis.RedisError as e:
+            log_action(
+                f"Gemini rate limiter unavailable, calling {model_name} unthrottled: {str(e)}",
+                level=logging.WARNING,
+            )
+            lease_id = None
+        else:
+            self.record(model_name, priority, "granted")
+            self.record(
+                model_name,
+                priority,
+                "wait_ms",
+                int((time.monotonic() - started_at) * 1000),
+            )
+
+        try:
+            yield
+        except ResourceExhausted:
+            self.record(model_name, priority, "throttled_by_api")
+            raise
+        finally:
+            if lease_id:
+                try:
+                    self.client.zrem(
+                        f"{self.KEY_PREFIX}:inflight:{model_name}", lease_id
+                    )
+                except redis.RedisError:
+                    pass
+
+
+gemini_rate_limiter = GeminiRateLimiter()
+
+
+def generate_content(model_name, prompt, priority=PRIORITY_INTERACTIVE, timeout=None):
+    """GenerativeModel(model_name).generate_content(prompt) under the shared limiter"""
+    with gemini_rate_limiter.acquire(model_name, priority, timeout):
+        return genai.GenerativeModel(model_name).generate_content(prompt)
@@ -1,8 +1,14 @@
-import time
+import threading
+import httplib2
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 from django.conf import settings
+from hiringdogbackend.utils import concurrency_slot
 
 SCOPES = [
     "https://www.googleapis.com/auth/calendar",
@@ -16,6 +22,11 @@ IMPERSONATE_USER = (
     else "interview@hdiplatform.in"
 )
 
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+PARALLEL_RANGE_SIZE = 8 * 1024 * 1024
+
+_thread_local = threading.local()
+
 credentials = service_account.Credentials.from_service_account_file(
     settings.GOOGLE_SERVICE_ACCOUNT_CRED, scopes=SCOPES
 )
@@ -132,31 +143,8 @@ def get_meeting_info(event_id):
     return event
 
 
-def download_file(file_id, mime_type=None, save_path=None):
-    if mime_type:
-        request = drive_service.files().export_media(fileId=file_id, mimeType=mime_type)
-    else:
-        request = drive_service.files().get_media(fileId=file_id)
-
-    # instead of reading the cotent directly to ram we save it in temp file by reading chunk of data size 4MB using resumable download which help to resume if download fails in the middle
-    with open(save_path, "ab") as file:
-        downloader = MediaIoBaseDownload(
-            fd=file, request=request, chunksize=4 * 1024 * 1024
-        )
-        done = False
-        while not done:
-            try:
-                status, done = downloader.next_chunk()  # Resume if interrupted
-                print(f"Download {int(status.progress() * 100)}% complete.")
-            except Exception as e:
-                print(f"Chunk download failed: {e}")
-                time.sleep(5)
-                continue
-
-    return save_path
-
-
-def download_from_google_drive(interview_id, event_id):
+def get_recording_files(interview_id, event_id):
+    """Return the Drive file ids of the interview's recording and transcript"""
     event_info = get_meeting_info(event_id)
     attachments = event_info.get("attachments", [])
 
@@ -184,24 +172,117 @@ def download_from_google_drive(interview_id, event_id):
             {},
             f"Required files are not available. See the files {required_files} and it's available attachments are: {attachments}",
         )
+    return required_files, None
+
 
-    downloaded_files = {}
-    file_configs = {
-        "video": {"ext": "mp4", "mime_type": None},
-        "transcript": {"ext": "txt", "mime_type": "text/plain"},
+def get_file_metadata(file_id):
+    """size and md5Checksum are only present for binary files, not Google Docs"""
+    metadata = (
+        drive_service.files()
+        .get(fileId=file_id, fields="id,size,md5Checksum")
+        .execute(num_retries=settings.RECORDING_DOWNLOAD_MAX_RETRIES)
+    )
+    return {
+        "size": int(metadata["size"]) if metadata.get("size") else None,
+        "md5_checksum": metadata.get("md5Checksum"),
     }
 
-    for file_type, file_id in required_files.items():
-        save_path = f"/tmp/{event_id}.{file_configs[file_type]['ext']}"
-        download_file(
-            file_id, mime_type=file_configs[file_type]["mime_type"], save_path=save_path
+
+def _get_thread_http():
+    # httplib2 connections are not thread safe, so every pool thread gets its own
+    if not hasattr(_thread_local, "http"):
+        _thread_local.http = AuthorizedHttp(credentials, http=httplib2.Http())
+    return _thread_local.http
+
+
+def download_range(file_id, start, end, http=None):
+    """Fetch bytes start..end (inclusive) of a Drive file"""
+    request = drive_service.files().get_media(fileId=file_id)
+    request.headers["Range"] = f"bytes={start}-{end}"
+    with concurrency_slot("drive_download", settings.RECORDING_DOWNLOAD_CONCURRENCY):
+        # transient 5xx/429 responses are retried with exponential backoff
+        return request.execute(
+            http=http, num_retries=settings.RECORDING_DOWNLOAD_MAX_RETRIES
+        )
+
+
+def _download_ranges_in_parallel(file_id, fd, size, offset, workers, on_chunk):
+    """
+    Fetch fixed size ranges concurrently and write them in order. At most
+    2 * workers ranges are in flight, which bounds the memory held by
+    ranges that finished ahead of the next one to write.
+    """
+    ranges = iter(range(offset, size, PARALLEL_RANGE_SIZE))
+    pending = deque()
+
+    def fetch(start):
+        end = min(start + PARALLEL_RANGE_SIZE, size) - 1
+        return download_range(file_id, start, end, http=_get_thread_http())
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for start in islice(ranges, workers * 2):
+                pending.append(executor.submit(fetch, start))
+            while pending:
+                data = pending.popleft().result()
+                expected = min(offset + PARALLEL_RANGE_SIZE, size) - offset
+                if len(data) != expected:
+                    raise IOError(
+                        f"Short range received for file {file_id} at {offset}"
+                    )
+                fd.write(data)
+                offset += len(data)
+                if on_chunk:
+                    on_chunk(data, offset)
+                for start in islice(ranges, 1):
+                    pending.append(executor.submit(fetch, start))
+        except Exception:
+            for future in pending:
+                future.cancel()
+            raise
+
+
+def download_file(
+    file_id, fd, mime_type=None, size=None, offset=0, on_chunk=None, workers=1
+):
+    """
+    Download a Drive file into a writable file object in 4MB chunks. Binary files
+    of known size are fetched with ranged requests starting at offset, across
+    `workers` threads for large files, and on_chunk(data, offset) is called after
+    every chunk written in order so callers can checkpoint progress. Exports have
+    no size and are downloaded in one pass.
+    """
+    if mime_type or size is None:
+        if mime_type:
+            request = drive_service.files().export_media(
+                fileId=file_id, mimeType=mime_type
+            )
+        else:
+            request = drive_service.files().get_media(fileId=file_id)
+        downloader = MediaIoBaseDownload(
+            fd=fd, request=request, chunksize=DOWNLOAD_CHUNK_SIZE
         )
-        downloaded_files[file_type] = {
-            "path": save_path,
-            "name": f"{event_id}.{file_configs[file_type]['ext']}",
-        }
+        done = False
+        while not done:
+            _, done = downloader.next_chunk(
+                num_retries=settings.RECORDING_DOWNLOAD_MAX_RETRIES
+            )
+        return
+
+    if workers > 1 and size - offset > PARALLEL_RANGE_SIZE:
+        _download_ranges_in_parallel(file_id, fd, size, offset, workers, on_chunk)
+        return
 
-    return {"interview_id": interview_id, "files": downloaded_files}, False
+    while offset < size:
+        data = download_range(
+            file_id, offset, min(offset + DOWNLOAD_CHUNK_SIZE, size) - 1
+        )
+        if not data:
+            raise IOError(f"Empty range received for file {file_id} at {offset}")
+        fd.write(data)
+        offset += len(data)
+        if on_chunk:
+            on_chunk(data, offset)
 
 
 # keep below funcation for testing purpose
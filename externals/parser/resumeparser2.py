@@ -1,14 +1,26 @@
 import os
 import re
 import json
+import hashlib
+import fcntl
+import time
+import atexit
 import logging
 import subprocess
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dateutil import parser
 from pdfminer.high_level import extract_text
 from docx import Document
+from billiard.pool import Pool
 import google.generativeai as genai
 from django.conf import settings
+from externals.gemini_rate_limiter import generate_content, PRIORITY_STANDARD
+from externals.parser.rule_extractor import (
+    RULE_EXTRACTOR_VERSION,
+    extract_resume_fields,
+    get_section_text,
+)
 
 logger = logging.getLogger(__name__)
 genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -20,88 +32,389 @@ def is_allowed_file(filename):
     return os.path.splitext(filename)[1].lower() in ALLOWED_EXTENSIONS
 
 
+class DocConverter:
+    """
+    Converts .doc files through one headless LibreOffice listener per host.
+    Starting LibreOffice is most of the cost of a conversion, so the listener
+    is kept running and every unoconv call connects to it. The listener
+    handles one document at a time, conversions wait on a file lock.
+    """
+
+    _listener = None
+
+    @classmethod
+    def start_listener(cls):
+        if cls._listener is not None and cls._listener.poll() is None:
+            return
+        # exits straight away when another process already listens on the port
+        cls._listener = subprocess.Popen(
+            ["unoconv", "--listener", f"--port={settings.RESUME_DOC_CONVERTER_PORT}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def convert(file_path):
+        docx_path = f"{os.path.splitext(file_path)[0]}.docx"
+        with open(settings.RESUME_DOC_CONVERTER_LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                subprocess.run(
+                    [
+                        "unoconv",
+                        f"--port={settings.RESUME_DOC_CONVERTER_PORT}",
+                        "-f",
+                        "docx",
+                        "-o",
+                        docx_path,
+                        file_path,
+                    ],
+                    check=True,
+                    timeout=settings.RESUME_EXTRACTION_TIMEOUT,
+                )
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return docx_path
+
+
+def extract_docx_text(file_path):
+    doc = Document(file_path)
+    return "\n".join(
+        para.text
+        for para in doc.paragraphs[: settings.RESUME_EXTRACTION_MAX_PARAGRAPHS]
+    )
+
+
 def extract_resume_text(file_path):
     try:
         ext = file_path.lower()
         if ext.endswith(".pdf"):
-            return extract_text(file_path)
-        elif ext.endswith(".docx"):
-            doc = Document(file_path)
-            return "\n".join(para.text for para in doc.paragraphs)
-        elif ext.endswith(".doc"):
-            temp_docx_path = file_path.replace(".doc", ".docx")
-            subprocess.run(
-                ["unoconv", "-f", "docx", "-o", temp_docx_path, file_path], check=True
+            return extract_text(
+                file_path, maxpages=settings.RESUME_EXTRACTION_MAX_PAGES
             )
-            doc = Document(temp_docx_path)
-            return "\n".join(para.text for para in doc.paragraphs)
+        elif ext.endswith(".docx"):
+            return extract_docx_text(file_path)
     except Exception as e:
         logger.error(f"Failed to extract text from {file_path}: {str(e)}")
     return ""
 
 
-def parse_resume_with_gemini(resume_texts):
+class ExtractionPool:
+    """
+    Process pool for text extraction, started on first use and kept for the
+    life of the process, since tearing a pool down costs about a second.
+    Every Celery child and gunicorn worker has its own pool, so the CPUs are
+    split between them rather than each pool taking all of them.
+    """
+
+    processes = 0
+    _pool = None
+    _owner_pid = None
+
+    @staticmethod
+    def get_size():
+        if settings.RESUME_EXTRACTION_MAX_WORKERS:
+            return settings.RESUME_EXTRACTION_MAX_WORKERS
+        # set by run_celery_worker, and by gunicorn's own convention for the web
+        siblings = int(
+            os.environ.get("CELERY_WORKER_CONCURRENCY")
+            or os.environ.get("WEB_CONCURRENCY")
+            or 1
+        )
+        return max((os.cpu_count() or 1) // siblings, 1)
+
+    @classmethod
+    def get_pool(cls):
+        # a pool inherited through fork belongs to the parent process
+        if cls._pool is None or cls._owner_pid != os.getpid():
+            # billiard, unlike multiprocessing, can start a pool inside a Celery worker process
+            cls.processes = cls.get_size()
+            cls._pool = Pool(
+                processes=cls.processes, timeout=settings.RESUME_EXTRACTION_TIMEOUT
+            )
+            cls._owner_pid = os.getpid()
+            atexit.register(cls.close)
+        return cls._pool
+
+    @classmethod
+    def close(cls):
+        if cls._pool is not None and cls._owner_pid == os.getpid():
+            cls._pool.terminate()
+        cls._pool = None
+
+
+def extract_resume_texts(file_paths):
+    """
+    Extract the text of every file in parallel, returned in the order of
+    file_paths. A file that fails or runs past RESUME_EXTRACTION_TIMEOUT gets
+    an empty text, its pool process is replaced.
+
+    .doc files are converted before they are dispatched: the converter takes
+    one document at a time, and waiting for it must not count against the
+    extraction timeout.
+    """
+    if not file_paths:
+        return []
+    paths = list(file_paths)
+    for index, path in enumerate(paths):
+        if path.lower().endswith(".doc"):
+            DocConverter.start_listener()
+            try:
+                paths[index] = DocConverter.convert(path)
+            except Exception as e:
+                logger.error(f"Failed to convert {path}: {str(e)}")
+                paths[index] = None
+
+    pool = ExtractionPool.get_pool()
+    pending = [
+        pool.apply_async(extract_resume_text, (path,)) if path else None
+        for path in paths
+    ]
+    # backstop for jobs lost with a crashed pool process, which never time out
+    rounds = -(-len(file_paths) // ExtractionPool.processes)
+    deadline = time.monotonic() + (rounds + 1) * settings.RESUME_EXTRACTION_TIMEOUT
+    texts = []
+    for path, result in zip(file_paths, pending):
+        if result is None:
+            texts.append("")
+            continue
+        try:
+            texts.append(result.get(timeout=max(deadline - time.monotonic(), 0)))
+        except Exception as e:
+            # pool errors arrive wrapped together with their traceback
+            logger.error(
+                f"Failed to extract text from {path}: {getattr(e, 'exc', e)!r}"
+            )
+            texts.append("")
+    return texts
+
+
+RESUME_PARSER_MODEL = "gemini-2.0-flash-thinking-exp-01-21"
+RESUME_PARSER_PROMPT = (
+    "You are an expert resume parser. Extract the following details for EACH resume:\n"
+    "1. Name (full name exactly as shown)\n"
+    "2. Email (complete address without spaces)\n"
+    "3. Phone Number (with country code if available)\n"
+    "4. Extract experience as a list of job roles with start_date and end_date (e.g., 'February 2021', 'Present'). No need to calculate years/months.\n"
+    "5. Current Company Name (official legal name)\n"
+    "6. Current Designation (exact job title)\n\n"
+    "Return STRICT JSON array. Each object MUST follow this example:\n"
+    "[\n"
+    "  {\n"
+    '    "id": "R1",\n'
+    '    "name": "John Doe",\n'
+    '    "email": "john@email.com",\n'
+    '    "phoneNumber": "+11234567890",\n'
+    '    "experiences": [\n'
+    "      {\n"
+    '        "job_title": "Software Engineer",\n'
+    '        "company": "XYZ Ltd",\n'
+    '        "start_date": "February 2021",\n'
+    '        "end_date": "Present"\n'
+    "      },\n"
+    "      {\n"
+    '        "job_title": "Intern",\n'
+    '        "company": "ABC Corp",\n'
+    '        "start_date": "July 2018",\n'
+    '        "end_date": "January 2021"\n'
+    "      }\n"
+    "    ],\n"
+    '    "currentCompanyName": "Tech Corp",\n'
+    '    "currentDesignation": "Software Engineer"\n'
+    "  }\n"
+    "]\n\n"
+    "Important Rules:\n"
+    "- Phone numbers must start with '+' followed by country code\n"
+    "- Remove all spaces from emails\n"
+    "- Use full month names (January, February etc.)\n"
+    "- If information is missing, use empty string\n"
+    "- Current company is the most recent/last mentioned job\n"
+    "- Return object should be proper JSON array of objects\n"
+    "- Set id to the id written after RESUME, one object per resume\n\n"
+)
+
+# asked for when the rule-based extractor already found name, email and phone
+RESUME_PARTIAL_FIELDS = {
+    "experiences": (
+        '"experiences": list of job roles, each with "job_title", "company", '
+        '"start_date" and "end_date" (e.g. "February 2021", "Present")'
+    ),
+    "currentCompanyName": '"currentCompanyName": official name of the most recent company',
+    "currentDesignation": '"currentDesignation": exact title of the most recent role',
+}
+RESUME_PARTIAL_PROMPT = (
+    "You are an expert resume parser. Extract only these details for EACH resume:\n"
+    "{fields}\n\n"
+    'Return STRICT JSON array with one object per resume, holding "id" and the keys above.\n'
+    "Important Rules:\n"
+    "- Use full month names (January, February etc.)\n"
+    "- If information is missing, use empty string\n"
+    "- Set id to the id written after RESUME, e.g. R1\n\n"
+)
+
+# cached resumes are keyed by this version, so editing the prompts, the extraction
+# limits, the rules or switching the model invalidates them automatically
+RESUME_PARSER_VERSION = hashlib.sha256(
+    f"{RESUME_PARSER_MODEL}:{settings.RESUME_EXTRACTION_MAX_PAGES}:"
+    f"{settings.RESUME_EXTRACTION_MAX_PARAGRAPHS}:{RULE_EXTRACTOR_VERSION}:"
+    f"{settings.RESUME_FAST_PATH_MIN_CONFIDENCE}:{RESUME_PARSER_PROMPT}"
+    f"{RESUME_PARTIAL_PROMPT}{RESUME_PARTIAL_FIELDS}".encode()
+).hexdigest()[:16]
+
+
+def estimate_tokens(text):
+    # about four characters per token for resume text
+    return len(text) // 4 + 1
+
+
+def pack_resume_batches(resumes):
+    """
+    Group the resumes ({resume_id: text}) into prompts of at most
+    RESUME_PARSE_PROMPT_TOKEN_BUDGET estimated tokens and
+    RESUME_PARSE_MAX_RESUMES_PER_PROMPT resumes. A resume over the budget on
+    its own is cut to it and sent alone.
+    """
+    budget = settings.RESUME_PARSE_PROMPT_TOKEN_BUDGET
+    batches, batch, batch_tokens = [], [], 0
+    for resume_id, text in resumes.items():
+        tokens = estimate_tokens(text)
+        if tokens > budget:
+            text, tokens = text[: budget * 4], budget
+        if batch and (
+            batch_tokens + tokens > budget
+            or len(batch) >= settings.RESUME_PARSE_MAX_RESUMES_PER_PROMPT
+        ):
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append((resume_id, text))
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def build_partial_prompt(fields):
+    return RESUME_PARTIAL_PROMPT.format(
+        fields="\n".join(
+            f"{index + 1}. {RESUME_PARTIAL_FIELDS[field]}"
+            for index, field in enumerate(fields)
+        )
+    )
+
+
+def parse_resume_batch(
+    batch, instructions=RESUME_PARSER_PROMPT, priority=PRIORITY_STANDARD
+):
+    """
+    Parse one prompt of (resume_id, text) pairs, returning the fields per
+    resume id. Results are matched on the id echoed by the model, not on their
+    position, and a failed response only loses the resumes of this batch.
+    """
+    # short labels keep the prompt small, they are mapped back to the resume ids
+    labels = {f"R{index + 1}": resume_id for index, (resume_id, _) in enumerate(batch)}
     prompt = (
-        "You are an expert resume parser. Extract the following details for EACH resume:\n"
-        "1. Name (full name exactly as shown)\n"
-        "2. Email (complete address without spaces)\n"
-        "3. Phone Number (with country code if available)\n"
-        "4. Extract experience as a list of job roles with start_date and end_date (e.g., 'February 2021', 'Present'). No need to calculate years/months.\n"
-        "5. Current Company Name (official legal name)\n"
-        "6. Current Designation (exact job title)\n\n"
-        "Return STRICT JSON array. Each object MUST follow this example:\n"
-        "[\n"
-        "  {\n"
-        '    "name": "John Doe",\n'
-        '    "email": "john@email.com",\n'
-        '    "phoneNumber": "+11234567890",\n'
-        '    "experiences": [\n'
-        "      {\n"
-        '        "job_title": "Software Engineer",\n'
-        '        "company": "XYZ Ltd",\n'
-        '        "start_date": "February 2021",\n'
-        '        "end_date": "Present"\n'
-        "      },\n"
-        "      {\n"
-        '        "job_title": "Intern",\n'
-        '        "company": "ABC Corp",\n'
-        '        "start_date": "July 2018",\n'
-        '        "end_date": "January 2021"\n'
-        "      }\n"
-        "    ],\n"
-        '    "currentCompanyName": "Tech Corp",\n'
-        '    "currentDesignation": "Software Engineer"\n'
-        "  }\n"
-        "]\n\n"
-        "Important Rules:\n"
-        "- Phone numbers must start with '+' followed by country code\n"
-        "- Remove all spaces from emails\n"
-        "- Use full month names (January, February etc.)\n"
-        "- If information is missing, use empty string\n"
-        "- Current company is the most recent/last mentioned job\n"
-        "- Return object should be proper JSON array of objects\n\n"
-        "Resumes:\n"
+        instructions
+        + "Resumes:\n"
         + "\n---\n".join(
-            f"RESUME {i+1}:\n{text}" for i, text in enumerate(resume_texts)
+            f"RESUME {label}:\n{text}" for label, (_, text) in zip(labels, batch)
         )
     )
 
+    raw_response = ""
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash-thinking-exp-01-21")
-        response = model.generate_content(prompt)
+        response = generate_content(RESUME_PARSER_MODEL, prompt, priority)
         raw_response = response.text.strip()
 
         json_start = raw_response.find("[")
         json_end = raw_response.rfind("]") + 1
-        json_str = raw_response[json_start:json_end] if json_start != -1 else "{}"
+        json_str = raw_response[json_start:json_end] if json_start != -1 else "[]"
         if json_str.startswith("```json"):
             json_str = json_str.strip("```")[4:].strip()
 
-        return json.loads(json_str)
+        parsed = json.loads(json_str)
     except Exception as e:
         logger.error(f"Gemini parsing failed: {str(e)}")
         logger.debug(f"Raw response: {raw_response}")
-        return []
+        return {}
+
+    results = {}
+    for data in parsed if isinstance(parsed, list) else []:
+        if isinstance(data, dict) and str(data.get("id", "")).strip() in labels:
+            results[labels[str(data.pop("id")).strip()]] = data
+    if len(results) < len(batch):
+        logger.warning(
+            f"Gemini returned {len(results)} of {len(batch)} resumes of a batch"
+        )
+    return results
+
+
+def parse_resume_with_gemini(resumes, instructions=None, priority=PRIORITY_STANDARD):
+    """
+    Parse {resume_id: text} into {resume_id: fields}. Resumes sharing the same
+    instructions ({resume_id: prompt}, the full prompt by default) are packed
+    into prompts by token budget, and all prompts are sent concurrently, each
+    waiting for quota on the shared Gemini rate limiter at the caller's priority.
+    """
+    instructions = instructions or {}
+    groups = {}
+    for resume_id, text in resumes.items():
+        groups.setdefault(instructions.get(resume_id, RESUME_PARSER_PROMPT), {})[
+            resume_id
+        ] = text
+    jobs = [
+        (batch, prompt, priority)
+        for prompt, group in groups.items()
+        for batch in pack_resume_batches(group)
+    ]
+    if len(jobs) <= 1:
+        return parse_resume_batch(*jobs[0]) if jobs else {}
+
+    results = {}
+    with ThreadPoolExecutor(
+        max_workers=min(len(jobs), settings.RESUME_PARSE_MAX_PARALLEL_PROMPTS)
+    ) as executor:
+        for parsed in executor.map(lambda job: parse_resume_batch(*job), jobs):
+            results.update(parsed)
+    return results
+
+
+def parse_resumes(resumes, priority=PRIORITY_STANDARD):
+    """
+    Parse {resume_id: text} into {resume_id: fields}, asking Gemini only for
+    the fields the rule-based extractor is not confident about. Resumes with
+    every field found skip the model, those missing only their roles send
+    just the experience section with a shorter prompt. A resume the model
+    failed to answer for is left out, like before.
+    """
+    threshold = settings.RESUME_FAST_PATH_MIN_CONFIDENCE
+    results, missing_fields, to_model, instructions = {}, {}, {}, {}
+    for resume_id, text in resumes.items():
+        data, confidence = extract_resume_fields(text)
+        results[resume_id] = data
+        missing = [field for field, score in confidence.items() if score < threshold]
+        if not missing:
+            continue
+        missing_fields[resume_id] = missing
+        if set(missing) <= RESUME_PARTIAL_FIELDS.keys():
+            to_model[resume_id] = get_section_text(text)
+            instructions[resume_id] = build_partial_prompt(missing)
+        else:
+            to_model[resume_id] = text
+    logger.info(
+        f"Resume fields: {len(resumes) - len(to_model)} by rules, "
+        f"{len(instructions)} partly and {len(to_model) - len(instructions)} fully by Gemini"
+    )
+
+    parsed = parse_resume_with_gemini(to_model, instructions, priority)
+    for resume_id, missing in missing_fields.items():
+        if resume_id not in parsed:
+            del results[resume_id]
+            continue
+        for field in missing:
+            results[resume_id][field] = parsed[resume_id].get(
+                field, [] if field == "experiences" else ""
+            )
+    return results
 
 
 def calculate_experience(experiences):
@@ -133,31 +446,33 @@ def normalize_phone(number):
     return number if number.startswith("+") else f"+{number}"
 
 
+def format_parsed_resume(file_name, data):
+    exp = calculate_experience(data.get("experiences", []))
+    return {
+        "file_name": file_name,
+        "name": data.get("name", "").strip(),
+        "email": data.get("email", "").replace(" ", ""),
+        "phone_number": normalize_phone(data.get("phoneNumber", "")),
+        "years_of_experience": exp,
+        "current_company": data.get("currentCompanyName", ""),
+        "current_designation": data.get("currentDesignation", ""),
+    }
+
+
 def process_resumes(file_paths):
-    resume_texts, file_names = [], []
-    for path in file_paths:
-        if not is_allowed_file(path):
-            continue
-        text = extract_resume_text(path)
+    file_paths = [path for path in file_paths if is_allowed_file(path)]
+    resume_texts = {}
+    for index, (path, text) in enumerate(
+        zip(file_paths, extract_resume_texts(file_paths))
+    ):
         if text:
-            resume_texts.append(text)
-            file_names.append(os.path.basename(path))
+            resume_texts[index] = text
         else:
             logger.warning(f"No text extracted from {path}")
 
-    parsed = parse_resume_with_gemini(resume_texts)
-    results = []
-    for i, data in enumerate(parsed):
-        exp = calculate_experience(data.get("experiences", []))
-        results.append(
-            {
-                "file_name": file_names[i],
-                "name": data.get("name", "").strip(),
-                "email": data.get("email", "").replace(" ", ""),
-                "phone_number": normalize_phone(data.get("phoneNumber", "")),
-                "years_of_experience": exp,
-                "current_company": data.get("currentCompanyName", ""),
-                "current_designation": data.get("currentDesignation", ""),
-            }
-        )
-    return results
+    parsed = parse_resumes(resume_texts)
+    return [
+        format_parsed_resume(os.path.basename(file_paths[index]), parsed[index])
+        for index in resume_texts
+        if index in parsed
+    ]
@@ -0,0 +1,214 @@
+import re
+import phonenumbers
+from dateutil import parser
+from django.conf import settings
+
+# bumped whenever the rules change, it is part of the parsed resume cache version
+RULE_EXTRACTOR_VERSION = "2"
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+MONTH = (
+    r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|"
+    r"Aug(?:ust)?|Sep(?:t(?:ember)?)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)"
+)
+DATE = rf"(?:{MONTH}\.?,?\s*'?\d{{2,4}}|\d{{1,2}}[/.-]\d{{4}})"
+DATE_RANGE_PATTERN = re.compile(
+    rf"(?P<start>{DATE})\s*(?:-|–|—|to|till)\s*"
+    rf"(?P<end>{DATE}|present|current|till date|now|ongoing)",
+    re.IGNORECASE,
+)
+EXPERIENCE_HEADINGS = re.compile(
+    r"^\s*(?:work\s+|professional\s+|employment\s+|career\s+)?"
+    r"(?:experience|employment history|work history|career history)\s*:?\s*$",
+    re.IGNORECASE,
+)
+OTHER_HEADINGS = re.compile(
+    r"^\s*(?:education|academic|qualifications?|skills|technical skills|projects|"
+    r"certifications?|achievements|awards|languages|hobbies|interests|"
+    r"personal details|declaration|references|summary|profile|objective)\b.{0,20}$",
+    re.IGNORECASE,
+)
+LABELLED_FIELDS = {
+    "currentCompanyName": re.compile(
+        r"^\s*(?:current\s+)?(?:company|organi[sz]ation|employer)\s*[:\-]\s*(.+)$",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+    "currentDesignation": re.compile(
+        r"^\s*(?:current\s+)?(?:designation|role|position|job title)\s*[:\-]\s*(.+)$",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+}
+TITLE_AT_COMPANY_PATTERN = re.compile(
+    r"^\s*(?P<title>[A-Za-z][\w .&/()-]{2,60}?)\s+at\s+(?P<company>[A-Z][\w .&,()-]{1,80}?)\s*[,|]?\s*$"
+)
+NOT_A_NAME = re.compile(
+    r"resume|curriculum|vitae|profile|@|\d|http|www\.|linkedin", re.IGNORECASE
+)
+
+
+def extract_email(text):
+    emails = list(dict.fromkeys(EMAIL_PATTERN.findall(text)))
+    if not emails:
+        return "", 0.0
+    return emails[0], 1.0 if len(emails) == 1 else 0.9
+
+
+def extract_phone(text):
+    numbers = list(
+        dict.fromkeys(
+            phonenumbers.format_number(
+                match.number, phonenumbers.PhoneNumberFormat.E164
+            )
+            for match in phonenumbers.PhoneNumberMatcher(
+                text, settings.RESUME_DEFAULT_PHONE_REGION
+            )
+        )
+    )
+    if not numbers:
+        return "", 0.0
+    return numbers[0], 1.0 if len(numbers) == 1 else 0.8
+
+
+def extract_name(lines, email):
+    """The name is expected among the first lines, as two to four words"""
+    for line in lines[:5]:
+        words = line.split()
+        if NOT_A_NAME.search(line) or not 2 <= len(words) <= 4:
+            continue
+        if not all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", word) for word in words):
+            continue
+        name = " ".join(word.capitalize() if word.isupper() else word for word in words)
+        local_part = email.split("@")[0].lower()
+        # a name found again in the email address is almost certainly right
+        if any(len(word) > 2 and word.lower() in local_part for word in words):
+            return name, 0.95
+        return name, 0.75
+    return "", 0.0
+
+
+def get_experience_section(lines):
+    start = next(
+        (index for index, line in enumerate(lines) if EXPERIENCE_HEADINGS.match(line)),
+        None,
+    )
+    if start is None:
+        return []
+    section = []
+    for line in lines[start + 1 :]:
+        if OTHER_HEADINGS.match(line):
+            break
+        section.append(line)
+    return section
+
+
+def get_header(lines):
+    """The lines above the first section heading, where the current role is often stated"""
+    header = []
+    for line in lines[:15]:
+        if EXPERIENCE_HEADINGS.match(line) or OTHER_HEADINGS.match(line):
+            break
+        header.append(line)
+    return header
+
+
+def is_date(value):
+    try:
+        parser.parse(value, fuzzy=True)
+        return True
+    except (ValueError, OverflowError):
+        return False
+
+
+def extract_experiences(lines):
+    """
+    Date ranges of the experience section, most recent first, with the title
+    and company of the latest role when the resume states them unambiguously.
+    Ranges found outside an experience section may be education, so they only
+    get a low confidence. Returns the ranges and their confidence, the current
+    role and the confidence of the current role.
+    """
+    section = get_experience_section(lines)
+    experiences = []
+    for line in section or lines:
+        for match in DATE_RANGE_PATTERN.finditer(line):
+            end = match.group("end")
+            if end.lower() in ("current", "till date", "now", "ongoing"):
+                end = "Present"
+            if is_date(match.group("start")) and (end == "Present" or is_date(end)):
+                experiences.append(
+                    {
+                        "job_title": "",
+                        "company": "",
+                        "start_date": match.group("start"),
+                        "end_date": end.capitalize(),
+                    }
+                )
+
+    # labels elsewhere, e.g. "Role:" under projects, don't describe the current job
+    current, sources = {}, {}
+    for source, source_lines in (("header", get_header(lines)), ("section", section)):
+        for field, pattern in LABELLED_FIELDS.items():
+            match = pattern.search("\n".join(source_lines))
+            if match and field not in current:
+                current[field] = match.group(1).strip()
+                sources[field] = source
+    if section and len(current) < 2:
+        for line in section:
+            match = TITLE_AT_COMPANY_PATTERN.match(DATE_RANGE_PATTERN.sub("", line))
+            if match:
+                for field, group in (
+                    ("currentDesignation", "title"),
+                    ("currentCompanyName", "company"),
+                ):
+                    if field not in current:
+                        current[field] = match.group(group).strip()
+                        sources[field] = "title_at"
+                break
+
+    if not experiences:
+        confidence = 0.0
+    else:
+        confidence = 0.9 if section else 0.5
+    # a company and designation found in different places may not belong together
+    current_confidence = 0.6 if len(set(sources.values())) > 1 else 0.9
+    return experiences, confidence, current, current_confidence
+
+
+def extract_resume_fields(text):
+    """
+    Rule-based extraction of the fields asked from Gemini. Returns the fields
+    in the model's format and a 0-1 confidence per field, so the caller can
+    keep the confident ones and only ask the model for the rest.
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    email, email_confidence = extract_email(text)
+    phone, phone_confidence = extract_phone(text)
+    name, name_confidence = extract_name(lines, email)
+    experiences, experience_confidence, current, current_confidence = (
+        extract_experiences(lines)
+    )
+
+    data = {
+        "name": name,
+        "email": email,
+        "phoneNumber": phone,
+        "experiences": experiences,
+        "currentCompanyName": current.get("currentCompanyName", ""),
+        "currentDesignation": current.get("currentDesignation", ""),
+    }
+    confidence = {
+        "name": name_confidence,
+        "email": email_confidence,
+        "phoneNumber": phone_confidence,
+        "experiences": experience_confidence,
+        "currentCompanyName": current_confidence if data["currentCompanyName"] else 0.0,
+        "currentDesignation": current_confidence if data["currentDesignation"] else 0.0,
+    }
+    return data, confidence
+
+
+def get_section_text(text):
+    """The experience section alone, sent when the model only fills in the roles"""
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    section = get_experience_section(lines)
+    return "\n".join(section) if section else text
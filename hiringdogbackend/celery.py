@@ -10,6 +10,9 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 app.autodiscover_tasks()
 
+# connects the task metrics and dead-letter signal handlers
+from . import celery_metrics, celery_dead_letters  # noqa: E402,F401
+
 app.conf.beat_schedule = {
     "process_interview_recordings_every_15_minutes": {
         "task": "dashboard.tasks.trigger_interview_processing",
@@ -19,4 +22,32 @@ app.conf.beat_schedule = {
         "task": "dashboard.tasks.process_interview_video_and_generate_and_store_feedback",
         "schedule": crontab(minute="*/30"),
     },
+    "dispatch_due_engagement_emails_every_minute": {
+        "task": "dashboard.tasks.dispatch_due_engagement_emails",
+        "schedule": crontab(),
+    },
+    "generate_monthly_invoices_on_first_day_of_month": {
+        "task": "dashboard.tasks.generate_monthly_invoices",
+        "schedule": crontab(minute=0, hour=2, day_of_month=1),
+    },
+    "expire_client_credits_every_hour": {
+        "task": "dashboard.tasks.expire_client_credits",
+        "schedule": crontab(minute=5),
+    },
+    "reconcile_client_credit_wallets_every_hour": {
+        "task": "dashboard.tasks.reconcile_client_credit_wallets",
+        "schedule": crontab(minute=35),
+    },
+    "export_task_metrics_every_minute": {
+        "task": "dashboard.tasks.export_task_metrics",
+        "schedule": crontab(),
+    },
+    "reclaim_resume_parse_jobs_every_10_minutes": {
+        "task": "dashboard.tasks.reclaim_resume_parse_jobs",
+        "schedule": crontab(minute="*/10"),
+    },
+    "audit_result_backend_every_hour": {
+        "task": "dashboard.tasks.audit_result_backend",
+        "schedule": crontab(minute=50),
+    },
 }
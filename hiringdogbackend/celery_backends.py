@@ -0,0 +1,21 @@
+from celery.backends.redis import RedisBackend
+from django.conf import settings
+
+
+class TaskExpiryRedisBackend(RedisBackend):
+    """Redis result backend which expires the results of selected tasks early"""
+
+    def _store_result(
+        self, task_id, result, state, traceback=None, request=None, **kwargs
+    ):
+        result = super()._store_result(
+            task_id, result, state, traceback=traceback, request=request, **kwargs
+        )
+        expires = settings.CELERY_RESULT_EXPIRES_BY_TASK.get(
+            getattr(request, "task", None)
+        )
+        if expires:
+            self.client.expire(
+                self.get_key_for_task(task_id), int(expires.total_seconds())
+            )
+        return result
@@ -0,0 +1,76 @@
+import logging
+from celery import signals
+from celery.states import REJECTED
+from hiringdogbackend.utils import log_action
+
+# tasks opt in with @shared_task(dead_letter=True)
+DEAD_LETTER_OPTION = "dead_letter"
+
+
+def is_dead_letter_task(task):
+    return task is not None and getattr(task, DEAD_LETTER_OPTION, False)
+
+
+def capture(task, task_id, args, kwargs, exception, traceback=""):
+    from services.dead_letters import DeadLetterService
+
+    try:
+        DeadLetterService.capture(
+            task.name,
+            task_id,
+            args,
+            kwargs,
+            exception,
+            traceback=traceback,
+            options=DeadLetterService.get_options(task.request),
+        )
+    except Exception as e:
+        # never let the dead-letter store fail the worker
+        log_action(
+            f"Failed to dead-letter task {task.name}: {str(e)}",
+            level=logging.ERROR,
+            task=task.name,
+            task_id=task_id,
+        )
+
+
+@signals.task_retry.connect
+def record_dead_letter_attempt(sender=None, request=None, reason=None, **kwargs):
+    if not is_dead_letter_task(sender):
+        return
+    from services.dead_letters import DeadLetterService
+
+    # reason is the Retry raised by the task, wrapping the actual error
+    DeadLetterService.record_attempt(
+        request.id, request.retries + 1, getattr(reason, "exc", None) or reason
+    )
+
+
+@signals.task_failure.connect
+def dead_letter_failed_task(
+    sender=None,
+    task_id=None,
+    exception=None,
+    args=None,
+    kwargs=None,
+    einfo=None,
+    **extra,
+):
+    if is_dead_letter_task(sender):
+        capture(
+            sender,
+            task_id,
+            args,
+            kwargs,
+            exception,
+            traceback=str(einfo.traceback) if einfo else "",
+        )
+
+
+@signals.task_postrun.connect
+def dead_letter_rejected_task(
+    task_id=None, task=None, args=None, kwargs=None, retval=None, state=None, **extra
+):
+    # Reject skips task_failure, the exception is handed over as retval
+    if state == REJECTED and is_dead_letter_task(task):
+        capture(task, task_id, args, kwargs, retval)
@@ -0,0 +1,188 @@
+import os
+import time
+import logging
+import tempfile
+import redis
+from datetime import datetime
+from celery import signals
+from django.conf import settings
+from hiringdogbackend.utils import log_action
+
+# upper bounds in seconds, shared by the queue wait and runtime histograms
+HISTOGRAM_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+PUBLISHED_AT_HEADER = "hdip_published_at"
+
+
+class TaskMetrics:
+    """
+    Per task name histograms of enqueue-to-start wait and runtime, plus retry
+    and outcome counters. Worker processes add to shared Redis hashes, which
+    render_prometheus() turns into the Prometheus text format.
+    """
+
+    KEY_PREFIX = "task_metrics"
+    _client = None
+    _started_at = {}
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            cls._client = redis.Redis.from_url(
+                settings.TASK_METRICS_REDIS_URL,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+        return cls._client
+
+    @staticmethod
+    def get_bucket(value):
+        for bucket in HISTOGRAM_BUCKETS:
+            if value <= bucket:
+                return str(bucket)
+        return "+Inf"
+
+    @classmethod
+    def record(cls, task_name, observations=None, counters=None):
+        pipeline = cls.get_client().pipeline(transaction=False)
+        key = f"{cls.KEY_PREFIX}:{task_name}"
+        for metric, value in (observations or {}).items():
+            pipeline.hincrby(key, f"{metric}_bucket:{cls.get_bucket(value)}", 1)
+            pipeline.hincrbyfloat(key, f"{metric}_sum", value)
+            pipeline.hincrby(key, f"{metric}_count", 1)
+        for counter in counters or ():
+            pipeline.hincrby(key, counter, 1)
+        try:
+            pipeline.execute()
+        except redis.RedisError:
+            pass
+
+    @classmethod
+    def get_metrics(cls):
+        client = cls.get_client()
+        metrics = {}
+        for key in client.scan_iter(match=f"{cls.KEY_PREFIX}:*", count=500):
+            task_name = key.decode().split(":", 1)[1]
+            metrics[task_name] = {
+                field.decode(): float(value)
+                for field, value in client.hgetall(key).items()
+            }
+        return metrics
+
+    @classmethod
+    def render_prometheus(cls):
+        lines = []
+        metrics = cls.get_metrics()
+        for metric, help_text in (
+            ("queue_wait_seconds", "Time from enqueue (or ETA) to task start"),
+            ("runtime_seconds", "Task runtime"),
+        ):
+            name = f"celery_task_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for task_name, values in sorted(metrics.items()):
+                cumulative = 0
+                for bucket in [str(bucket) for bucket in HISTOGRAM_BUCKETS] + ["+Inf"]:
+                    cumulative += values.get(f"{metric}_bucket:{bucket}", 0)
+                    lines.append(
+                        f'{name}_bucket{{task="{task_name}",le="{bucket}"}} {cumulative:g}'
+                    )
+                lines.append(
+                    f'{name}_sum{{task="{task_name}"}} {values.get(f"{metric}_sum", 0):g}'
+                )
+                lines.append(
+                    f'{name}_count{{task="{task_name}"}} {values.get(f"{metric}_count", 0):g}'
+                )
+
+        lines += [
+            "# HELP celery_task_retries_total Retries requested by the task",
+            "# TYPE celery_task_retries_total counter",
+        ]
+        lines += [
+            f'celery_task_retries_total{{task="{task_name}"}} {values.get("retries", 0):g}'
+            for task_name, values in sorted(metrics.items())
+        ]
+        lines += [
+            "# HELP celery_task_outcomes_total Finished task runs by final state",
+            "# TYPE celery_task_outcomes_total counter",
+        ]
+        for task_name, values in sorted(metrics.items()):
+            for field, value in sorted(values.items()):
+                if field.startswith("outcome:"):
+                    lines.append(
+                        f'celery_task_outcomes_total{{task="{task_name}",state="{field[8:]}"}} {value:g}'
+                    )
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def write_metrics_file(cls, path=None):
+        """Atomically replace the textfile read by the local metrics collector"""
+        path = path or settings.TASK_METRICS_FILE
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as f:
+            f.write(cls.render_prometheus())
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+        return path
+
+
+@signals.before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@signals.task_prerun.connect
+def record_task_start(task_id=None, task=None, **kwargs):
+    now = time.time()
+    TaskMetrics._started_at[task_id] = time.monotonic()
+    # worker requests carry message headers as attributes, eager ones in .headers
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None) or (
+        task.request.headers or {}
+    ).get(PUBLISHED_AT_HEADER)
+    if not published_at:
+        return
+    eta = task.request.eta
+    if eta:
+        # scheduled tasks only start waiting once their ETA has passed
+        try:
+            published_at = max(published_at, datetime.fromisoformat(eta).timestamp())
+        except (TypeError, ValueError):
+            pass
+    TaskMetrics.record(
+        task.name, observations={"queue_wait_seconds": max(now - published_at, 0)}
+    )
+
+
+@signals.task_retry.connect
+def record_task_retry(sender=None, request=None, reason=None, **kwargs):
+    TaskMetrics.record(sender.name, counters=["retries"])
+    log_action(
+        f"Task {sender.name} retrying: {reason}",
+        level=logging.WARNING,
+        task=sender.name,
+        task_id=request.id,
+        retries=request.retries,
+    )
+
+
+@signals.task_failure.connect
+def log_task_failure(sender=None, task_id=None, exception=None, **kwargs):
+    log_action(
+        f"Task {sender.name} failed: {exception!r}",
+        level=logging.ERROR,
+        task=sender.name,
+        task_id=task_id,
+    )
+
+
+@signals.task_postrun.connect
+def record_task_finish(task_id=None, task=None, state=None, **kwargs):
+    started_at = TaskMetrics._started_at.pop(task_id, None)
+    observations = {}
+    if started_at is not None:
+        observations["runtime_seconds"] = time.monotonic() - started_at
+    TaskMetrics.record(
+        task.name, observations=observations, counters=[f"outcome:{state}"]
+    )
@@ -14,6 +14,7 @@ import os
 import sys
 from datetime import timedelta
 from pathlib import Path
+from kombu import Exchange, Queue
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -144,8 +145,25 @@ DJANGO_REST_MULTITOKENAUTH_RESET_TOKEN_EXPIRY_TIME = 1
 
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_TIMEZONE = "Asia/Kolkata"
-CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
+# Celery lets a CELERY_RESULT_BACKEND env var replace this setting, which would
+# drop the backend class, so deployments set only the Redis URL
+CELERY_RESULT_BACKEND = (
+    "hiringdogbackend.celery_backends:TaskExpiryRedisBackend+"
+    + os.environ.get("CELERY_RESULT_REDIS_URL", "redis://localhost:6379/0")
+)
 CELERY_TASK_TRACK_STARTED = True
+# fire-and-forget tasks set ignore_result, the rest keep a compact report for a day
+CELERY_RESULT_EXPIRES = timedelta(days=1)
+# frequent tasks whose results are only useful while debugging a run
+CELERY_RESULT_EXPIRES_BY_TASK = {
+    "dashboard.tasks.fetch_interview_records": timedelta(minutes=10),
+    "dashboard.tasks.flush_mail_outbox": timedelta(minutes=10),
+    "dashboard.tasks.dispatch_due_engagement_emails": timedelta(minutes=10),
+    "dashboard.tasks.send_engagement_emails": timedelta(minutes=10),
+    "dashboard.tasks.process_interview_video_and_generate_and_store_feedback": timedelta(
+        minutes=10
+    ),
+}
 CELERY_WORKER_SEND_TASK_EVENTS = True
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers.DatabaseScheduler"
 CELERY_TASK_ACKS_LATE = True
@@ -154,15 +172,52 @@ CELERY_BROKER_HEARTBEAT = 10
 # CELERY_TASK_TRACK_STARTED = True
 # CELERYD_PREFETCH_MULTIPLIER = 2
 # CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 3600}
-# CELERY_QUEUES = (
-#     Queue(
-#         "default",
-#         Exchange("default"),
-#         routing_key="default",
-#         durable=True,
-#         delivery_mode=2,
-#     ),
-# )
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = tuple(
+    Queue(name, Exchange(name), routing_key=name, durable=True, delivery_mode=2)
+    for name in (
+        "default",
+        "transactional_email",
+        "bulk_email",
+        "media_io",
+        "llm",
+        "billing",
+    )
+)
+CELERY_TASK_ROUTES = {
+    # user facing emails get their own workers so nothing heavy sits in front of them
+    "dashboard.tasks.send_mail": {"queue": "transactional_email"},
+    "dashboard.tasks.flush_mail_outbox": {"queue": "transactional_email"},
+    "dashboard.tasks.send_scheduling_link_to_candidate": {
+        "queue": "transactional_email"
+    },
+    "dashboard.tasks.send_interview_notifications": {"queue": "transactional_email"},
+    "dashboard.tasks.send_email_to_multiple_recipients": {"queue": "bulk_email"},
+    "dashboard.tasks.send_schedule_engagement_email": {"queue": "bulk_email"},
+    "dashboard.tasks.dispatch_due_engagement_emails": {"queue": "bulk_email"},
+    "dashboard.tasks.send_engagement_emails": {"queue": "bulk_email"},
+    "dashboard.tasks.download_recordings_from_google_drive": {"queue": "media_io"},
+    "dashboard.tasks.store_recordings": {"queue": "media_io"},
+    "dashboard.tasks.process_interview_recordings": {"queue": "media_io"},
+    "dashboard.tasks.generate_interview_feedback_pdf": {"queue": "media_io"},
+    "dashboard.tasks.generate_interview_feedback_pdfs": {"queue": "media_io"},
+    "dashboard.tasks.process_single_interview": {"queue": "llm"},
+    "dashboard.tasks.parse_resume_job": {"queue": "llm"},
+    "dashboard.tasks.reclaim_resume_parse_jobs": {"queue": "llm"},
+    "dashboard.tasks.generate_monthly_invoices": {"queue": "billing"},
+    "dashboard.tasks.expire_client_credits": {"queue": "billing"},
+    "dashboard.tasks.reconcile_client_credit_wallets": {"queue": "billing"},
+}
+# worker defaults per queue, used by the run_celery_worker command
+CELERY_WORKER_QUEUE_DEFAULTS = {
+    "default": {"concurrency": 4, "prefetch_multiplier": 4},
+    "transactional_email": {"concurrency": 4, "prefetch_multiplier": 4},
+    "bulk_email": {"concurrency": 2, "prefetch_multiplier": 2},
+    # long running tasks, prefetching would park work behind a busy process
+    "media_io": {"concurrency": 2, "prefetch_multiplier": 1},
+    "llm": {"concurrency": 4, "prefetch_multiplier": 1},
+    "billing": {"concurrency": 1, "prefetch_multiplier": 1},
+}
 
 
 GOOGLE_CLIENT_SECRET_FILE = os.path.join(BASE_DIR, "resources/client_secret.json")
@@ -277,4 +332,98 @@ INTERNAL_SYSTEM_FEEDBACK_EMAIL = "sumit.dey@hiringdog.com"
 INTERNAL_SYSTEM_FEEDBACK_BCC_EMAIL = "contact@hdiplatform.in"
 TAX_AMOUNT = "0.18"
 
+INVOICE_RENDER_MAX_WORKERS = 4
+INVOICE_EMAIL_BATCH_SIZE = 100
+
+# send_mail buffers messages in Redis and sends them in batches over a pooled connection
+MAIL_OUTBOX_REDIS_URL = os.environ.get(
+    "MAIL_OUTBOX_REDIS_URL", "redis://localhost:6379/2"
+)
+MAIL_BATCH_WINDOW_SECONDS = 5
+MAIL_BATCH_SIZE = 50
+# provider limit, shared by all workers
+MAIL_SEND_RATE_PER_MINUTE = 120
+MAIL_MAX_ATTEMPTS = 4
+MAIL_CONNECTION_IDLE_SECONDS = 60
+
+# engagement emails claimed and sent per batch by the due-queue scan
+ENGAGEMENT_EMAIL_BATCH_SIZE = 100
+
+# hourly audit of the Celery result backend, warns above these limits
+RESULT_BACKEND_AUDIT_SAMPLE_SIZE = 500
+RESULT_BACKEND_AUDIT_MAX_KEYS = 50000
+RESULT_BACKEND_AUDIT_MAX_MEMORY_RATIO = 0.8
+
+# per task wait/runtime histograms, exported as a Prometheus textfile every minute
+TASK_METRICS_REDIS_URL = os.environ.get(
+    "TASK_METRICS_REDIS_URL", "redis://localhost:6379/1"
+)
+TASK_METRICS_FILE = os.path.join(BASE_DIR, "logs", "metrics", "celery_tasks.prom")
+
+# failed runs of tasks declared with dead_letter=True
+DEAD_LETTER_REDIS_URL = os.environ.get(
+    "DEAD_LETTER_REDIS_URL", "redis://localhost:6379/1"
+)
+DEAD_LETTER_ATTEMPT_HISTORY_TTL = 7 * 24 * 60 * 60
+DEAD_LETTER_REPLAY_RATE_PER_MINUTE = 30
+
+# parse-resume/ parses in the request, parse-resume/jobs/ in a worker batch by batch
+RESUME_PARSE_MAX_FILES = 15
+RESUME_PARSE_JOB_MAX_FILES = 200
+RESUME_PARSE_BATCH_SIZE = 15
+# text extraction runs in a process pool per worker process; when unset the CPUs
+# are split between the worker processes (CELERY_WORKER_CONCURRENCY, WEB_CONCURRENCY)
+RESUME_EXTRACTION_MAX_WORKERS = None
+RESUME_EXTRACTION_TIMEOUT = 30
+RESUME_EXTRACTION_MAX_PAGES = 10
+RESUME_EXTRACTION_MAX_PARAGRAPHS = 1000
+RESUME_DOC_CONVERTER_PORT = 2002
+RESUME_DOC_CONVERTER_LOCK_FILE = "/tmp/resume_doc_converter.lock"
+# resumes are packed into prompts by estimated tokens, prompts are sent in parallel
+RESUME_PARSE_PROMPT_TOKEN_BUDGET = 16000
+RESUME_PARSE_MAX_RESUMES_PER_PROMPT = 10
+RESUME_PARSE_MAX_PARALLEL_PROMPTS = 4
+# fields found by the rule-based extractor with this confidence are not sent to Gemini
+RESUME_FAST_PATH_MIN_CONFIDENCE = 0.8
+RESUME_DEFAULT_PHONE_REGION = "IN"
+
+PDF_RENDER_POOL_SIZE = 4
+
+# stream Drive recordings straight into media storage instead of staging them in /tmp
+RECORDING_STREAMING_UPLOAD = True
+# staged downloads resume from their checkpoint, so keep this directory across restarts
+RECORDING_STAGING_DIR = "/tmp/interview_recordings"
+RECORDING_DOWNLOAD_MAX_RETRIES = 5
+# byte ranges fetched concurrently per recording, and across all workers
+RECORDING_DOWNLOAD_WORKERS = 4
+RECORDING_DOWNLOAD_CONCURRENCY = 8
+
+# semaphores shared by the workers of every container, see utils.concurrency_slot
+CONCURRENCY_SLOT_REDIS_URL = os.environ.get(
+    "CONCURRENCY_SLOT_REDIS_URL", "redis://localhost:6379/1"
+)
+
+# interviews claimed per beat tick by the recording and feedback pipelines
+INTERVIEW_PROCESSING_BATCH_SIZE = 50
+
+# transcripts longer than one window are analyzed window by window and then merged
+FEEDBACK_TRANSCRIPT_WINDOW_CHARS = 60000
+FEEDBACK_MAX_PARALLEL_WINDOWS = 4
+
+# shared Gemini limiter: per model requests per minute and in-flight requests
+GEMINI_RATE_LIMIT_REDIS_URL = os.environ.get(
+    "GEMINI_RATE_LIMIT_REDIS_URL", "redis://localhost:6379/1"
+)
+GEMINI_DEFAULT_QUOTA = {"rpm": 60, "concurrency": 8}
+GEMINI_MODEL_QUOTAS = {
+    "gemini-1.5-flash": {"rpm": 1000, "concurrency": 20},
+    "gemini-2.0-flash-thinking-exp-01-21": {"rpm": 10, "concurrency": 4},
+}
+# share of each bucket and of the in-flight slots a priority class must leave
+# untouched for higher priorities
+GEMINI_PRIORITY_RESERVE = {"interactive": 0.0, "standard": 0.2, "batch": 0.5}
+# how long a caller waits for quota before giving up
+GEMINI_PRIORITY_TIMEOUTS = {"interactive": 20, "standard": 60, "batch": 600}
+GEMINI_REQUEST_LEASE_SECONDS = 300
+
 
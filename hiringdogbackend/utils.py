@@ -1,4 +1,7 @@
 import re
+import time
+import uuid
+import redis
 import string
 import secrets
 import logging
@@ -8,6 +11,7 @@ from django.core.exceptions import ValidationError as vde
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError
 from typing import Dict, List, Any, Tuple
+from contextlib import contextmanager
 
 
 def validate_incoming_data(
@@ -211,6 +215,66 @@ def log_action(message, request=None, level=logging.INFO, logger_name="hdip", **
     log_method(message, extra=extra_data)
 
 
+# Leases of one semaphore in a sorted set scored by their expiry, so a slot
+# held by a crashed worker frees itself once its lease runs out.
+ACQUIRE_SLOT_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if redis.call("ZCARD", KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("ZADD", KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call("PEXPIRE", KEYS[1], tonumber(ARGV[2]) + 60000)
+return 1
+"""
+_concurrency_slot_client = None
+
+
+def get_concurrency_slot_client():
+    global _concurrency_slot_client
+    if _concurrency_slot_client is None:
+        _concurrency_slot_client = redis.Redis.from_url(
+            settings.CONCURRENCY_SLOT_REDIS_URL,
+            socket_timeout=5,
+            socket_connect_timeout=5,
+        )
+    return _concurrency_slot_client
+
+
+@contextmanager
+def concurrency_slot(
+    name: str, limit: int, lease_seconds: int = 300, poll_interval: float = 0.2
+):
+    """
+    Hold one of `limit` slots shared through Redis by every worker process in
+    every container. When Redis is unreachable the work goes through unlimited,
+    so the limiter never fails the job it guards.
+    """
+    client = get_concurrency_slot_client()
+    key = f"concurrency_slot:{name}"
+    lease_id = uuid.uuid4().hex
+    try:
+        while not client.eval(
+            ACQUIRE_SLOT_SCRIPT, 1, key, limit, lease_seconds * 1000, lease_id
+        ):
+            time.sleep(poll_interval)
+    except redis.RedisError as e:
+        log_action(
+            f"Concurrency slots unavailable, running {name} unlimited: {str(e)}",
+            level=logging.WARNING,
+        )
+        lease_id = None
+    try:
+        yield
+    finally:
+        if lease_id:
+            try:
+                client.zrem(key, lease_id)
+            except redis.RedisError:
+                pass
+
+
 def populate_credit_packages():
     from dashboard.Models.Finance import CreditPackage, CreditPackagePricing
 
@@ -1,8 +1,30 @@
+from datetime import timedelta
 from django.db import transaction
-from dashboard.models import ClientCreditTransaction
+from django.utils import timezone
+from dashboard.models import ClientCreditTransaction, ClientCreditWallet
+from dashboard.Models.Finance import default_credit_expiry
 
 
 class CreditDeductionStrategy:
+    def lock_wallet(self, wallet):
+        """
+        Re-read the wallet under a row lock, so concurrent deductions, top-ups and
+        the expiry sweep apply to the current balance instead of a stale copy
+        """
+        wallet.refresh_from_db(
+            from_queryset=ClientCreditWallet.objects.select_for_update()
+        )
+
+    def extend_validity(self, wallet):
+        """Purchased credits stay valid for the plan's validity from now on"""
+        validity_days = getattr(wallet.pricing_plan, "validity_days", None)
+        expires_at = (
+            timezone.now() + timedelta(days=validity_days)
+            if validity_days
+            else default_credit_expiry()
+        )
+        wallet.credit_expired_at = max(wallet.credit_expired_at, expires_at)
+
     def record_transaction(
         self, wallet, amount, credits, transaction_type, status, description, reference
     ):
@@ -30,6 +52,7 @@ class IndiaStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def deduct(self, wallet, points, description="", reference=None):
         amount = points * 25
+        self.lock_wallet(wallet)
         wallet.total_credits -= points
         wallet.total_spend += points
         wallet.save(update_fields=["total_credits", "total_spend"])
@@ -42,9 +65,11 @@ class IndiaStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def add(self, wallet, points, description="", reference=None):
         amount = points * 25
+        self.lock_wallet(wallet)
         wallet.total_credits += points
         wallet.total_added += points
-        wallet.save(update_fields=["total_credits", "total_added"])
+        self.extend_validity(wallet)
+        wallet.save(update_fields=["total_credits", "total_added", "credit_expired_at"])
 
         self.record_transaction(
             wallet, amount, points, "purchase", "SUC", description, reference
@@ -54,6 +79,7 @@ class IndiaStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def refund(self, wallet, points, description="", reference=None):
         amount = points * 25
+        self.lock_wallet(wallet)
         wallet.total_credits += points
         wallet.total_refunded += points
         wallet.save(update_fields=["total_credits", "total_refunded"])
@@ -68,6 +94,7 @@ class USStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def deduct(self, wallet, points, description="", reference=None):
         amount = points * 1
+        self.lock_wallet(wallet)
         wallet.total_credits -= points
         wallet.total_spend += points
         wallet.save(update_fields=["total_credits", "total_spend"])
@@ -80,9 +107,11 @@ class USStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def add(self, wallet, points, description="", reference=None):
         amount = points * 1
+        self.lock_wallet(wallet)
         wallet.total_credits += points
         wallet.total_added += points
-        wallet.save(update_fields=["total_credits", "total_added"])
+        self.extend_validity(wallet)
+        wallet.save(update_fields=["total_credits", "total_added", "credit_expired_at"])
 
         self.record_transaction(
             wallet, amount, points, "purchase", "SUC", description, reference
@@ -92,6 +121,7 @@ class USStrategy(CreditDeductionStrategy):
     @transaction.atomic
     def refund(self, wallet, points, description="", reference=None):
         amount = points * 1
+        self.lock_wallet(wallet)
         wallet.total_credits += points
         wallet.total_refunded += points
         wallet.save(update_fields=["total_credits", "total_refunded"])
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.utils import timezone
+from dashboard.models import ClientCreditWallet, ClientCreditTransaction
+
+EXPIRY_SWEEP_CHUNK_SIZE = 500
+
+
+class CreditExpiryService:
+    """Zero out the balance of wallets whose validity has passed"""
+
+    @staticmethod
+    def _expire_chunk(now, chunk_size):
+        with transaction.atomic():
+            # walks the credit_expired_at index; rows locked by a concurrent
+            # deduction are skipped and picked up by the next sweep
+            wallets = list(
+                ClientCreditWallet.objects.filter(
+                    credit_expired_at__lte=now, total_credits__gt=0
+                )
+                .select_for_update(skip_locked=True)
+                .order_by("credit_expired_at", "id")
+                .values_list("id", "total_credits", "credit_expired_at")[:chunk_size]
+            )
+            if not wallets:
+                return 0
+
+            ClientCreditTransaction.objects.bulk_create(
+                [
+                    ClientCreditTransaction(
+                        wallet_id=wallet_id,
+                        credits=total_credits,
+                        transaction_type="expiry",
+                        description=f"Credits expired on {timezone.localtime(expired_at).strftime('%d/%m/%Y')}",
+                    )
+                    for wallet_id, total_credits, expired_at in wallets
+                ]
+            )
+            ClientCreditWallet.objects.filter(
+                id__in=[wallet_id for wallet_id, _, _ in wallets]
+            ).update(total_credits=0, updated_at=timezone.now())
+        return len(wallets)
+
+    @classmethod
+    def expire_credits(cls, now=None, chunk_size=EXPIRY_SWEEP_CHUNK_SIZE):
+        """
+        Expire every wallet past its credit_expired_at in one indexed pass. Each
+        chunk writes its expiry ledger entries and zeroes the balances atomically,
+        so an interrupted sweep is simply resumed by the next run.
+        """
+        now = now or timezone.now()
+        expired = 0
+        while count := cls._expire_chunk(now, chunk_size):
+            expired += count
+        return expired
@@ -0,0 +1,106 @@
+from django.db import transaction
+from django.db.models import Q, Sum
+from dashboard.models import ClientCreditWallet, ClientCreditTransaction
+
+RECONCILIATION_CHUNK_SIZE = 500
+
+
+class CreditReconciliationService:
+    """
+    Compare every wallet's total_credits with the balance its ledger explains.
+    Drift comes from strategy code that saves the wallet and writes the ledger
+    entry separately, and from opening grants that were never recorded.
+    """
+
+    CREDIT_TYPES = ("purchase", "refund", "manual", "adjust_add")
+    DEBIT_TYPES = ("usage", "expiry", "adjust_deduct")
+
+    @classmethod
+    def _ledger_balances(cls, wallet_ids):
+        """Ledger balance per wallet with one grouped query"""
+        balances = (
+            ClientCreditTransaction.objects.filter(
+                wallet_id__in=wallet_ids, status="SUC"
+            )
+            .values("wallet_id")
+            .annotate(
+                credited=Sum(
+                    "credits",
+                    filter=Q(transaction_type__in=cls.CREDIT_TYPES),
+                    default=0,
+                ),
+                debited=Sum(
+                    "credits", filter=Q(transaction_type__in=cls.DEBIT_TYPES), default=0
+                ),
+            )
+            .order_by()
+        )
+        return {
+            balance["wallet_id"]: balance["credited"] - balance["debited"]
+            for balance in balances
+        }
+
+    @classmethod
+    def iter_drift(cls, chunk_size=RECONCILIATION_CHUNK_SIZE):
+        """
+        Yield a drift row for every wallet whose balance disagrees with its ledger.
+        Wallets are walked in primary key chunks with plain reads, so no table
+        locks are taken.
+        """
+        last_id = 0
+        while True:
+            wallets = list(
+                ClientCreditWallet.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values("id", "client_id", "client__name", "total_credits")[:chunk_size]
+            )
+            if not wallets:
+                return
+            last_id = wallets[-1]["id"]
+
+            ledger_balances = cls._ledger_balances([wallet["id"] for wallet in wallets])
+            for wallet in wallets:
+                total_credits = wallet["total_credits"] or 0
+                ledger_balance = ledger_balances.get(wallet["id"], 0)
+                if total_credits != ledger_balance:
+                    yield {
+                        "wallet_id": wallet["id"],
+                        "client_id": wallet["client_id"],
+                        "client_name": wallet["client__name"],
+                        "total_credits": total_credits,
+                        "ledger_balance": ledger_balance,
+                        "drift": total_credits - ledger_balance,
+                    }
+
+    @classmethod
+    def correct_drift(cls, wallet_id):
+        """
+        Record an adjustment so the ledger explains the wallet balance. The wallet
+        row is locked only while its own ledger is re-read, and the drift is
+        recomputed under the lock in case it changed since the scan.
+        """
+        with transaction.atomic():
+            wallet = ClientCreditWallet.objects.select_for_update().get(pk=wallet_id)
+            drift = (wallet.total_credits or 0) - cls._ledger_balances([wallet_id]).get(
+                wallet_id, 0
+            )
+            if not drift:
+                return None
+
+            return ClientCreditTransaction.objects.create(
+                wallet=wallet,
+                credits=abs(drift),
+                transaction_type="adjust_add" if drift > 0 else "adjust_deduct",
+                description="Ledger reconciliation adjustment",
+                reference="reconciliation",
+            )
+
+    @classmethod
+    def reconcile(cls, correct=False, chunk_size=RECONCILIATION_CHUNK_SIZE):
+        """Return the drift report, optionally correcting each drifted ledger"""
+        report = []
+        for drift in cls.iter_drift(chunk_size):
+            if correct:
+                drift["corrected"] = cls.correct_drift(drift["wallet_id"]) is not None
+            report.append(drift)
+        return report
@@ -0,0 +1,150 @@
+import json
+import uuid
+import logging
+import redis
+from celery import current_app
+from django.conf import settings
+from django.utils import timezone
+from dashboard.models import DeadLetterTask
+from hiringdogbackend.utils import log_action
+
+
+class DeadLetterService:
+    """
+    Keeps the runs of dead-letter tasks that failed for good, together with
+    the failures of their earlier attempts, so they can be published again in
+    bulk once the cause is fixed.
+    """
+
+    HISTORY_KEY_PREFIX = "dead_letter_attempts"
+    _client = None
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            cls._client = redis.Redis.from_url(
+                settings.DEAD_LETTER_REDIS_URL,
+                socket_timeout=2,
+                socket_connect_timeout=2,
+            )
+        return cls._client
+
+    @staticmethod
+    def get_attempt(attempt, exception):
+        return {
+            "attempt": attempt,
+            "failed_at": timezone.now().isoformat(),
+            "exception": repr(exception),
+        }
+
+    @classmethod
+    def record_attempt(cls, task_id, attempt, exception):
+        key = f"{cls.HISTORY_KEY_PREFIX}:{task_id}"
+        pipeline = cls.get_client().pipeline(transaction=False)
+        pipeline.rpush(key, json.dumps(cls.get_attempt(attempt, exception)))
+        pipeline.expire(key, settings.DEAD_LETTER_ATTEMPT_HISTORY_TTL)
+        try:
+            pipeline.execute()
+        except redis.RedisError:
+            pass
+
+    @classmethod
+    def pop_attempts(cls, task_id):
+        key = f"{cls.HISTORY_KEY_PREFIX}:{task_id}"
+        pipeline = cls.get_client().pipeline()
+        pipeline.lrange(key, 0, -1)
+        pipeline.delete(key)
+        try:
+            attempts, _ = pipeline.execute()
+        except redis.RedisError:
+            return []
+        return [json.loads(attempt) for attempt in attempts]
+
+    @staticmethod
+    def get_options(request):
+        """The rest of the chain and the callbacks the failed run would have called"""
+        options = {
+            "chain": getattr(request, "chain", None),
+            "link": getattr(request, "callbacks", None),
+            "link_error": getattr(request, "errbacks", None),
+        }
+        return {option: value for option, value in options.items() if value}
+
+    @classmethod
+    def capture(
+        cls,
+        task_name,
+        task_id,
+        args,
+        kwargs,
+        exception,
+        traceback="",
+        options=None,
+        attempts=None,
+        attempt_history=None,
+    ):
+        if attempt_history is None:
+            attempt_history = cls.pop_attempts(task_id)
+            attempt_history.append(cls.get_attempt(len(attempt_history) + 1, exception))
+        dead_letter = DeadLetterTask.objects.create(
+            task_name=task_name,
+            task_id=task_id or "",
+            args=list(args or ()),
+            kwargs=dict(kwargs or {}),
+            options=options or {},
+            exception=repr(exception),
+            traceback=traceback or "",
+            attempts=attempts or len(attempt_history),
+            attempt_history=attempt_history,
+        )
+        log_action(
+            f"Task {task_name} dead-lettered after {dead_letter.attempts} attempts: {exception!r}",
+            level=logging.ERROR,
+            task=task_name,
+            task_id=task_id,
+            dead_letter_id=dead_letter.id,
+        )
+        return dead_letter
+
+    @classmethod
+    def replay(cls, queryset, rate_per_minute=None):
+        """
+        Publish the pending entries of queryset again, spaced out by countdown
+        so at most rate_per_minute of them start per minute. Returns the number
+        of entries replayed.
+        """
+        rate_per_minute = rate_per_minute or settings.DEAD_LETTER_REPLAY_RATE_PER_MINUTE
+        interval = 60 / rate_per_minute
+        replayed = 0
+        for dead_letter in queryset.filter(status="PED").order_by("id"):
+            replay_task_id = uuid.uuid4().hex
+            # claimed first so entries replayed concurrently are published once
+            claimed = DeadLetterTask.objects.filter(
+                pk=dead_letter.pk, status="PED"
+            ).update(
+                status="RPL",
+                replayed_at=timezone.now(),
+                replay_task_id=replay_task_id,
+            )
+            if not claimed:
+                continue
+            try:
+                current_app.send_task(
+                    dead_letter.task_name,
+                    args=dead_letter.args,
+                    kwargs=dead_letter.kwargs,
+                    task_id=replay_task_id,
+                    countdown=replayed * interval,
+                    **dead_letter.options,
+                )
+            except Exception:
+                DeadLetterTask.objects.filter(pk=dead_letter.pk).update(
+                    status="PED", replayed_at=None, replay_task_id=None
+                )
+                raise
+            replayed += 1
+        return replayed
+
+    @staticmethod
+    def discard(queryset):
+        return queryset.filter(status="PED").update(status="DIS")
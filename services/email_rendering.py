@@ -0,0 +1,114 @@
+import re
+import uuid
+from django.template.loader import get_template
+from django.utils.html import conditional_escape
+
+TEMPLATE_TAG_PATTERN = re.compile(r"{{.*?}}|{%.*?%}", re.DOTALL)
+SUBSTITUTABLE_TYPES = (str, int, float)
+
+
+class EmailRenderer:
+    """
+    Render email templates from compiled templates kept in memory per worker.
+    Bulk emails render the shared parts of a template once per batch and only
+    substitute the fields that differ per recipient.
+    """
+
+    _templates = {}
+
+    @classmethod
+    def get_template(cls, template_name):
+        template = cls._templates.get(template_name)
+        if template is None:
+            template = cls._templates[template_name] = get_template(template_name)
+        return template
+
+    @classmethod
+    def render(cls, template_name, context):
+        return cls.get_template(template_name).render(context)
+
+    @staticmethod
+    def _is_substitutable(source, field):
+        """
+        A field can be filled into a pre-rendered skeleton only if the template
+        outputs it as a plain {{ field }}, without filters or template logic
+        depending on its value.
+        """
+        field_pattern = re.compile(rf"\b{re.escape(field)}\b")
+        for tag in TEMPLATE_TAG_PATTERN.findall(source):
+            if not field_pattern.search(tag):
+                continue
+            if tag[:2] != "{{" or tag[2:-2].strip() != field:
+                return False
+        return True
+
+    @classmethod
+    def render_many(cls, template_name, contexts):
+        """Render one template for many contexts, returning the html in order"""
+        if len(contexts) < 2:
+            return [cls.render(template_name, context) for context in contexts]
+
+        template = cls.get_template(template_name)
+        source = template.template.source
+        if re.search(r"{%\s*(include|extends)\b", source):
+            return [template.render(context) for context in contexts]
+
+        first = contexts[0]
+        missing = object()
+        varying = {
+            key
+            for key in set().union(*contexts)
+            if any(
+                context.get(key, missing) != first.get(key, missing)
+                for context in contexts
+            )
+        }
+        varying = {
+            key for key in varying if re.search(rf"\b{re.escape(key)}\b", source)
+        }
+        if not all(cls._is_substitutable(source, key) for key in varying) or any(
+            not isinstance(context.get(key), SUBSTITUTABLE_TYPES)
+            for context in contexts
+            for key in varying
+        ):
+            return [template.render(context) for context in contexts]
+
+        nonce = uuid.uuid4().hex
+        tokens = {f"__email_field_{nonce}_{i}__": key for i, key in enumerate(varying)}
+        skeleton = template.render(
+            {**first, **{key: token for token, key in tokens.items()}}
+        )
+        # literal chunks at even positions, the field name of each token in between
+        parts = (
+            re.split(f"({'|'.join(map(re.escape, tokens))})", skeleton)
+            if tokens
+            else [skeleton]
+        )
+        fields = [
+            (index, tokens[part]) for index, part in enumerate(parts) if index % 2
+        ]
+
+        def fill(context):
+            filled = parts.copy()
+            for index, key in fields:
+                filled[index] = str(conditional_escape(context[key]))
+            return "".join(filled)
+
+        # the skeleton must reproduce a full render, otherwise render every context
+        if fill(first) != template.render(first):
+            return [template.render(context) for context in contexts]
+        return [fill(context) for context in contexts]
+
+    @classmethod
+    def render_batch(cls, items):
+        """Render (template_name, context) pairs, batching contexts per template"""
+        rendered = [None] * len(items)
+        groups = {}
+        for index, (template_name, context) in enumerate(items):
+            groups.setdefault(template_name, []).append((index, context))
+
+        for template_name, group in groups.items():
+            html = cls.render_many(template_name, [context for _, context in group])
+            for (index, _), content in zip(group, html):
+                rendered[index] = content
+        return rendered
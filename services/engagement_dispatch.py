@@ -0,0 +1,237 @@
+import uuid
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from dashboard.models import EngagementOperation
+from hiringdogbackend.utils import log_action
+from services.dead_letters import DeadLetterService
+
+CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
+
+
+class EngagementEmailService:
+    """
+    Due-queue for engagement emails. A periodic scan claims the pending
+    operations due within LOOKAHEAD and sends them in batches, so editing or
+    deleting an operation is a plain database update instead of revoking a
+    scheduled task. Operations more than MAX_LATENESS overdue, e.g. after the
+    beat was down, are marked failed instead of being mailed all at once.
+    """
+
+    LOOKAHEAD = timedelta(minutes=1)
+    MAX_LATENESS = timedelta(days=1)
+    LEASE = timedelta(minutes=10)
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = timedelta(minutes=1)
+
+    @staticmethod
+    def claimable(now):
+        return Q(dispatch_lease_expires_at__isnull=True) | Q(
+            dispatch_lease_expires_at__lt=now
+        )
+
+    @staticmethod
+    def reset_dispatch_fields(operation):
+        """Make an edited operation pending again for the next scan"""
+        operation.delivery_status = "PED"
+        operation.delivery_attempts = 0
+        operation.dispatch_lease_expires_at = None
+        operation.dispatch_claim_token = None
+
+    @classmethod
+    def claim_due(cls, limit, now=None):
+        now = now or timezone.now()
+        token = uuid.uuid4().hex
+        due = EngagementOperation.objects.filter(
+            delivery_status="PED",
+            date__gte=now - cls.MAX_LATENESS,
+            date__lte=now + cls.LOOKAHEAD,
+        ).filter(cls.claimable(now))
+        with transaction.atomic():
+            operation_ids = list(
+                due.select_for_update(skip_locked=True, of=("self",))
+                .order_by("date", "id")
+                .values_list("id", flat=True)[:limit]
+            )
+            if not operation_ids:
+                return [], token
+            due.filter(id__in=operation_ids).update(
+                dispatch_lease_expires_at=now + cls.LEASE,
+                dispatch_claim_token=token,
+            )
+        claimed = list(
+            EngagementOperation.objects.filter(
+                id__in=operation_ids, dispatch_claim_token=token
+            )
+            .order_by("date")
+            .values_list("id", "date")
+        )
+        return claimed, token
+
+    @classmethod
+    def fail_stale(cls, now=None):
+        """Mark pending operations overdue by more than MAX_LATENESS as failed"""
+        now = now or timezone.now()
+        stale = (
+            EngagementOperation.objects.filter(
+                delivery_status="PED", date__lt=now - cls.MAX_LATENESS
+            )
+            .filter(cls.claimable(now))
+            .update(delivery_status="FLD", dispatch_claim_token=None)
+        )
+        if stale:
+            log_action(
+                f"Marked {stale} engagement emails overdue by more than "
+                f"{cls.MAX_LATENESS.total_seconds() / 3600:g}h as failed",
+                level=logging.WARNING,
+            )
+        return stale
+
+    @classmethod
+    def iter_due_batches(cls, batch_size=None):
+        """
+        Claim due operations batch by batch, yielding (operation_ids, token, eta).
+        The operations already due in a claimed batch are yielded together with
+        eta None, those still a few seconds out are grouped by their date and
+        get it as eta, so none waits for a later operation of its batch.
+        """
+        batch_size = batch_size or settings.ENGAGEMENT_EMAIL_BATCH_SIZE
+        cls.fail_stale()
+        while True:
+            claimed, token = cls.claim_due(batch_size)
+            if not claimed:
+                return
+            now = timezone.now()
+            groups = {}
+            for operation_id, date in claimed:
+                groups.setdefault(date if date > now else None, []).append(operation_id)
+            for send_at, operation_ids in groups.items():
+                yield operation_ids, token, send_at
+            if len(claimed) < batch_size:
+                return
+
+    @staticmethod
+    def build_message(operation, connection):
+        email = EmailMultiAlternatives(
+            subject=operation.template.subject,
+            body="This is an email.",
+            from_email=CONTACT_EMAIL,
+            to=[
+                getattr(
+                    operation.engagement.candidate,
+                    "email",
+                    operation.engagement.candidate_email,
+                )
+            ],
+            connection=connection,
+        )
+        email.attach_alternative(
+            mark_safe(operation.template.template_html_content), "text/html"
+        )
+        return email
+
+    @classmethod
+    def send(cls, operation_ids, token):
+        """
+        Send the claimed operations over one connection. Operations edited since
+        the claim lost their token and are skipped, those moved to a later date
+        are released for a later scan.
+        """
+        now = timezone.now()
+        claimed = EngagementOperation.objects.filter(
+            id__in=operation_ids, dispatch_claim_token=token, delivery_status="PED"
+        )
+        claimed.filter(date__gt=now).update(
+            dispatch_lease_expires_at=None, dispatch_claim_token=None
+        )
+        operations = list(
+            claimed.filter(date__lte=now).select_related(
+                "template", "engagement", "engagement__candidate"
+            )
+        )
+
+        sent, failed = [], {}
+        with get_connection() as connection:
+            for operation in operations:
+                try:
+                    cls.build_message(operation, connection).send()
+                    sent.append(operation.id)
+                except Exception as e:
+                    failed[operation.id] = e
+                    log_action(
+                        f"Failed to send engagement email of operation {operation.id}: {str(e)}",
+                        level=logging.WARNING,
+                    )
+
+        EngagementOperation.objects.filter(
+            id__in=sent, dispatch_claim_token=token
+        ).update(
+            delivery_status="SUC",
+            delivery_attempts=F("delivery_attempts") + 1,
+            dispatch_lease_expires_at=None,
+            dispatch_claim_token=None,
+        )
+        failed_operations = EngagementOperation.objects.filter(
+            id__in=failed, dispatch_claim_token=token
+        )
+        exhausted = list(
+            failed_operations.filter(
+                delivery_attempts__gte=cls.MAX_ATTEMPTS - 1
+            ).values_list("id", flat=True)
+        )
+        failed_operations.filter(id__in=exhausted).update(delivery_status="FLD")
+        # the lease doubles as the backoff before the next attempt
+        failed_operations.update(
+            delivery_attempts=F("delivery_attempts") + 1,
+            dispatch_lease_expires_at=timezone.now() + cls.RETRY_DELAY,
+            dispatch_claim_token=None,
+        )
+        if exhausted:
+            cls.dead_letter(exhausted, failed)
+        return {"sent": len(sent), "failed": len(failed)}
+
+    @classmethod
+    def dead_letter(cls, operation_ids, errors):
+        """Record the failed operations as one replayable requeue"""
+        DeadLetterService.capture(
+            "dashboard.tasks.requeue_engagement_operations",
+            None,
+            [operation_ids],
+            {},
+            errors[operation_ids[0]],
+            attempts=cls.MAX_ATTEMPTS,
+            attempt_history=[
+                {"operation_id": operation_id, "exception": repr(errors[operation_id])}
+                for operation_id in operation_ids
+            ],
+        )
+
+    @classmethod
+    def requeue(cls, operation_ids):
+        """Make failed operations pending again, due on the next scan"""
+        now = timezone.now()
+        operations = list(
+            EngagementOperation.objects.filter(
+                id__in=operation_ids, delivery_status="FLD"
+            )
+        )
+        for operation in operations:
+            cls.reset_dispatch_fields(operation)
+            # a replayed operation is sent now, however overdue it was
+            operation.date = max(operation.date, now)
+        EngagementOperation.objects.bulk_update(
+            operations,
+            [
+                "date",
+                "delivery_status",
+                "delivery_attempts",
+                "dispatch_lease_expires_at",
+                "dispatch_claim_token",
+            ],
+        )
+        return len(operations)
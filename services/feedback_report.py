@@ -0,0 +1,99 @@
+import hashlib
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from dashboard.models import InterviewFeedback
+from common import constants
+from hiringdogbackend.utils import get_display_name, log_action
+from .pdf_renderer import render_pdfs
+
+FEEDBACK_REPORT_TEMPLATE = "interview_feedback_report.html"
+
+
+class FeedbackReportService:
+    """Render interview feedback reports to PDF and store them on the feedback"""
+
+    @staticmethod
+    def get_report_context(feedback):
+        from dashboard.Serializers.InterviewerSerializers import (
+            InterviewFeedbackSerializer,
+        )
+
+        context = dict(InterviewFeedbackSerializer(feedback).data)
+        context["overall_remark"] = feedback.get_overall_remark_display() or ""
+        interview_uid = urlsafe_base64_encode(
+            force_bytes(f"interview_id:{feedback.interview.id}")
+        )
+        context["recording_url"] = (
+            f"https://{settings.SITE_DOMAIN}/feedback-pdf-video/{interview_uid}"
+            if feedback.interview.recording
+            else None
+        )
+        return context
+
+    @staticmethod
+    def get_report_name(feedback):
+        candidate = feedback.interview.candidate
+        designation = get_display_name(
+            candidate.designation.job_role.name, constants.ROLE_CHOICES
+        )
+        return f"{candidate.name}_{designation}_Feedback_Round 1_{timezone.now().strftime('%Y%m%d-%H%M%S')}.pdf"
+
+    @classmethod
+    def render_reports(cls, interview_ids, force=False):
+        """
+        Render the reports of the given interviews in one batch. A report whose
+        HTML hashes to the stored pdf_content_hash is skipped, since its PDF
+        would come out the same.
+        """
+        feedbacks = InterviewFeedback.objects.filter(
+            interview_id__in=interview_ids
+        ).select_related(
+            "interview",
+            "interview__candidate",
+            "interview__candidate__designation__job_role",
+            "interview__candidate__specialization",
+            "interview__candidate__next_round",
+            "interview__interviewer",
+        )
+
+        pending = []
+        skipped = 0
+        for feedback in feedbacks:
+            html = render_to_string(
+                FEEDBACK_REPORT_TEMPLATE, cls.get_report_context(feedback)
+            )
+            content_hash = hashlib.sha256(html.encode()).hexdigest()
+            if (
+                not force
+                and feedback.pdf_file
+                and feedback.pdf_content_hash == content_hash
+            ):
+                skipped += 1
+                continue
+            pending.append((feedback, html, content_hash))
+
+        rendered, failed = 0, []
+        pdfs = render_pdfs([html for _, html, _ in pending])
+        for (feedback, _, content_hash), pdf in zip(pending, pdfs):
+            if isinstance(pdf, Exception):
+                failed.append(feedback.interview_id)
+                log_action(
+                    f"Failed to render feedback report for interview {feedback.interview_id}: {str(pdf)}",
+                    level=logging.ERROR,
+                )
+                continue
+            feedback.pdf_file.save(
+                cls.get_report_name(feedback), ContentFile(pdf), save=False
+            )
+            # update() keeps InterviewFeedback.save() from touching the interview
+            InterviewFeedback.objects.filter(pk=feedback.pk).update(
+                pdf_file=feedback.pdf_file.name, pdf_content_hash=content_hash
+            )
+            rendered += 1
+
+        return {"rendered": rendered, "skipped": skipped, "failed": failed}
@@ -0,0 +1,99 @@
+import csv
+import tempfile
+from django.http import StreamingHttpResponse, FileResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+EXPORT_CHUNK_SIZE = 2000
+SUPPORTED_EXPORT_FORMATS = ("csv", "xlsx")
+
+
+class Echo:
+    """Pseudo buffer which hands every written row straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+class FinanceExportService:
+    """Stream billing logs as CSV/XLSX without materialising the queryset"""
+
+    CLIENT_COLUMNS = (
+        ("Candidate", "interview__candidate__name"),
+        ("Experience (Years)", "interview__candidate__year"),
+        ("Experience (Months)", "interview__candidate__month"),
+        ("Role", "interview__candidate__designation__job_role__name"),
+        ("Scheduled Time", "interview__scheduled_time"),
+        ("Amount", "amount_for_client"),
+        ("Status", "status"),
+    )
+
+    INTERVIEWER_COLUMNS = (
+        ("Candidate", "interview__candidate__name"),
+        ("Experience (Years)", "interview__candidate__year"),
+        ("Experience (Months)", "interview__candidate__month"),
+        ("Role", "interview__candidate__designation__job_role__name"),
+        ("Scheduled Time", "interview__scheduled_time"),
+        ("Amount", "amount_for_interviewer"),
+        ("Status", "interviewer_payment_status"),
+        ("Feedback Submitted Late", "is_interviewer_feedback_submitted_late"),
+        ("Late Submission Deduction", "late_feedback_submission_deduction"),
+        ("Generated At", "interview__interview_feedback__created_at"),
+        ("Submitted At", "interview__interview_feedback__submitted_at"),
+    )
+
+    @staticmethod
+    def _format_value(value):
+        if hasattr(value, "tzinfo"):
+            return timezone.localtime(value).strftime("%d/%m/%Y %H:%M:%S")
+        return "" if value is None else value
+
+    @classmethod
+    def iter_rows(cls, queryset, columns):
+        """Yield header and data rows by iterating a values() projection in chunks"""
+        fields = [field for _, field in columns]
+        yield [header for header, _ in columns]
+        for record in (
+            queryset.select_related(None)
+            .order_by("billing_month", "id")
+            .values(*fields)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        ):
+            yield [cls._format_value(record[field]) for field in fields]
+
+    @classmethod
+    def stream_csv(cls, queryset, columns, filename):
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (writer.writerow(row) for row in cls.iter_rows(queryset, columns)),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    @classmethod
+    def stream_xlsx(cls, queryset, columns, filename):
+        # xlsx is a zip archive with its directory at the end, so rows are written
+        # through a write-only workbook into a spooled file and streamed from there
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Finance")
+        for row in cls.iter_rows(queryset, columns):
+            worksheet.append(row)
+
+        output = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+        workbook.save(output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+
+    @classmethod
+    def export(cls, queryset, file_format, for_interviewer=False):
+        columns = cls.INTERVIEWER_COLUMNS if for_interviewer else cls.CLIENT_COLUMNS
+        filename = f"finance_{timezone.now().strftime('%Y%m%d-%H%M%S')}"
+        if file_format == "xlsx":
+            return cls.stream_xlsx(queryset, columns, filename)
+        return cls.stream_csv(queryset, columns, filename)
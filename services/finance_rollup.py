@@ -0,0 +1,179 @@
+from django.db import connection, transaction
+from django.db.models import Q, Count, Sum
+from dashboard.models import BillingLog, FinanceRollup
+
+ROLLUP_BUCKET_CHUNK_SIZE = 200
+
+
+class FinanceRollupService:
+    """Maintain FinanceRollup rows per (owner, billing_month) bucket"""
+
+    # rollup_type: (owner field, amount field used for the paid/pending split, status field)
+    ROLLUP_CONFIG = {
+        "CLT": ("client_id", "amount_for_client", "status"),
+        "INT": (
+            "interviewer_id",
+            "amount_for_interviewer",
+            "interviewer_payment_status",
+        ),
+    }
+
+    ROLLUP_FIELDS = [
+        "log_count",
+        "client_amount",
+        "interviewer_amount",
+        "deductions",
+        "paid_amount",
+        "pending_amount",
+        "updated_at",
+    ]
+
+    @classmethod
+    def _refresh_buckets(cls, rollup_type, buckets):
+        owner_field, amount_field, status_field = cls.ROLLUP_CONFIG[rollup_type]
+
+        bucket_filter = Q()
+        for owner_id, billing_month in buckets:
+            bucket_filter |= Q(
+                **{owner_field: owner_id, "billing_month": billing_month}
+            )
+
+        aggregates = (
+            BillingLog.objects.filter(bucket_filter)
+            .values(owner_field, "billing_month", "reason")
+            .annotate(
+                log_count=Count("id"),
+                client_amount=Sum("amount_for_client", default=0),
+                interviewer_amount=Sum("amount_for_interviewer", default=0),
+                deductions=Sum("late_feedback_submission_deduction", default=0),
+                paid_amount=Sum(
+                    amount_field, filter=Q(**{status_field: "PAI"}), default=0
+                ),
+                pending_amount=Sum(
+                    amount_field, filter=Q(**{status_field: "PED"}), default=0
+                ),
+            )
+            .order_by()
+        )
+
+        rollups = [
+            FinanceRollup(
+                rollup_type=rollup_type,
+                **{owner_field: aggregate.pop(owner_field)},
+                **aggregate,
+            )
+            for aggregate in aggregates
+        ]
+
+        # upserted rather than deleted and recreated, so concurrent refreshes of
+        # one bucket don't collide on the unique constraints
+        kept_filter = Q()
+        for rollup in rollups:
+            kept_filter |= Q(
+                **{
+                    owner_field: getattr(rollup, owner_field),
+                    "billing_month": rollup.billing_month,
+                    "reason": rollup.reason,
+                }
+            )
+        with transaction.atomic():
+            FinanceRollup.objects.bulk_create(
+                rollups,
+                update_conflicts=True,
+                # MySQL upserts on any unique key and takes no target
+                unique_fields=(
+                    [owner_field.removesuffix("_id"), "billing_month", "reason"]
+                    if connection.features.supports_update_conflicts_with_target
+                    else None
+                ),
+                update_fields=cls.ROLLUP_FIELDS,
+            )
+            # reasons without billing logs left in a bucket
+            FinanceRollup.objects.filter(rollup_type=rollup_type).filter(
+                bucket_filter
+            ).exclude(kept_filter).delete()
+
+    @classmethod
+    def refresh(cls, client_buckets=(), interviewer_buckets=()):
+        """
+        Rebuild the rollups of the given (owner_id, billing_month) buckets from
+        their billing logs. Only the touched buckets are re-aggregated.
+        """
+        for rollup_type, buckets in (
+            ("CLT", client_buckets),
+            ("INT", interviewer_buckets),
+        ):
+            buckets = sorted({bucket for bucket in buckets if bucket[0]})
+            for i in range(0, len(buckets), ROLLUP_BUCKET_CHUNK_SIZE):
+                cls._refresh_buckets(
+                    rollup_type, buckets[i : i + ROLLUP_BUCKET_CHUNK_SIZE]
+                )
+
+    @staticmethod
+    def _get_buckets(billing_logs, previous_keys=()):
+        if hasattr(billing_logs, "values_list"):
+            keys = billing_logs.values_list(
+                "client_id", "interviewer_id", "billing_month"
+            ).distinct()
+        else:
+            keys = [
+                (log.client_id, log.interviewer_id, log.billing_month)
+                for log in billing_logs
+            ]
+        keys = [*keys, *previous_keys]
+
+        client_buckets, interviewer_buckets = set(), set()
+        for client_id, interviewer_id, billing_month in keys:
+            client_buckets.add((client_id, billing_month))
+            interviewer_buckets.add((interviewer_id, billing_month))
+        return client_buckets, interviewer_buckets
+
+    @classmethod
+    def refresh_for_billing_logs(cls, billing_logs, previous_keys=()):
+        """
+        Refresh the buckets of a BillingLog queryset or an iterable of instances,
+        plus the buckets of previous_keys, (client_id, interviewer_id,
+        billing_month) tuples the logs were moved out of.
+        """
+        cls.refresh(*cls._get_buckets(billing_logs, previous_keys))
+
+    @classmethod
+    def rebuild(cls, billing_month=None):
+        """Rebuild every rollup bucket, optionally limited to one billing month"""
+        billing_logs = BillingLog.objects.order_by()
+        rollups = FinanceRollup.objects.order_by()
+        if billing_month:
+            billing_logs = billing_logs.filter(billing_month=billing_month)
+            rollups = rollups.filter(billing_month=billing_month)
+
+        client_buckets, interviewer_buckets = cls._get_buckets(billing_logs)
+        # buckets whose billing logs are gone get refreshed too, which clears them
+        client_buckets.update(
+            rollups.filter(rollup_type="CLT").values_list("client_id", "billing_month")
+        )
+        interviewer_buckets.update(
+            rollups.filter(rollup_type="INT").values_list(
+                "interviewer_id", "billing_month"
+            )
+        )
+        cls.refresh(client_buckets, interviewer_buckets)
+        return len(client_buckets) + len(interviewer_buckets)
+
+    @staticmethod
+    def get_range_totals(start_date, end_date, client=None, interviewer=None):
+        rollups = FinanceRollup.objects.filter(
+            billing_month__gte=start_date, billing_month__lte=end_date
+        )
+        if client is not None:
+            rollups = rollups.filter(rollup_type="CLT", client=client)
+        else:
+            rollups = rollups.filter(rollup_type="INT", interviewer=interviewer)
+
+        return rollups.aggregate(
+            log_count=Sum("log_count", default=0),
+            client_amount=Sum("client_amount", default=0),
+            interviewer_amount=Sum("interviewer_amount", default=0),
+            deductions=Sum("deductions", default=0),
+            paid_amount=Sum("paid_amount", default=0),
+            pending_amount=Sum("pending_amount", default=0),
+        )
@@ -0,0 +1,42 @@
+import hashlib
+from dashboard.models import FeedbackGenerationCache
+from externals.feedback.interview_feedback import (
+    analyze_transcription_and_generate_feedback,
+    FEEDBACK_PROMPT_VERSION,
+)
+
+
+class InterviewFeedbackService:
+    """Generate AI feedback from a transcript, reusing earlier results"""
+
+    @staticmethod
+    def get_transcript_hash(transcription):
+        return hashlib.sha256(transcription.encode()).hexdigest()
+
+    @classmethod
+    def generate(cls, transcription):
+        """
+        Return the parsed feedback for the transcript. Results are cached per
+        transcript hash and prompt version, so task retries and re-runs do not
+        call the model again until the prompt changes.
+        """
+        transcript_hash = cls.get_transcript_hash(transcription)
+        cached = (
+            FeedbackGenerationCache.objects.filter(
+                transcript_hash=transcript_hash,
+                prompt_version=FEEDBACK_PROMPT_VERSION,
+            )
+            .values_list("feedback", flat=True)
+            .first()
+        )
+        if cached is not None:
+            return cached
+
+        feedback = analyze_transcription_and_generate_feedback(transcription)
+        if feedback:
+            FeedbackGenerationCache.objects.update_or_create(
+                transcript_hash=transcript_hash,
+                prompt_version=FEEDBACK_PROMPT_VERSION,
+                defaults={"feedback": feedback},
+            )
+        return feedback
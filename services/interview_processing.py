@@ -0,0 +1,71 @@
+import uuid
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from dashboard.models import Interview
+
+
+class InterviewClaimService:
+    """
+    Lease based claims so each interview is processed by one worker at a time.
+    A claim that is never released, e.g. because the worker crashed, expires
+    with its lease and the interview is picked up again by the next dispatch.
+    """
+
+    # processing_state: lease duration
+    LEASES = {
+        "DWN": timedelta(hours=2),
+        "FBK": timedelta(minutes=30),
+    }
+
+    @staticmethod
+    def claimable(now=None):
+        now = now or timezone.now()
+        return Q(processing_state__isnull=True) | Q(processing_lease_expires_at__lt=now)
+
+    @classmethod
+    def claim(cls, queryset, processing_state, limit):
+        """
+        Claim up to `limit` interviews of the queryset and return their ids with
+        the claim token. The candidate rows are locked with skip_locked so
+        concurrent dispatchers claim disjoint batches, and the update repeats the
+        claimable condition so a row is never claimed twice.
+        """
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        with transaction.atomic():
+            interview_ids = list(
+                queryset.filter(cls.claimable(now))
+                .select_for_update(skip_locked=True, of=("self",))
+                .order_by("processing_lease_expires_at", "id")
+                .values_list("id", flat=True)[:limit]
+            )
+            if not interview_ids:
+                return [], token
+            Interview.objects.filter(id__in=interview_ids).filter(
+                cls.claimable(now)
+            ).update(
+                processing_state=processing_state,
+                processing_lease_expires_at=now + cls.LEASES[processing_state],
+                processing_claim_token=token,
+            )
+        claimed_ids = list(
+            Interview.objects.filter(
+                id__in=interview_ids, processing_claim_token=token
+            ).values_list("id", flat=True)
+        )
+        return claimed_ids, token
+
+    @staticmethod
+    def release(interview_id, token):
+        """Release the claim, unless it expired and was taken over meanwhile"""
+        if not token:
+            return 0
+        return Interview.objects.filter(
+            pk=interview_id, processing_claim_token=token
+        ).update(
+            processing_state=None,
+            processing_lease_expires_at=None,
+            processing_claim_token=None,
+        )
@@ -321,10 +321,18 @@ class InterviewAvailablitySchedulingService:
         """Validate whether sufficient credits are present"""
 
         try:
-            wallet = ClientCreditWallet.objects.get(client=organization)
+            # reverse one-to-one accessor, cached on the organization instance
+            wallet = organization.wallet
         except ClientCreditWallet.DoesNotExist:
             return self._error_response("Invalid client")
 
+        # the sweeper zeroes expired wallets periodically, so check the
+        # validity here as well for wallets it has not reached yet
+        if wallet.is_expired:
+            return self._error_response(
+                "Your credits have expired. Please purchase more to continue."
+            )
+
         if wallet.total_credits < required_credits:
             return self._error_response(
                 f"Insufficient credit. You need {required_credits} credits to continue. Please purchase more."
@@ -0,0 +1,289 @@
+import logging
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction, connection
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from core.models import Role
+from dashboard.models import BillingRecord, BillingLog, ClientUser, InvoiceSequence
+from common import constants
+from hiringdogbackend.utils import log_action
+from .pdf_renderer import render_pdf_from_template
+
+CONTACT_EMAIL = settings.EMAIL_HOST_USER if settings.DEBUG else settings.CONTACT_EMAIL
+
+
+class InvoiceGenerationService:
+    """
+    Month-end client invoicing in three resumable stages. Every stage only picks up
+    the records the previous run did not finish, so the pipeline can be re-run
+    after a crash without issuing a second invoice number for the same record.
+    """
+
+    INVOICE_PREFIX = "HD"
+
+    @staticmethod
+    def get_financial_year(billing_month):
+        start_year = (
+            billing_month.year if billing_month.month >= 4 else billing_month.year - 1
+        )
+        return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+    @staticmethod
+    def get_billable_records(billing_month):
+        return (
+            BillingRecord.objects.filter(record_type="CLB", billing_month=billing_month)
+            .exclude(status="CAN")
+            .filter(Q(amount_due__gt=0) | Q(total_amount_received_without_tax__gt=0))
+        )
+
+    @classmethod
+    def assign_invoice_numbers(cls, billing_month):
+        """Number every unnumbered record of the month from the gap-free sequence"""
+        financial_year = cls.get_financial_year(billing_month)
+        InvoiceSequence.objects.get_or_create(financial_year=financial_year)
+
+        with transaction.atomic():
+            sequence = InvoiceSequence.objects.select_for_update().get(
+                financial_year=financial_year
+            )
+            record_ids = list(
+                cls.get_billable_records(billing_month)
+                .filter(invoice_number__isnull=True)
+                .select_for_update()
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+            if not record_ids:
+                return 0
+
+            records = []
+            for record_id in record_ids:
+                sequence.last_number += 1
+                records.append(
+                    BillingRecord(
+                        id=record_id,
+                        invoice_number=f"{cls.INVOICE_PREFIX}/{financial_year}/{sequence.last_number:05d}",
+                    )
+                )
+            BillingRecord.objects.bulk_update(
+                records, ["invoice_number"], batch_size=500
+            )
+            sequence.save(update_fields=["last_number", "updated_at"])
+
+        return len(records)
+
+    @staticmethod
+    def get_invoice_context(record):
+        internal_client = record.client
+        organization = internal_client.organization
+        currency = constants.COUNTRY_DETAILS.get(
+            internal_client.code, {"currency": "INR"}
+        )["currency"]
+
+        subtotal = record.amount_due + record.total_amount_received_without_tax
+        tax = (subtotal * Decimal(settings.TAX_AMOUNT)).quantize(Decimal("0.01"))
+        balance_tax = (record.amount_due * Decimal(settings.TAX_AMOUNT)).quantize(
+            Decimal("0.01")
+        )
+
+        line_items = (
+            BillingLog.objects.filter(
+                client=organization, billing_month=record.billing_month
+            )
+            .exclude(amount_for_client=0)
+            .order_by("interview__scheduled_time")
+            .values(
+                "interview__candidate__name",
+                "interview__candidate__designation__job_role__name",
+                "interview__scheduled_time",
+                "reason",
+                "amount_for_client",
+            )
+        )
+        reasons = dict(BillingLog.BILLING_REASON_CHOICES)
+
+        return {
+            "invoice_number": record.invoice_number,
+            "invoice_date": timezone.localdate().strftime("%d/%m/%Y"),
+            "due_date": record.due_date.strftime("%d/%m/%Y"),
+            "billing_month": record.billing_month.strftime("%B %Y"),
+            "client_name": internal_client.brand_name or internal_client.name,
+            "client_address": internal_client.address,
+            "client_gstin": internal_client.gstin,
+            "client_pan": internal_client.pan,
+            "currency_symbol": constants.CURRENCIES[currency]["symbol"],
+            "line_items": [
+                {
+                    "candidate_name": item["interview__candidate__name"],
+                    "role": item["interview__candidate__designation__job_role__name"],
+                    "interview_date": (
+                        timezone.localtime(item["interview__scheduled_time"]).strftime(
+                            "%d/%m/%Y"
+                        )
+                        if item["interview__scheduled_time"]
+                        else ""
+                    ),
+                    "reason": reasons.get(item["reason"], item["reason"]),
+                    "amount": item["amount_for_client"],
+                }
+                for item in line_items
+            ],
+            "subtotal": subtotal,
+            "tax_percentage": int(Decimal(settings.TAX_AMOUNT) * 100),
+            "tax": tax,
+            "total": subtotal + tax,
+            "amount_received": record.total_amount_received_with_tax,
+            "balance_due": record.amount_due + balance_tax,
+        }
+
+    @classmethod
+    def render_invoice(cls, record_id):
+        try:
+            record = BillingRecord.objects.select_related("client__organization").get(
+                pk=record_id
+            )
+            pdf = render_pdf_from_template(
+                "client_invoice.html", cls.get_invoice_context(record)
+            )
+            record.invoice_pdf.save(
+                f"{record.invoice_number.replace('/', '_')}.pdf",
+                ContentFile(pdf),
+                save=False,
+            )
+            record.invoice_generated_at = timezone.now()
+            record.save(update_fields=["invoice_pdf", "invoice_generated_at"])
+            return record.invoice_number
+        finally:
+            # every pool thread opens its own database connection
+            connection.close()
+
+    @classmethod
+    def render_pending_invoices(cls, billing_month, max_workers=None):
+        """Render numbered but not yet generated invoices in a bounded thread pool"""
+        record_ids = list(
+            cls.get_billable_records(billing_month)
+            .filter(invoice_number__isnull=False, invoice_generated_at__isnull=True)
+            .values_list("id", flat=True)
+        )
+        rendered, failed = 0, []
+        if not record_ids:
+            return rendered, failed
+
+        with ThreadPoolExecutor(
+            max_workers=max_workers or settings.INVOICE_RENDER_MAX_WORKERS
+        ) as executor:
+            futures = {
+                executor.submit(cls.render_invoice, record_id): record_id
+                for record_id in record_ids
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    rendered += 1
+                except Exception as e:
+                    failed.append(futures[future])
+                    log_action(
+                        f"Failed to render invoice for billing record {futures[future]}: {str(e)}",
+                        level=logging.ERROR,
+                    )
+        return rendered, failed
+
+    @staticmethod
+    def get_recipients(organization_ids):
+        recipients = {}
+        for organization_id, email in ClientUser.objects.filter(
+            organization_id__in=organization_ids, user__role=Role.CLIENT_OWNER
+        ).values_list("organization_id", "user__email"):
+            recipients.setdefault(organization_id, []).append(email)
+        return recipients
+
+    @classmethod
+    def send_pending_invoices(cls, billing_month, batch_size=None):
+        """Email generated invoices, reusing one SMTP connection per batch"""
+        batch_size = batch_size or settings.INVOICE_EMAIL_BATCH_SIZE
+        records = list(
+            cls.get_billable_records(billing_month)
+            .filter(invoice_generated_at__isnull=False, invoice_sent_at__isnull=True)
+            .select_related("client")
+            .order_by("id")
+        )
+        recipients = cls.get_recipients(
+            [record.client.organization_id for record in records]
+        )
+
+        sent, failed, no_owner = 0, [], []
+        for i in range(0, len(records), batch_size):
+            with get_connection() as mail_connection:
+                for record in records[i : i + batch_size]:
+                    to = recipients.get(record.client.organization_id)
+                    if not to:
+                        # retrying won't create an owner, the invoice waits for the next run
+                        no_owner.append(record.id)
+                        log_action(
+                            f"No client owner found to email invoice {record.invoice_number}",
+                            level=logging.ERROR,
+                        )
+                        continue
+                    try:
+                        cls._send_invoice(record, to, mail_connection)
+                    except Exception as e:
+                        failed.append(record.id)
+                        log_action(
+                            f"Failed to email invoice {record.invoice_number}: {str(e)}",
+                            level=logging.ERROR,
+                        )
+                        continue
+                    BillingRecord.objects.filter(pk=record.pk).update(
+                        invoice_sent_at=timezone.now()
+                    )
+                    sent += 1
+        return sent, failed, no_owner
+
+    @staticmethod
+    def _send_invoice(record, to, mail_connection):
+        billing_month = record.billing_month.strftime("%B %Y")
+        html_content = render_to_string(
+            "client_invoice_notification.html",
+            {
+                "client_name": record.client.brand_name or record.client.name,
+                "invoice_number": record.invoice_number,
+                "billing_month": billing_month,
+                "due_date": record.due_date.strftime("%d/%m/%Y"),
+                "site_domain": settings.SITE_DOMAIN,
+            },
+        )
+        email = EmailMultiAlternatives(
+            subject=f"Invoice {record.invoice_number} for {billing_month}",
+            body="This is an HTML email. Please view it in an HTML-compatible email client.",
+            from_email=CONTACT_EMAIL,
+            to=to,
+            reply_to=[CONTACT_EMAIL],
+            connection=mail_connection,
+        )
+        email.attach_alternative(html_content, "text/html")
+        with record.invoice_pdf.open("rb") as f:
+            email.attach(
+                f"{record.invoice_number.replace('/', '_')}.pdf",
+                f.read(),
+                "application/pdf",
+            )
+        email.send()
+
+    @classmethod
+    def run(cls, billing_month):
+        numbered = cls.assign_invoice_numbers(billing_month)
+        rendered, render_failed = cls.render_pending_invoices(billing_month)
+        sent, send_failed, no_owner = cls.send_pending_invoices(billing_month)
+        return {
+            "numbered": numbered,
+            "rendered": rendered,
+            "render_failed": render_failed,
+            "sent": sent,
+            "send_failed": send_failed,
+            "no_owner": no_owner,
+        }
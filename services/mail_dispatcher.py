@@ -0,0 +1,283 @@
+import json
+import base64
+import time
+import uuid
+import logging
+import smtplib
+import redis
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from hiringdogbackend.utils import log_action
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+# The outbox keeps at most one pending flush: a flush is only scheduled when none
+# is due at or before the requested time. The key holds the due epoch second.
+SCHEDULE_FLUSH_SCRIPT = """
+local due = tonumber(redis.call("GET", KEYS[1]))
+if due and due <= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+CLEAR_DUE_FLUSH_SCRIPT = """
+local due = tonumber(redis.call("GET", KEYS[1]))
+if due and due <= tonumber(ARGV[1]) then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class MailDispatcher:
+    """
+    Buffer outgoing emails in Redis and send them in batches over one long lived
+    SMTP connection per worker process. A batch goes out MAIL_BATCH_WINDOW_SECONDS
+    after the first message arrives, or right away once MAIL_BATCH_SIZE messages
+    are waiting. Only one worker flushes at a time, so pacing to
+    MAIL_SEND_RATE_PER_MINUTE holds across all workers.
+    """
+
+    KEY_PREFIX = "mail_outbox"
+    PENDING_KEY = f"{KEY_PREFIX}:pending"
+    RETRY_KEY = f"{KEY_PREFIX}:retry"
+    SCHEDULED_KEY = f"{KEY_PREFIX}:flush_scheduled"
+    LOCK_KEY = f"{KEY_PREFIX}:flushing"
+    LOCK_TIMEOUT = 300
+    # a scheduled flush that never ran, e.g. a lost task, stops blocking new ones
+    SCHEDULE_GRACE_SECONDS = 60
+    FLUSH_TIME_BUDGET = 240
+    # a refused address stays refused, retrying it only delays the rest
+    PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused,)
+
+    _client = None
+    _connection = None
+    _connection_used_at = 0
+    _last_sent_at = 0
+
+    @classmethod
+    def get_client(cls):
+        if cls._client is None:
+            cls._client = redis.Redis.from_url(
+                settings.MAIL_OUTBOX_REDIS_URL,
+                socket_timeout=5,
+                socket_connect_timeout=5,
+            )
+        return cls._client
+
+    @staticmethod
+    def build_message(payload):
+        message = EmailMultiAlternatives(
+            subject=payload["subject"],
+            body="",
+            from_email=payload["from_email"],
+            to=payload["to"],
+            reply_to=payload["reply_to"],
+            bcc=payload["bcc"],
+        )
+        message.attach_alternative(payload["html"], "text/html")
+        for attachment in payload["attachments"]:
+            content = attachment["content"]
+            if attachment.get("base64"):
+                content = base64.b64decode(content)
+            message.attach(
+                attachment["filename"],
+                content,
+                attachment.get("content_type", "application/octet-stream"),
+            )
+        return message
+
+    @staticmethod
+    def dump_payload(payload):
+        """
+        Serialize a message for the outbox. Binary attachment content, such as an
+        uploaded screenshot, is stored base64 encoded and decoded by build_message.
+        """
+        attachments = []
+        for attachment in payload["attachments"]:
+            if isinstance(attachment["content"], (bytes, bytearray)):
+                attachment = {
+                    **attachment,
+                    "content": base64.b64encode(attachment["content"]).decode(),
+                    "base64": True,
+                }
+            attachments.append(attachment)
+        return json.dumps({**payload, "attachments": attachments})
+
+    @classmethod
+    def send_now(cls, payload):
+        """Send a single message over its own connection, bypassing the outbox"""
+        cls.build_message(payload).send()
+
+    @classmethod
+    def schedule_flush(cls, client, countdown):
+        """
+        Reserve the flush due in `countdown` seconds. Returns the countdown to
+        schedule the flush task with, or None when a flush is already due by then.
+        """
+        if client.eval(
+            SCHEDULE_FLUSH_SCRIPT,
+            1,
+            cls.SCHEDULED_KEY,
+            int(time.time()) + countdown,
+            countdown + cls.SCHEDULE_GRACE_SECONDS,
+        ):
+            return countdown
+        return None
+
+    @classmethod
+    def enqueue(cls, payload):
+        """
+        Add a message to the outbox. Returns the countdown after which a flush
+        should run, or None when an already scheduled flush will pick it up.
+        Raises TypeError or ValueError when the message can't be serialized.
+        """
+        payload.setdefault("id", uuid.uuid4().hex)
+        payload.setdefault("attempts", 0)
+        raw = cls.dump_payload(payload)
+        client = cls.get_client()
+        pending = client.rpush(cls.PENDING_KEY, raw)
+        if pending >= settings.MAIL_BATCH_SIZE:
+            return cls.schedule_flush(client, 0)
+        return cls.schedule_flush(client, settings.MAIL_BATCH_WINDOW_SECONDS)
+
+    @classmethod
+    def get_connection(cls):
+        # SMTP servers drop idle sessions, reopen rather than fail on the next send
+        idle = time.monotonic() - cls._connection_used_at
+        if cls._connection and idle > settings.MAIL_CONNECTION_IDLE_SECONDS:
+            cls.close_connection()
+        if cls._connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            cls._connection = connection
+        return cls._connection
+
+    @classmethod
+    def close_connection(cls):
+        if cls._connection is not None:
+            try:
+                cls._connection.close()
+            except Exception:
+                pass
+            cls._connection = None
+
+    @classmethod
+    def _wait_for_rate_limit(cls):
+        interval = 60 / settings.MAIL_SEND_RATE_PER_MINUTE
+        wait = cls._last_sent_at + interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        cls._last_sent_at = time.monotonic()
+
+    @classmethod
+    def _send(cls, payload):
+        try:
+            cls.get_connection().send_messages([cls.build_message(payload)])
+        except smtplib.SMTPServerDisconnected:
+            cls.close_connection()
+            cls.get_connection().send_messages([cls.build_message(payload)])
+        cls._connection_used_at = time.monotonic()
+
+    @classmethod
+    def _promote_due_retries(cls, client):
+        due = client.zrangebyscore(cls.RETRY_KEY, "-inf", time.time())
+        if due:
+            pipeline = client.pipeline()
+            pipeline.zrem(cls.RETRY_KEY, *due)
+            pipeline.rpush(cls.PENDING_KEY, *due)
+            pipeline.execute()
+
+    @classmethod
+    def _send_batch(cls, client, raw_messages, report):
+        for raw in raw_messages:
+            payload = json.loads(raw)
+            cls._wait_for_rate_limit()
+            try:
+                cls._send(payload)
+            except Exception as e:
+                cls.close_connection()
+                payload["attempts"] += 1
+                permanent = isinstance(e, cls.PERMANENT_ERRORS)
+                pipeline = client.pipeline()
+                pipeline.lpop(cls.PENDING_KEY)
+                if permanent or payload["attempts"] >= settings.MAIL_MAX_ATTEMPTS:
+                    report["failed"] += 1
+                    log_action(
+                        f"Giving up on email '{payload['subject']}' to {', '.join(payload['to'])} "
+                        f"after {payload['attempts']} attempts: {str(e)}",
+                        level=logging.ERROR,
+                    )
+                else:
+                    report["retried"] += 1
+                    pipeline.zadd(
+                        cls.RETRY_KEY,
+                        {
+                            json.dumps(payload): time.time()
+                            + 60 * 2 ** payload["attempts"]
+                        },
+                    )
+                    log_action(
+                        f"Email '{payload['subject']}' to {', '.join(payload['to'])} failed, "
+                        f"retrying: {str(e)}",
+                        level=logging.WARNING,
+                    )
+                pipeline.execute()
+            else:
+                client.lpop(cls.PENDING_KEY)
+                report["sent"] += 1
+
+    @classmethod
+    def flush(cls):
+        """
+        Send everything in the outbox. Messages stay at the head of the list until
+        they were handled, so a crashed flush is picked up by the next one. Failed
+        messages are retried on their own with backoff, the rest of the batch is
+        unaffected. The returned report carries the countdown of the next flush in
+        next_flush_in, None when nothing is left to do or a flush is already
+        scheduled, so flushes never fan out into parallel chains.
+        """
+        client = cls.get_client()
+        lock_id = uuid.uuid4().hex
+        if not client.set(cls.LOCK_KEY, lock_id, nx=True, ex=cls.LOCK_TIMEOUT):
+            return {
+                "busy": True,
+                "next_flush_in": cls.schedule_flush(
+                    client, settings.MAIL_BATCH_WINDOW_SECONDS
+                ),
+            }
+
+        # this run serves the flush that is due, later ones stay scheduled
+        client.eval(CLEAR_DUE_FLUSH_SCRIPT, 1, cls.SCHEDULED_KEY, int(time.time()) + 1)
+        report = {"sent": 0, "retried": 0, "failed": 0}
+        deadline = time.monotonic() + cls.FLUSH_TIME_BUDGET
+        try:
+            cls._promote_due_retries(client)
+            while time.monotonic() < deadline:
+                raw_messages = client.lrange(
+                    cls.PENDING_KEY, 0, settings.MAIL_BATCH_SIZE - 1
+                )
+                if not raw_messages:
+                    break
+                client.expire(cls.LOCK_KEY, cls.LOCK_TIMEOUT)
+                cls._send_batch(client, raw_messages, report)
+        finally:
+            client.eval(RELEASE_LOCK_SCRIPT, 1, cls.LOCK_KEY, lock_id)
+
+        next_flush_in = None
+        if client.llen(cls.PENDING_KEY):
+            next_flush_in = 0
+        else:
+            next_retry = client.zrange(cls.RETRY_KEY, 0, 0, withscores=True)
+            if next_retry:
+                next_flush_in = max(int(next_retry[0][1] - time.time()) + 1, 0)
+        if next_flush_in is not None:
+            next_flush_in = cls.schedule_flush(client, next_flush_in)
+        report["next_flush_in"] = next_flush_in
+        return report
@@ -0,0 +1,62 @@
+import threading
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.template.loader import render_to_string
+from xhtml2pdf import pisa
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+class PDFRenderError(Exception):
+    pass
+
+
+def html_to_pdf(html):
+    output = BytesIO()
+    result = pisa.CreatePDF(html, dest=output, encoding="utf-8")
+    if result.err:
+        raise PDFRenderError("Failed to render HTML to PDF")
+    return output.getvalue()
+
+
+def _warm_up():
+    # the first conversion in a process loads reportlab's fonts and css defaults
+    html_to_pdf("<html><body>warm up</body></html>")
+
+
+def get_render_pool():
+    """Process wide pool of warm renderer threads, created on first use"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ThreadPoolExecutor(
+                max_workers=settings.PDF_RENDER_POOL_SIZE,
+                thread_name_prefix="pdf-render",
+                initializer=_warm_up,
+            )
+    return _render_pool
+
+
+def render_pdf_from_template(template, context):
+    """Render a Django template under templates/ to PDF bytes"""
+    try:
+        return html_to_pdf(render_to_string(template, context))
+    except PDFRenderError:
+        raise PDFRenderError(f"Failed to render {template} to PDF")
+
+
+def render_pdfs(html_documents):
+    """
+    Convert many HTML documents on the warm pool. Returns the PDF bytes or the
+    exception raised for each document, in input order.
+    """
+    futures = [get_render_pool().submit(html_to_pdf, html) for html in html_documents]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
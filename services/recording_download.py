@@ -0,0 +1,230 @@
+import os
+import hashlib
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from dashboard.models import Interview, RecordingDownloadCheckpoint
+from externals.google.google_meet import (
+    get_recording_files,
+    get_file_metadata,
+    download_file,
+)
+
+try:
+    from storages.backends.s3 import S3Storage
+except ImportError:
+    S3Storage = None
+
+
+class RecordingChecksumError(Exception):
+    pass
+
+
+class RecordingDownloadService:
+    """
+    Download interview recordings from Drive with a persisted checkpoint per file.
+
+    Files are streamed straight into media storage when the backend supports it:
+    S3 writes go through the storage's multipart upload, which only buffers one
+    part in memory, and local storage writes straight to the final path. Other
+    backends stage the file under RECORDING_STAGING_DIR, where a retried task
+    resumes from the last checkpointed offset after a worker restart. A streamed
+    upload can't be resumed, so once a transfer of a file has been interrupted
+    its retries are staged as well.
+    """
+
+    FIELD_MAP = {
+        "video": "recording",
+        "transcript": "transcription",
+    }
+    FILE_CONFIGS = {
+        "video": {"ext": "mp4", "mime_type": None},
+        "transcript": {"ext": "txt", "mime_type": "text/plain"},
+    }
+
+    @staticmethod
+    def supports_streaming(storage):
+        if not settings.RECORDING_STREAMING_UPLOAD:
+            return False
+        if S3Storage is not None and isinstance(storage, S3Storage):
+            return True
+        return isinstance(storage, FileSystemStorage)
+
+    @classmethod
+    def open_destination(cls, interview, file_type, file_name):
+        field = Interview._meta.get_field(cls.FIELD_MAP[file_type])
+        name = field.storage.get_available_name(
+            field.generate_filename(interview, file_name),
+            max_length=field.max_length,
+        )
+        if isinstance(field.storage, FileSystemStorage):
+            path = field.storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return name, open(path, "wb")
+        return name, field.storage.open(name, "wb")
+
+    @classmethod
+    def discard(cls, file_type, name):
+        """Remove a partially streamed file after a failed transfer"""
+        field = Interview._meta.get_field(cls.FIELD_MAP[file_type])
+        if field.storage.exists(name):
+            field.storage.delete(name)
+
+    @staticmethod
+    def get_checkpoint(interview, file_type, file_id, mime_type):
+        metadata = (
+            {"size": None, "md5_checksum": None}
+            if mime_type
+            else get_file_metadata(file_id)
+        )
+        checkpoint, created = RecordingDownloadCheckpoint.objects.get_or_create(
+            interview=interview,
+            file_type=file_type,
+            defaults={
+                "drive_file_id": file_id,
+                "total_size": metadata["size"],
+                "md5_checksum": metadata["md5_checksum"],
+            },
+        )
+        if not created and (
+            checkpoint.drive_file_id != file_id
+            or checkpoint.total_size != metadata["size"]
+            or checkpoint.md5_checksum != metadata["md5_checksum"]
+        ):
+            # the file changed on Drive, so the staged bytes are stale
+            checkpoint.drive_file_id = file_id
+            checkpoint.total_size = metadata["size"]
+            checkpoint.md5_checksum = metadata["md5_checksum"]
+            checkpoint.bytes_downloaded = 0
+            checkpoint.completed_at = None
+            checkpoint.save()
+        return checkpoint
+
+    @staticmethod
+    def must_stage(checkpoint):
+        """Staged before, or a transfer made progress and never completed"""
+        return bool(checkpoint.staging_path) or (
+            checkpoint.bytes_downloaded > 0 and checkpoint.completed_at is None
+        )
+
+    @staticmethod
+    def _save_progress(checkpoint, **fields):
+        for field, value in fields.items():
+            setattr(checkpoint, field, value)
+        RecordingDownloadCheckpoint.objects.filter(pk=checkpoint.pk).update(
+            updated_at=timezone.now(), **fields
+        )
+
+    @classmethod
+    def _transfer(cls, checkpoint, fd, mime_type, offset=0, staged=False):
+        md5 = hashlib.md5()
+        if offset:
+            # rehash the prefix kept from the previous attempt
+            fd.seek(0)
+            remaining = offset
+            while remaining:
+                data = fd.read(min(remaining, 4 * 1024 * 1024))
+                md5.update(data)
+                remaining -= len(data)
+            fd.seek(offset)
+            fd.truncate()
+
+        def on_chunk(data, downloaded):
+            md5.update(data)
+            if staged:
+                # the offset may only be persisted once the bytes are on disk
+                fd.flush()
+                os.fsync(fd.fileno())
+            cls._save_progress(checkpoint, bytes_downloaded=downloaded)
+
+        download_file(
+            checkpoint.drive_file_id,
+            fd,
+            mime_type=mime_type,
+            size=checkpoint.total_size,
+            offset=offset,
+            on_chunk=on_chunk,
+            workers=settings.RECORDING_DOWNLOAD_WORKERS,
+        )
+
+        if checkpoint.md5_checksum and md5.hexdigest() != checkpoint.md5_checksum:
+            cls._save_progress(checkpoint, bytes_downloaded=0)
+            raise RecordingChecksumError(
+                f"Checksum mismatch for {checkpoint.file_type} of Interview {checkpoint.interview_id}"
+            )
+        cls._save_progress(checkpoint, completed_at=timezone.now())
+
+    @classmethod
+    def download_staged(cls, checkpoint, file_name, mime_type):
+        staging_path = os.path.join(settings.RECORDING_STAGING_DIR, file_name)
+        offset = 0
+        if checkpoint.staging_path == staging_path and os.path.exists(staging_path):
+            # bytes written after the last checkpoint are dropped and re-fetched
+            offset = min(checkpoint.bytes_downloaded, os.path.getsize(staging_path))
+        if checkpoint.total_size is None:
+            offset = 0
+        cls._save_progress(
+            checkpoint,
+            staging_path=staging_path,
+            bytes_downloaded=offset,
+            completed_at=None,
+        )
+
+        os.makedirs(settings.RECORDING_STAGING_DIR, exist_ok=True)
+        with open(staging_path, "r+b" if offset else "wb") as fd:
+            cls._transfer(checkpoint, fd, mime_type, offset=offset, staged=True)
+        return {"path": staging_path, "name": file_name}
+
+    @classmethod
+    def download_streamed(cls, interview, checkpoint, file_name, mime_type):
+        name, fd = cls.open_destination(interview, checkpoint.file_type, file_name)
+        cls._save_progress(
+            checkpoint, staging_path=None, bytes_downloaded=0, completed_at=None
+        )
+        try:
+            with fd:
+                cls._transfer(checkpoint, fd, mime_type)
+        except Exception:
+            cls.discard(checkpoint.file_type, name)
+            raise
+        return {"name": name, "stored": True}
+
+    @classmethod
+    def download(cls, interview_id, event_id):
+        """
+        Download the recording and transcript of the interview and return the
+        recording info store_recordings expects, or ({}, reason) when the
+        files are not available on Drive.
+        """
+        required_files, reason = get_recording_files(interview_id, event_id)
+        if not required_files:
+            return {}, reason
+
+        interview = Interview.objects.get(pk=interview_id)
+        streaming = cls.supports_streaming(
+            Interview._meta.get_field("recording").storage
+        )
+
+        downloaded_files = {}
+        try:
+            for file_type, file_id in required_files.items():
+                file_config = cls.FILE_CONFIGS[file_type]
+                file_name = f"{event_id}.{file_config['ext']}"
+                checkpoint = cls.get_checkpoint(
+                    interview, file_type, file_id, file_config["mime_type"]
+                )
+                if streaming and not cls.must_stage(checkpoint):
+                    downloaded_files[file_type] = cls.download_streamed(
+                        interview, checkpoint, file_name, file_config["mime_type"]
+                    )
+                else:
+                    downloaded_files[file_type] = cls.download_staged(
+                        checkpoint, file_name, file_config["mime_type"]
+                    )
+        except Exception:
+            for file_type, file in downloaded_files.items():
+                if file.get("stored"):
+                    cls.discard(file_type, file["name"])
+            raise
+
+        return {"interview_id": interview_id, "files": downloaded_files}, None
@@ -0,0 +1,84 @@
+import logging
+from itertools import islice
+from celery import current_app
+from django.conf import settings
+from hiringdogbackend.utils import log_action
+
+
+class ResultBackendAuditService:
+    """Key counts and memory of the Redis database behind the Celery results"""
+
+    KEY_PATTERN = "celery-task*"
+
+    @classmethod
+    def audit(cls, sample_size=None):
+        sample_size = sample_size or settings.RESULT_BACKEND_AUDIT_SAMPLE_SIZE
+        client = current_app.backend.client
+
+        keys = 0
+        sample = []
+        for key in client.scan_iter(match=cls.KEY_PATTERN, count=1000):
+            keys += 1
+            if len(sample) < sample_size:
+                sample.append(key)
+
+        pipeline = client.pipeline(transaction=False)
+        for key in sample:
+            pipeline.ttl(key)
+            pipeline.memory_usage(key)
+        replies = pipeline.execute() if sample else []
+        ttls, sizes = replies[::2], [size or 0 for size in replies[1::2]]
+
+        memory = client.info("memory")
+        stats = client.info("stats")
+        report = {
+            "result_keys": keys,
+            "sampled_keys": len(sample),
+            # ttl -1 means the key never expires
+            "sampled_keys_without_ttl": sum(1 for ttl in ttls if ttl == -1),
+            "sampled_bytes": sum(sizes),
+            "estimated_result_bytes": (
+                int(sum(sizes) / len(sample) * keys) if sample else 0
+            ),
+            "used_memory": memory.get("used_memory", 0),
+            "maxmemory": memory.get("maxmemory", 0),
+            "evicted_keys": stats.get("evicted_keys", 0),
+            "largest_sampled_keys": [
+                (key.decode(), size)
+                for key, size in islice(
+                    sorted(zip(sample, sizes), key=lambda item: -item[1]), 5
+                )
+            ],
+        }
+        cls.log(report)
+        return report
+
+    @staticmethod
+    def log(report):
+        problems = []
+        if report["result_keys"] > settings.RESULT_BACKEND_AUDIT_MAX_KEYS:
+            problems.append(f"{report['result_keys']} result keys")
+        if report["sampled_keys_without_ttl"]:
+            problems.append(
+                f"{report['sampled_keys_without_ttl']} of {report['sampled_keys']} sampled keys never expire"
+            )
+        if (
+            report["maxmemory"]
+            and report["used_memory"]
+            > report["maxmemory"] * settings.RESULT_BACKEND_AUDIT_MAX_MEMORY_RATIO
+        ):
+            problems.append(
+                f"memory at {report['used_memory']} of {report['maxmemory']} bytes"
+            )
+        if report["evicted_keys"]:
+            problems.append(f"{report['evicted_keys']} keys evicted")
+
+        summary = (
+            f"Result backend audit: {report['result_keys']} keys, "
+            f"~{report['estimated_result_bytes']} bytes of results, "
+            f"{report['used_memory']} bytes used"
+        )
+        if problems:
+            log_action(f"{summary}. {', '.join(problems)}", level=logging.WARNING)
+        else:
+            log_action(summary)
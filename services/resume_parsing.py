@@ -0,0 +1,234 @@
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from dashboard.models import ResumeParseJob, ResumeParseFile, ParsedResumeCache
+from externals.gemini_rate_limiter import PRIORITY_BATCH, PRIORITY_STANDARD
+from externals.parser.resumeparser2 import (
+    RESUME_PARSER_VERSION,
+    extract_resume_texts,
+    format_parsed_resume,
+    is_allowed_file,
+    parse_resumes,
+)
+from hiringdogbackend.utils import log_action
+
+
+class ResumeParserService:
+    """Parse resumes, reusing the text and fields of files parsed before"""
+
+    @staticmethod
+    def get_content_hash(file_path):
+        content_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                content_hash.update(chunk)
+        return content_hash.hexdigest()
+
+    @classmethod
+    def parse(cls, file_paths, priority=PRIORITY_STANDARD):
+        """
+        Same results as process_resumes. Files are cached by content hash and
+        parser version, so a file seen before skips text extraction and the
+        model, and only new files go into the prompt. priority is the Gemini
+        rate limiter class of the caller.
+        """
+        file_paths = [path for path in file_paths if is_allowed_file(path)]
+        hashes = [cls.get_content_hash(path) for path in file_paths]
+        entries = {
+            entry.content_hash: entry
+            for entry in ParsedResumeCache.objects.filter(
+                content_hash__in=set(hashes), parser_version=RESUME_PARSER_VERSION
+            )
+        }
+
+        # a file uploaded twice in one batch is extracted and parsed once
+        to_extract = {
+            content_hash: path
+            for content_hash, path in zip(hashes, file_paths)
+            if content_hash not in entries
+        }
+        for (content_hash, path), text in zip(
+            to_extract.items(), extract_resume_texts(list(to_extract.values()))
+        ):
+            if text:
+                entries[content_hash] = ParsedResumeCache(
+                    content_hash=content_hash,
+                    parser_version=RESUME_PARSER_VERSION,
+                    text=text,
+                )
+            else:
+                log_action(f"No text extracted from {path}", level=logging.WARNING)
+
+        to_parse = [
+            content_hash
+            for content_hash in dict.fromkeys(hashes)
+            if content_hash in entries and entries[content_hash].parsed is None
+        ]
+        if to_parse:
+            parsed = parse_resumes(
+                {content_hash: entries[content_hash].text for content_hash in to_parse},
+                priority,
+            )
+            for content_hash, data in parsed.items():
+                entries[content_hash].parsed = data
+
+        # text is kept even when parsing failed, the next upload only calls the model
+        for content_hash in to_extract.keys() | set(to_parse):
+            if content_hash in entries:
+                ParsedResumeCache.objects.update_or_create(
+                    content_hash=content_hash,
+                    parser_version=RESUME_PARSER_VERSION,
+                    defaults={
+                        "text": entries[content_hash].text,
+                        "parsed": entries[content_hash].parsed,
+                    },
+                )
+
+        return [
+            format_parsed_resume(os.path.basename(path), entries[content_hash].parsed)
+            for path, content_hash in zip(file_paths, hashes)
+            if content_hash in entries and entries[content_hash].parsed is not None
+        ]
+
+
+class ResumeParseJobService:
+    """
+    Resume parsing outside the request: uploads are kept in media storage
+    and a worker parses them batch by batch, recording progress and results
+    on the job for the status endpoint.
+
+    A worker holds a job under a lease that is renewed after every batch. A job
+    whose worker died is reclaimed once its lease expires and continues after
+    the last recorded batch. The uploads are kept until the job succeeds or
+    fails for the last time.
+    """
+
+    LEASE = timedelta(minutes=15)
+    MAX_ATTEMPTS = 3
+
+    @staticmethod
+    def create(user, resume_files):
+        from dashboard.tasks import parse_resume_job
+
+        with transaction.atomic():
+            job = ResumeParseJob.objects.create(
+                created_by=user, total_files=len(resume_files)
+            )
+            for resume_file in resume_files:
+                parse_file = ResumeParseFile(job=job, file_name=resume_file.name)
+                parse_file.file.save(resume_file.name, resume_file, save=False)
+                parse_file.save()
+            transaction.on_commit(lambda: parse_resume_job.delay(str(job.id)))
+        return job
+
+    @staticmethod
+    def download(parse_file, directory):
+        # one directory per file keeps the original name, which is reported back
+        path = os.path.join(directory, str(parse_file.id), parse_file.file_name)
+        os.makedirs(os.path.dirname(path))
+        with parse_file.file.open("rb") as source, open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+        return path
+
+    @staticmethod
+    def reclaimable(now):
+        return Q(status="PED") | Q(status="PRO", lease_expires_at__lt=now)
+
+    @classmethod
+    def claim(cls, job_id):
+        now = timezone.now()
+        claimed = (
+            ResumeParseJob.objects.filter(pk=job_id)
+            .filter(cls.reclaimable(now))
+            .update(
+                status="PRO",
+                attempts=F("attempts") + 1,
+                lease_expires_at=now + cls.LEASE,
+            )
+        )
+        return ResumeParseJob.objects.get(pk=job_id) if claimed else None
+
+    @staticmethod
+    def finish(job, status, error=""):
+        # the uploads are only needed for parsing
+        for parse_file in job.files.all():
+            parse_file.file.delete(save=False)
+        job.files.all().delete()
+        job.status = status
+        job.error = error
+        job.lease_expires_at = None
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error", "lease_expires_at", "completed_at"])
+
+    @classmethod
+    def run(cls, job_id):
+        """
+        Parse the files the job has not processed yet. A failed attempt makes
+        the job pending again and is raised for the task to retry, until the
+        job runs out of attempts.
+        """
+        job = cls.claim(job_id)
+        if job is None:
+            return None
+        if job.attempts > cls.MAX_ATTEMPTS:
+            # the previous attempts died with their worker
+            cls.finish(job, "FLD", "Failed to parse the resumes.")
+            return job.status
+        parse_files = list(job.files.order_by("id"))[job.processed_files :]
+        batch_size = settings.RESUME_PARSE_BATCH_SIZE
+
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                for start in range(0, len(parse_files), batch_size):
+                    batch = parse_files[start : start + batch_size]
+                    job.results += ResumeParserService.parse(
+                        [cls.download(parse_file, temp_dir) for parse_file in batch],
+                        PRIORITY_BATCH,
+                    )
+                    job.processed_files += len(batch)
+                    job.lease_expires_at = timezone.now() + cls.LEASE
+                    job.save(
+                        update_fields=["results", "processed_files", "lease_expires_at"]
+                    )
+        except Exception as e:
+            log_action(
+                f"Resume parse job {job_id} failed on attempt {job.attempts}: {str(e)}",
+                level=logging.ERROR,
+                resume_parse_job_id=str(job_id),
+            )
+            if job.attempts >= cls.MAX_ATTEMPTS:
+                cls.finish(job, "FLD", "Failed to parse the resumes.")
+                return job.status
+            ResumeParseJob.objects.filter(pk=job_id, status="PRO").update(
+                status="PED", lease_expires_at=None
+            )
+            raise
+
+        cls.finish(job, "SUC")
+        return job.status
+
+    @classmethod
+    def reclaim_stale(cls):
+        """
+        Dispatch the jobs whose worker died, or whose task was lost before it
+        started, again. Returns the number of jobs dispatched.
+        """
+        from dashboard.tasks import parse_resume_job
+
+        now = timezone.now()
+        job_ids = list(
+            ResumeParseJob.objects.filter(
+                Q(status="PED", created_at__lt=now - cls.LEASE)
+                | Q(status="PRO", lease_expires_at__lt=now)
+            ).values_list("id", flat=True)
+        )
+        for job_id in job_ids:
+            parse_resume_job.delay(str(job_id))
+        return len(job_ids)